@@ -0,0 +1,247 @@
+# asgi.py
+#
+# Async serving mode. Run with, e.g.:
+#   gunicorn app.asgi:app -k uvicorn.workers.UvicornWorker -c gunicorn.conf.py
+#   uvicorn app.asgi:app --workers 4
+#
+# Upstream calls are awaited on the event loop; MatchPredictor calls run on
+# a bounded thread pool so one worker keeps accepting connections while
+# inference or football-data.org is slow.
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.services.fixtures import live_fixtures, parse_fixtures
+from app.services.football_service import AsyncFootballDataService
+from app.services.league_stats import LeagueStatsService
+from app.services.live_broadcaster import LiveBroadcaster
+from app.services.model_registry import registry
+from app.services.prediction_store import PredictionStore, prediction_row
+from footy.metrics import ROUTE_LATENCY, observe, render_latest
+
+INFERENCE_THREADS = int(os.getenv('INFERENCE_THREADS', '4'))
+
+football_service = AsyncFootballDataService()
+registry.add_listener(lambda bundle: setattr(football_service, 'predictor', bundle.predictor))
+
+prediction_store = PredictionStore()
+league_stats = LeagueStatsService()
+live_broadcaster = LiveBroadcaster(registry.get, store=prediction_store)
+football_service.add_snapshot_listener(live_broadcaster.update)
+
+inference_pool = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix='inference')
+
+
+async def run_inference(fn, *args):
+    """Run a blocking predictor call on the inference pool."""
+    return await asyncio.get_running_loop().run_in_executor(inference_pool, fn, *args)
+
+
+async def current_bundle():
+    """The loaded bundle; a request that arrives during warm-up waits off the event loop."""
+    return registry.current() or await asyncio.to_thread(registry.get)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Per-worker background work starts here, after any fork; models warm in
+    # the background (already loaded when the gunicorn master preloaded them)
+    if os.getenv('PREWARM', '1') == '1':
+        registry.prewarm()
+    if float(os.getenv('LIVE_REFRESH_INTERVAL', '60')) > 0:
+        football_service.start_background_refresh()
+    interval = float(os.getenv('MODEL_RELOAD_INTERVAL', '0'))
+    if interval > 0:
+        registry.start_watcher(interval)
+    yield
+    await football_service.stop_background_refresh()
+    inference_pool.shutdown(wait=False)
+
+
+class RequestLatencyMiddleware:
+    """Plain ASGI middleware (cheaper than @app.middleware) recording route latency."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = {'code': 500}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            observe(ROUTE_LATENCY, time.perf_counter() - start, route=route.path if route else 'unmatched',
+                    method=scope['method'], status=str(status['code']))
+
+
+app = FastAPI(title='Football predictions', lifespan=lifespan)
+app.add_middleware(RequestLatencyMiddleware)
+
+
+# Handlers return JSONResponse themselves, which skips FastAPI's
+# jsonable_encoder pass over the nested prediction dicts
+
+def _error(message, status_code):
+    return JSONResponse({'status': 'error', 'message': message}, status_code=status_code)
+
+
+@app.get('/api/live-scores')
+async def live_scores():
+    body = await football_service.live_matches_json()
+    if body:
+        return Response(body, media_type='application/json')
+    return JSONResponse({'error': 'No matches found', 'matches': []})
+
+
+@app.get('/api/live-stream')
+async def live_stream():
+    """Server-sent events: a snapshot of live scores and predictions, then deltas."""
+    if live_broadcaster.version == 0 and football_service.live_snapshot()[0] is None:
+        await football_service.get_live_matches()
+    return StreamingResponse(live_broadcaster.astream(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.get('/ready')
+async def ready():
+    """Readiness probe: 200 once models are serving, 503 while warming up (and starts warm-up)."""
+    registry.prewarm()
+    status = registry.status()
+    return JSONResponse(status, status_code=200 if status['ready'] else 503)
+
+
+@app.get('/api/live-stream/stats')
+async def live_stream_stats():
+    return JSONResponse({**live_broadcaster.stats, 'subscribers': live_broadcaster.subscribers,
+                         'version': live_broadcaster.version})
+
+
+@app.get('/api/competition/{competition_id}/matches')
+async def competition_matches(competition_id: str):
+    matches = await football_service.get_matches_by_competition(competition_id)
+    if matches:
+        return matches
+    return JSONResponse({'error': 'Unable to fetch competition matches'}, status_code=500)
+
+
+@app.get('/api/team/{team_id}/matches')
+async def team_matches(team_id: int, status: str = 'SCHEDULED'):
+    matches = await football_service.get_matches_by_team(team_id, status)
+    if matches:
+        return matches
+    return JSONResponse({'error': 'Unable to fetch team matches'}, status_code=500)
+
+
+@app.get('/api/upstream-stats')
+async def upstream_stats():
+    return football_service.client.metrics()
+
+
+@app.post('/api/predict/batch')
+async def predict_batch(request: Request):
+    """Predict every market for a list of fixtures in one pass."""
+    bundle = await current_bundle()
+    if bundle is None:
+        return _error('Models not loaded', 503)
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = {}
+    pairs, error = parse_fixtures(payload or {})
+    if error:
+        return _error(error, 400)
+
+    results = await run_inference(bundle.predictor.predict_batch, pairs)
+    prediction_store.enqueue([
+        prediction_row(home, away, preds, probs, source='batch', league=bundle.leagues.get(home),
+                       model_version=bundle.model_version, data_version=bundle.data_version)
+        for (home, away), (preds, probs) in zip(pairs, results) if preds
+    ])
+    return JSONResponse({
+        'status': 'success',
+        'predictions': [
+            {'home_team': home, 'away_team': away, 'predictions': preds, 'probabilities': probs}
+            for (home, away), (preds, probs) in zip(pairs, results)
+        ],
+        'timestamp': str(datetime.utcnow())
+    })
+
+
+@app.get('/api/predict/cache-stats')
+async def prediction_cache_stats():
+    return registry.cache.stats()
+
+
+def _predict_live(bundle, matches):
+    fixtures, _ = live_fixtures(matches, bundle.resolver)
+    return fixtures, bundle.predictor.predict_batch(fixtures)
+
+
+@app.get('/api/live-predictions')
+async def live_predictions():
+    bundle = await current_bundle()
+    if bundle is None:
+        return _error('Models not loaded', 503)
+
+    matches = ((await football_service.get_live_matches()) or {}).get('matches', [])
+    if not matches:
+        return {'status': 'error', 'message': 'No live matches available today.'}
+
+    # Resolution and prediction share one trip to the pool
+    fixtures, results = await run_inference(_predict_live, bundle, matches)
+
+    return JSONResponse({
+        'predictions': [
+            {'home_team': home, 'away_team': away, 'predictions': preds, 'probabilities': probs}
+            for (home, away), (preds, probs) in zip(fixtures, results) if preds and probs
+        ],
+        'status': 'success',
+        'timestamp': str(datetime.utcnow())
+    })
+
+
+@app.get('/api/predictions')
+async def prediction_history(limit: int = 50, cursor: str = None, league: str = None, team: str = None,
+                             model_version: str = None, date_from: str = None, date_to: str = None):
+    """Stored predictions, newest first; pass next_cursor back as ?cursor= for the next page."""
+    try:
+        page = await asyncio.to_thread(prediction_store.query, limit=limit, cursor=cursor, league=league,
+                                       team=team, model_version=model_version,
+                                       date_from=date_from, date_to=date_to)
+    except ValueError as e:
+        return _error(f'Bad query: {e}', 400)
+    return JSONResponse({'status': 'success', **page})
+
+
+@app.get('/api/analysis/teams')
+async def team_analysis(league: str = None, season: str = None, team: str = None):
+    """Draws, fouls, goals, over and BTTS stats per team; filter with ?league=, ?season=, ?team=."""
+    try:
+        stats = await asyncio.to_thread(league_stats.query, league, season, team)
+    except (OSError, ValueError) as e:
+        return _error(f'Match data unavailable: {e}', 503)
+    return JSONResponse({'status': 'success', **stats})
+
+
+@app.get('/metrics')
+async def metrics():
+    body, content_type = render_latest()
+    return Response(body, media_type=content_type)
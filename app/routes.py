@@ -1,65 +1,92 @@
 # app/routes.py
 from datetime import datetime
 import logging
+import os
+import time
 
-from flask import Blueprint, render_template, request
-from footy.predictor_utils import MatchPredictor
+from flask import Blueprint, Response, g, render_template, request
 from flask import jsonify
 
 from app.services.football_service import FootballDataService
-import joblib
+from app.services.figure_service import FigureService
+from app.services.fixtures import live_fixtures, parse_fixtures
+from app.services.league_stats import LeagueStatsService
+from app.services.live_broadcaster import LiveBroadcaster
+from app.services.model_registry import registry
+from app.services.prediction_store import PredictionStore, prediction_row
+from footy.metrics import ROUTE_LATENCY, observe, render_latest
 
 # Create blueprint
 routes = Blueprint('routes', __name__)
 
-# Load the models
-import os
-
-
-def initialize_predictor():
-    try:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        models_path = os.path.join(base_dir, '..', 'models', 'football_models.joblib')
-        data_path = os.path.join(base_dir, '..', 'data', 'processed', 'processed_data.pkl')
-
-        models = joblib.load(models_path)
-
-        # HOTFIX: Clean models properly
-        cleaned_models = {}
-        for name, model in models.items():
-            try:
-                if hasattr(model, 'use_label_encoder'):
-                    delattr(model, 'use_label_encoder')
-                cleaned_models[name] = model
-            except Exception as e:
-                print(f"Warning cleaning model {name}: {str(e)}")
-                cleaned_models[name] = model
-
-        df_engineered = joblib.load(data_path)
-
-        predictor = MatchPredictor(df_engineered, cleaned_models)
-        teams = sorted(list(set(df_engineered['HomeTeam'].unique()) | set(df_engineered['AwayTeam'].unique())))
-
-        print(f"✅ Successfully loaded {len(teams)} teams.")
-        return predictor, teams
-
-    except Exception as e:
-        print(f"❌ Error loading models or data: {str(e)}")
-        return None, []
-
-
-predictor, teams = initialize_predictor()
 football_service = FootballDataService()
+registry.add_listener(lambda bundle: setattr(football_service, 'predictor', bundle.predictor))
+
+# Load and warm the models in the background so importing the app stays
+# fast; requests that arrive first wait for the load, /ready reports it.
+# Under gunicorn preloading, the master waits for it before forking.
+if os.getenv('PREWARM', '1') == '1':
+    registry.prewarm()
+prediction_cache = registry.cache
+
+prediction_store = PredictionStore()
+league_stats = LeagueStatsService()
+figure_service = FigureService(league_stats)
+# Figures are rendered off the request path (and reused from disk when the
+# data has not changed); under gunicorn preloading the master waits for them
+if os.getenv('PREWARM', '1') == '1':
+    figure_service.prerender_in_background()
+
+# One upstream poll per worker feeds every open live stream
+LIVE_STREAM_MAX_CLIENTS = int(os.getenv('LIVE_STREAM_MAX_CLIENTS', '16'))
+live_broadcaster = LiveBroadcaster(registry.get, store=prediction_store)
+football_service.add_snapshot_listener(live_broadcaster.update)
+
+
+@routes.before_app_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@routes.after_app_request
+def record_request_latency(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Label by URL rule, not path, so team IDs do not explode the series
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        observe(ROUTE_LATENCY, time.perf_counter() - start,
+                route=route, method=request.method, status=str(response.status_code))
+    return response
+
+
+@routes.route('/metrics')
+def metrics():
+    body, content_type = render_latest()
+    return Response(body, content_type=content_type)
+
+
+@routes.route('/ready')
+def ready():
+    """Readiness probe: 200 once models are serving, 503 while warming up (and starts warm-up)."""
+    registry.prewarm()
+    status = registry.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+
+def current_predictor():
+    """Predictor and team list of the currently loaded bundle."""
+    bundle = registry.get()
+    if bundle is None:
+        return None, []
+    return bundle.predictor, bundle.teams
 
 
 @routes.route('/api/live-scores')
 def live_scores():
     try:
-        matches = football_service.get_live_matches()
-        if matches:
-            # Print what we're sending back
-            print("Sending matches data:", matches)
-            return jsonify(matches)
+        body = football_service.live_matches_json()
+        if body:
+            return Response(body, mimetype='application/json')
 
         return jsonify({
             'error': 'No matches found',
@@ -72,6 +99,29 @@ def live_scores():
             'message': str(e)
         }), 500
 
+@routes.route('/api/live-stream')
+def live_stream():
+    """Server-sent events: a snapshot of live scores and predictions, then deltas."""
+    # A stream holds its thread for as long as the tab is open: refuse it on
+    # single-threaded workers and beyond the per-worker cap, and the page polls
+    if not request.environ.get('wsgi.multithread') or live_broadcaster.subscribers >= LIVE_STREAM_MAX_CLIENTS:
+        return jsonify({'error': 'Live stream unavailable, poll /api/live-scores'}), 503
+
+    if live_broadcaster.version == 0:
+        payload, fetched_at = football_service.live_snapshot()
+        if payload is None:
+            football_service.get_live_matches()
+        else:
+            live_broadcaster.update(payload, fetched_at)
+
+    return Response(live_broadcaster.stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@routes.route('/api/live-stream/stats')
+def live_stream_stats():
+    return jsonify({**live_broadcaster.stats, 'subscribers': live_broadcaster.subscribers,
+                    'version': live_broadcaster.version})
+
 @routes.route('/api/competition/<competition_id>/matches')
 def competition_matches(competition_id):
     matches = football_service.get_matches_by_competition(competition_id)
@@ -87,15 +137,22 @@ def team_matches(team_id):
         return jsonify(matches)
     return jsonify({'error': 'Unable to fetch team matches'}), 500
 
+@routes.route('/api/upstream-stats')
+def upstream_stats():
+    """Upstream call counters, throttle events and latency."""
+    return jsonify(football_service.client.metrics())
+
 @routes.route('/')
 def home():
     """Home page with prediction form."""
+    _, teams = current_predictor()
     return render_template('index.html', teams=teams)
 
 
 @routes.route('/predict', methods=['GET', 'POST'])
 def predict():
     """Handle prediction requests."""
+    predictor, teams = current_predictor()
     print("Teams available:", teams)  # Debug print
     print("Number of teams:", len(teams) if teams else 0)  # Debug print
 
@@ -114,16 +171,75 @@ def predict():
 
     return render_template('predict.html', teams=teams)
 
+@routes.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """Predict every market for a list of fixtures in one pass."""
+    # One bundle for the whole request: a hot reload in between must not
+    # record predictions under versions that did not make them
+    bundle = registry.get()
+    if bundle is None:
+        return jsonify({'status': 'error', 'message': 'Models not loaded'}), 503
+
+    pairs, error = parse_fixtures(request.get_json(silent=True) or {})
+    if error:
+        return jsonify({'status': 'error', 'message': error}), 400
+
+    results, rows = [], []
+    for (home_team, away_team), (preds, probs) in zip(pairs, bundle.predictor.predict_batch(pairs)):
+        results.append({
+            'home_team': home_team,
+            'away_team': away_team,
+            'predictions': preds,
+            'probabilities': probs
+        })
+        if preds:
+            rows.append(prediction_row(home_team, away_team, preds, probs, source='batch',
+                                       league=bundle.leagues.get(home_team),
+                                       model_version=bundle.model_version, data_version=bundle.data_version))
+
+    # Written by the store's background writer, batched across requests
+    prediction_store.enqueue(rows)
+
+    return jsonify({
+        'status': 'success',
+        'predictions': results,
+        'timestamp': str(datetime.utcnow())
+    })
+
+@routes.route('/api/predict/cache-stats')
+def prediction_cache_stats():
+    """Hit/miss counters of the prediction cache."""
+    return jsonify(prediction_cache.stats())
+
 @routes.route('/api/save-prediction', methods=['POST'])
 def save_prediction():
     """Save prediction to database."""
     try:
-        prediction_data = request.json
-        # Here you would typically save to a database
-        # For now, we'll just return success
+        prediction_data = request.get_json(silent=True) or {}
+        home_team = prediction_data.get('homeTeam') or prediction_data.get('home_team')
+        away_team = prediction_data.get('awayTeam') or prediction_data.get('away_team')
+        if not home_team or not away_team or not isinstance(prediction_data.get('predictions'), dict) \
+                or not isinstance(prediction_data.get('probabilities') or {}, dict):
+            return jsonify({'status': 'error', 'message': 'homeTeam, awayTeam and predictions are required'}), 400
+
+        bundle = registry.get()
+        try:
+            row = prediction_row(
+                home_team, away_team, prediction_data['predictions'], prediction_data.get('probabilities'),
+                source='manual',
+                league=prediction_data.get('league') or (bundle.leagues.get(home_team) if bundle else None),
+                match_date=prediction_data.get('matchDate') or prediction_data.get('timestamp'),
+                model_version=bundle.model_version if bundle else None,
+                data_version=bundle.data_version if bundle else None
+            )
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': f'Bad matchDate: {e}'}), 400
+
+        prediction_id = prediction_store.add(row)
         return jsonify({
             'status': 'success',
-            'message': 'Prediction saved successfully'
+            'message': 'Prediction saved successfully',
+            'id': prediction_id
         })
     except Exception as e:
         return jsonify({
@@ -131,6 +247,76 @@ def save_prediction():
             'message': str(e)
         }), 500
 
+def _history_filters(args):
+    return {key: args.get(key) for key in ('league', 'team', 'model_version', 'date_from', 'date_to')}
+
+@routes.route('/api/predictions')
+def prediction_history():
+    """Stored predictions, newest first; pass next_cursor back as ?cursor= for the next page."""
+    try:
+        page = prediction_store.query(limit=request.args.get('limit', 50, type=int),
+                                      cursor=request.args.get('cursor'),
+                                      **_history_filters(request.args))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': f'Bad query: {e}'}), 400
+    return jsonify({'status': 'success', **page})
+
+@routes.route('/api/predictions/accuracy')
+def prediction_accuracy():
+    """Hit rates of stored predictions with a recorded result."""
+    try:
+        accuracy = prediction_store.accuracy(**_history_filters(request.args))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': f'Bad query: {e}'}), 400
+    return jsonify({'status': 'success', **accuracy})
+
+@routes.route('/api/predictions/<int:prediction_id>/result', methods=['POST'])
+def prediction_result(prediction_id):
+    """Record the final score of a stored prediction."""
+    payload = request.get_json(silent=True) or {}
+    try:
+        home_score, away_score = int(payload['home_score']), int(payload['away_score'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'home_score and away_score are required'}), 400
+
+    if not prediction_store.record_result(prediction_id, home_score, away_score):
+        return jsonify({'status': 'error', 'message': 'Prediction not found'}), 404
+    return jsonify({'status': 'success'})
+
+@routes.route('/api/analysis/teams')
+def team_analysis():
+    """Draws, fouls, goals, over and BTTS stats per team; filter with ?league=, ?season=, ?team=."""
+    try:
+        stats = league_stats.query(request.args.get('league'), request.args.get('season'), request.args.get('team'))
+    except (OSError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': f'Match data unavailable: {e}'}), 503
+    return jsonify({'status': 'success', **stats})
+
+@routes.route('/api/figures')
+def figures():
+    """Names of the pre-rendered figures and the league/seasons with a dashboard."""
+    try:
+        return jsonify({'status': 'success', **figure_service.available()})
+    except (OSError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': f'Match data unavailable: {e}'}), 503
+
+@routes.route('/api/figures/<name>')
+def figure(name):
+    """A cached figure (Plotly JSON or PNG); conditional on its ETag, so unchanged figures cost a 304."""
+    try:
+        rendered = figure_service.get(name, request.args.get('league'), request.args.get('season'))
+    except KeyError as e:
+        return jsonify({'status': 'error', 'message': str(e.args[0])}), 404
+    except (OSError, ValueError, ImportError) as e:
+        return jsonify({'status': 'error', 'message': f'Figure unavailable: {e}'}), 503
+
+    response = Response(rendered.body, content_type=rendered.content_type)
+    response.set_etag(rendered.etag)
+    # Revalidate every time: a new data version must show up at once
+    response.headers['Cache-Control'] = 'public, no-cache'
+    response.headers['X-Data-Version'] = rendered.version
+    return response.make_conditional(request)
+
 @routes.route('/results')
 def results():
     """Display prediction results."""
@@ -142,13 +328,14 @@ def live_predictions_page():
     return render_template('live_predictions.html')
 
 
-from footy.utils import smart_team_match
-
-
 @routes.route('/api/live-predictions')
 def live_predictions():
+    bundle = registry.get()
+    if bundle is None:
+        return jsonify({'status': 'error', 'message': 'Models not loaded'}), 503
+    predictor = bundle.predictor
     try:
-        today_matches = football_service.get_live_matches().get('matches', [])  # This should be a LIST []  # now it is a LIST []
+        today_matches = (football_service.get_live_matches() or {}).get('matches', [])  # This should be a LIST []  # now it is a LIST []
         #print("Today's Matches:", today_matches)  # Debug print
         #print("Number of matches:", len(today_matches) if today_matches else 0)  # Debug print
 
@@ -160,28 +347,20 @@ def live_predictions():
             })
 
         predictions = []
-
-        print("\n[Today's Matched Live Matches 📋]")
-        for match in today_matches:
-            home_team = match['homeTeam']['name']
-            away_team = match['awayTeam']['name']
-
-            matched_home = smart_team_match(home_team, teams)
-            matched_away = smart_team_match(away_team, teams)
-
-            print(f" - {home_team} ➔ {matched_home} | {away_team} ➔ {matched_away}")
-
-            if matched_home and matched_away:
-                preds, probs = predictor.predict_match(matched_home, matched_away)
-                if preds and probs:
-                    predictions.append({
-                        'home_team': matched_home,
-                        'away_team': matched_away,
-                        'predictions': preds,
-                        'probabilities': probs
-                    })
-            else:
-                print(f"[SKIPPED❗] Cannot predict {home_team} vs {away_team} (No match found)")
+        fixtures, skipped = live_fixtures(today_matches, bundle.resolver)
+
+        print(f"\n[Today's Matched Live Matches 📋] {len(fixtures)} matched, {len(skipped)} skipped")
+        for home_team, away_team in skipped:
+            print(f"[SKIPPED❗] Cannot predict {home_team} vs {away_team} (No match found)")
+
+        for (matched_home, matched_away), (preds, probs) in zip(fixtures, predictor.predict_batch(fixtures)):
+            if preds and probs:
+                predictions.append({
+                    'home_team': matched_home,
+                    'away_team': matched_away,
+                    'predictions': preds,
+                    'probabilities': probs
+                })
 
         print(f"\n✅ Number of predictions generated: {len(predictions)}")
 
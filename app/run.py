@@ -1,33 +1,14 @@
 # run.py
 
 from flask import Flask, render_template, request, redirect, url_for, jsonify
-from footy.predictor_utils import MatchPredictor
-from app.routes import routes  # Import the blueprint
-from app.services.football_service import FootballDataService
-import joblib
+from app.routes import routes, football_service  # Import the blueprint
+from app.services.model_registry import registry
 import os
 
 # Initialize Flask app
 app = Flask(__name__)
 app.register_blueprint(routes)  # Register the blueprint with the API routes
 
-# Initialize football service
-football_service = FootballDataService()
-
-# Load models and data
-try:
-    print("Loading models and data...")
-    models = joblib.load('models/football_models.joblib')
-    df_engineered = joblib.load('data/processed/processed_data.pkl')
-    predictor = MatchPredictor(df_engineered, models)
-    teams = sorted(list(set(df_engineered['HomeTeam'].unique()) | set(df_engineered['AwayTeam'].unique())))
-    print("Models and data loaded successfully!")
-except Exception as e:
-    print(f"Error loading models or data: {str(e)}")
-    models, df_engineered, predictor, teams = None, None, None, []
-
-football_service.predictor = predictor
-
 # Page routes
 @app.route('/')
 def index():
@@ -37,20 +18,11 @@ def index():
 @app.route('/predict', methods=['GET', 'POST'])
 def predict():
     """Prediction page route with lazy model loading."""
-    global predictor, teams, football_service
+    bundle = registry.get()
+    if bundle is None:
+        return render_template('predict.html', error="Error loading model/data", teams=[])
 
-    if predictor is None:
-        try:
-            print("🔄 Lazy-loading models and data...")
-            models = joblib.load('models/football_models.joblib')
-            df_engineered = joblib.load('data/processed/processed_data.pkl')
-            predictor = MatchPredictor(df_engineered, models)
-            teams = sorted(list(set(df_engineered['HomeTeam'].unique()) | set(df_engineered['AwayTeam'].unique())))
-            football_service.predictor = predictor
-            print("✅ Models loaded successfully.")
-        except Exception as e:
-            print(f"[ERROR] Lazy-loading failed: {str(e)}")
-            return render_template('predict.html', error="Error loading model/data", teams=[])
+    predictor, teams = bundle.predictor, bundle.teams
 
     if request.method == 'POST':
         home_team = request.form.get('homeTeam')
@@ -89,4 +61,6 @@ def live_scores():
     }), 500
 
 if __name__ == '__main__':
+    registry.start_watcher(float(os.getenv('MODEL_RELOAD_INTERVAL', '30')))
+    football_service.start_background_refresh()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,228 @@
+# services/figure_service.py
+import hashlib
+import io
+import os
+import shutil
+import threading
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+# Part of the cache version: bump it when a figure's code changes so
+# renders of the old code are not served
+FIGURE_FORMAT = 1
+
+PLOTLY_JSON = 'application/json'
+PNG = 'image/png'
+
+
+def _draws(stats, league, season):
+    from footy.visualize_interactive import draws_per_league_figure
+    return draws_per_league_figure(stats.summary())
+
+
+def _over(threshold):
+    def build(stats, league, season):
+        from footy.visualize_interactive import over_goals_figure
+        return over_goals_figure(stats.summary(), threshold)
+    return build
+
+
+def _fouls(stats, league, season):
+    from footy.visualize_interactive import fouls_per_league_figure
+    return fouls_per_league_figure(stats.summary())
+
+
+def _dashboard(stats, league, season):
+    from footy.epl_analyzer import create_epl_visualizations
+    table = stats.table()
+    team_stats = table[(table['League'] == league) & (table['Season'] == season)]
+    return create_epl_visualizations(team_stats.reset_index(drop=True), f"{league} {season} Season Analysis")
+
+
+def _static(builder_name):
+    def build(stats, league, season):
+        from footy import visualize_static
+        return getattr(visualize_static, builder_name)(stats.summary())
+    return build
+
+
+# name -> (content type, builder(stats, league, season), per league/season)
+FIGURES = {
+    'draws': (PLOTLY_JSON, _draws, False),
+    'over-1.5': (PLOTLY_JSON, _over(1.5), False),
+    'over-2.5': (PLOTLY_JSON, _over(2.5), False),
+    'fouls': (PLOTLY_JSON, _fouls, False),
+    'dashboard': (PLOTLY_JSON, _dashboard, True),
+    'average-goals': (PNG, _static('average_goals_figure'), False),
+    'total-goals': (PNG, _static('total_goals_figure'), False),
+    'draw-frequency': (PNG, _static('draw_frequency_figure'), False),
+}
+
+
+def _serialize(fig, content_type):
+    if content_type == PNG:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+        return buffer.getvalue()
+    import plotly.io as pio
+    return pio.to_json(fig, validate=False).encode()
+
+
+class RenderedFigure:
+    """A serialised figure and the validators it is served with."""
+
+    def __init__(self, body, content_type, version):
+        self.body = body
+        self.content_type = content_type
+        self.version = version
+        self.etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+class FigureService:
+    """
+    League analytics figures rendered once per data version.
+
+    Figures are built from the precomputed LeagueStatsService tables,
+    serialised (Plotly JSON or PNG) and kept in memory and under
+    ``cache_dir/<version>/``, so restarts and other workers reuse them.
+    Requests only ever read the cache; a figure is rendered on its first
+    request only if ``prerender`` has not covered it yet.
+    """
+
+    def __init__(self, stats, cache_dir=None):
+        """
+        Args:
+            stats: LeagueStatsService the figures are drawn from
+            cache_dir: Render cache directory (default: FIGURE_CACHE_DIR or data/figures)
+        """
+        self.stats = stats
+        self.cache_dir = cache_dir or os.getenv('FIGURE_CACHE_DIR', os.path.join(BASE_DIR, 'data', 'figures'))
+        self._figures = {}  # (version, key) -> RenderedFigure
+        self._lock = threading.Lock()
+        self._prerender_thread = None
+        self.renders = 0
+
+    @property
+    def version(self):
+        return f"{FIGURE_FORMAT}-{self.stats.version}"
+
+    def available(self):
+        """Figure names and the (league, season) pairs dashboards exist for."""
+        summary = self.stats.summary()
+        return {
+            'figures': sorted(FIGURES),
+            'dashboards': [{'league': league, 'season': season}
+                           for league, season in zip(summary['League'], summary['Season'])],
+            'version': self.version
+        }
+
+    def _key(self, name, league, season):
+        if name not in FIGURES:
+            raise KeyError(f"Unknown figure '{name}'")
+        if not FIGURES[name][2]:
+            return name
+        summary = self.stats.summary()
+        # Only pairs present in the data, which also keeps keys safe as file names
+        if not ((summary['League'] == league) & (summary['Season'] == season)).any():
+            raise KeyError(f"No matches for league '{league}' season '{season}'")
+        return f"{name}-{league}-{season}"
+
+    def _path(self, version, key, content_type):
+        return os.path.join(self.cache_dir, version, f"{key}.{'png' if content_type == PNG else 'json'}")
+
+    def _read(self, path, content_type, version):
+        try:
+            with open(path, 'rb') as f:
+                return RenderedFigure(f.read(), content_type, version)
+        except OSError:
+            return None
+
+    def _write(self, path, body):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not cache figure {path}: {str(e)}")
+
+    def get(self, name, league=None, season=None):
+        """
+        The rendered figure, from memory, disk or (once) a fresh render.
+
+        Raises:
+            KeyError: Unknown figure or league/season
+        """
+        version = self.version
+        key = self._key(name, league, season)
+        figure = self._figures.get((version, key))
+        if figure is not None:
+            return figure
+
+        with self._lock:
+            figure = self._figures.get((version, key))
+            if figure is None:
+                content_type, build, _ = FIGURES[name]
+                path = self._path(version, key, content_type)
+                figure = self._read(path, content_type, version)
+                if figure is None:
+                    figure = RenderedFigure(_serialize(build(self.stats, league, season), content_type),
+                                            content_type, version)
+                    self._write(path, figure.body)
+                    self.renders += 1
+                # Drop figures of older data versions
+                if any(cached_version != version for cached_version, _ in self._figures):
+                    self._figures = {k: v for k, v in self._figures.items() if k[0] == version}
+                self._figures[(version, key)] = figure
+            return figure
+
+    def prerender(self):
+        """Render every figure of the current data version and drop older cache directories."""
+        start = time.perf_counter()
+        version = self.version
+        jobs = [(name, None, None) for name, (_, _, per_pair) in FIGURES.items() if not per_pair]
+        jobs += [('dashboard', pair['league'], pair['season']) for pair in self.available()['dashboards']]
+
+        count = 0
+        for name, league, season in jobs:
+            try:
+                self.get(name, league, season)
+                count += 1
+            except ImportError as e:
+                print(f"Warning: skipping figure {name}: {str(e)}")
+
+        if os.path.isdir(self.cache_dir):
+            for entry in os.listdir(self.cache_dir):
+                if entry != version:
+                    shutil.rmtree(os.path.join(self.cache_dir, entry), ignore_errors=True)
+
+        print(f"✅ {count} figures ready for data version {version} in {time.perf_counter() - start:.2f}s.")
+        return count
+
+    def _prerender_safely(self):
+        try:
+            self.prerender()
+        except Exception as e:
+            print(f"❌ Figure pre-rendering failed: {str(e)}")
+
+    def prerender_in_background(self):
+        """Run prerender() on a daemon thread (once at a time)."""
+        with self._lock:
+            if self._prerender_thread is None or not self._prerender_thread.is_alive():
+                self._prerender_thread = threading.Thread(target=self._prerender_safely,
+                                                          name='figure-prerender', daemon=True)
+                self._prerender_thread.start()
+            return self._prerender_thread
+
+    def wait_until_ready(self, timeout=None):
+        """Block until a running prerender finishes."""
+        thread = self._prerender_thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+
+
+if __name__ == '__main__':
+    from app.services.league_stats import LeagueStatsService
+    FigureService(LeagueStatsService()).prerender()
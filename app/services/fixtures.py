@@ -0,0 +1,68 @@
+# services/fixtures.py
+
+MAX_BATCH_FIXTURES = 1000
+
+
+def parse_fixtures(payload):
+    """
+    Read (home_team, away_team) pairs from a batch prediction request body.
+
+    Accepts {"fixtures": [...]} or a bare list; each fixture is either
+    {"home_team": ..., "away_team": ...} or a [home, away] pair.
+
+    Returns:
+        (pairs, None) on success, (None, error message) otherwise
+    """
+    fixtures = payload.get('fixtures') if isinstance(payload, dict) else payload
+
+    if not isinstance(fixtures, list) or not fixtures:
+        return None, 'Expected a non-empty "fixtures" list'
+    if len(fixtures) > MAX_BATCH_FIXTURES:
+        return None, f'At most {MAX_BATCH_FIXTURES} fixtures per request'
+
+    pairs = []
+    for fixture in fixtures:
+        if isinstance(fixture, dict):
+            pairs.append((fixture.get('home_team'), fixture.get('away_team')))
+        elif isinstance(fixture, (list, tuple)) and len(fixture) == 2:
+            pairs.append((fixture[0], fixture[1]))
+        else:
+            pairs.append((None, None))
+
+    if any(not isinstance(team, str) or not team.strip() for pair in pairs for team in pair):
+        return None, 'Each fixture needs a home_team and an away_team name'
+
+    pairs = [(home.strip(), away.strip()) for home, away in pairs]
+
+    return pairs, None
+
+
+def live_fixtures(matches, resolver, save=True):
+    """
+    Resolve upstream live matches to fixtures the models know.
+
+    Args:
+        matches: Upstream match payloads
+        resolver: TeamResolver
+        save: Persist newly resolved names (callers resolving match by
+            match save once at the end instead)
+
+    Returns:
+        (fixtures, skipped): resolved (home, away) pairs and the upstream
+        (home, away) names that could not be resolved
+    """
+    fixtures, skipped = [], []
+    for match in matches:
+        home_team = match['homeTeam']['name']
+        away_team = match['awayTeam']['name']
+        matched_home = resolver.resolve(home_team, match['homeTeam'].get('id'))
+        matched_away = resolver.resolve(away_team, match['awayTeam'].get('id'))
+
+        if matched_home and matched_away:
+            fixtures.append((matched_home, matched_away))
+        else:
+            skipped.append((home_team, away_team))
+
+    if save and resolver.dirty:
+        resolver.save()
+    return fixtures, skipped
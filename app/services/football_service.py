@@ -1,127 +1,411 @@
 # services/football_service.py
 import os
-import requests
+import json
+import threading
+import time
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
+import asyncio
+
+from app.services.http_client import AsyncFootballDataClient, FootballDataClient
+from app.services.shared_snapshot import SharedSnapshot
+
 load_dotenv()
 
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+# How often workers that do not poll upstream look for a newer shared snapshot
+FOLLOW_INTERVAL = 2.0
+
 class FootballDataService:
-    def __init__(self):
+    client_class = FootballDataClient
+
+    def __init__(self, base_url=None, refresh_interval=None, shared_path=None):
+        """
+        Args:
+            base_url: Upstream API root (default: FOOTBALL_DATA_BASE_URL or football-data.org)
+            refresh_interval: Seconds between upstream polls (default: LIVE_REFRESH_INTERVAL or 60)
+            shared_path: File the polling worker publishes snapshots to for the
+                others (default: LIVE_SNAPSHOT_PATH or data/live_snapshot.json;
+                '' keeps the snapshot per process)
+        """
         self.API_KEY = os.getenv('API_KEY')
-        self.BASE_URL = 'https://api.football-data.org/v4'
-        self.headers = {
-            'X-Auth-Token': self.API_KEY
-        }
+        # Overridable so a local stand-in server can play upstream
+        self.BASE_URL = base_url or os.getenv('FOOTBALL_DATA_BASE_URL', 'https://api.football-data.org/v4')
+        self.predictor = None
+        self.client = self.client_class(
+            self.BASE_URL,
+            api_key=self.API_KEY,
+            requests_per_minute=int(os.getenv('FOOTBALL_DATA_RATE_LIMIT', '10'))
+        )
+
+        # Latest live-matches payload, refreshed in the background
+        self.refresh_interval = refresh_interval or float(os.getenv('LIVE_REFRESH_INTERVAL', '60'))
+        self._live_snapshot = None  # (payload, fetched_at)
+        self._live_json = None  # (fetched_at, encoded body)
+        self._refresher = None
+        self._stop_refresh = threading.Event()
+        self._snapshot_listeners = []
+
+        # Only one worker process polls upstream; the others read what it publishes
+        if shared_path is None:
+            shared_path = os.getenv('LIVE_SNAPSHOT_PATH', os.path.join(BASE_DIR, 'data', 'live_snapshot.json'))
+        self.shared = SharedSnapshot(shared_path) if shared_path else None
 
         # Set up logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
+    def _fetch_live_matches(self):
+        """Fetch live and scheduled matches from upstream."""
+        return self.client.get_json(
+            '/matches',
+            params={'status': 'LIVE,IN_PLAY,PAUSED,SCHEDULED'},
+            error_context="Live matches"
+        )
+
+    def add_snapshot_listener(self, callback):
+        """Call ``callback(payload, fetched_at)`` after every successful refresh."""
+        self._snapshot_listeners.append(callback)
+
+    def _notify(self, payload, fetched_at):
+        for callback in self._snapshot_listeners:
+            try:
+                callback(payload, fetched_at)
+            except Exception as e:
+                self.logger.error(f"Live snapshot listener error: {e}")
+
+    def refresh_live_matches(self):
+        """Fetch upstream once and store the payload; returns True on success."""
+        payload = self._fetch_live_matches()
+        if payload is None:
+            return False
+        self._live_snapshot = (payload, time.time())
+        self._publish()
+        self._notify(*self._live_snapshot)
+        return True
+
+    def _publish(self):
+        if self.shared is not None and self.shared.leading:
+            self.shared.publish(*self._live_snapshot)
+
+    def _adopt_shared(self):
+        """Take over a newer snapshot published by the polling worker; True if there was one."""
+        update = self.shared.read_if_changed() if self.shared is not None else None
+        if update is None:
+            return False
+        payload, fetched_at = update
+        if self._live_snapshot is not None and fetched_at <= self._live_snapshot[1]:
+            return False
+        self._live_snapshot = (payload, fetched_at)
+        self._notify(payload, fetched_at)
+        return True
+
+    def _leads_polling(self):
+        return self.shared is None or self.shared.try_lead()
+
+    def _refresh_wait(self):
+        if self.shared is None or self.shared.leading:
+            return self.refresh_interval
+        return min(self.refresh_interval, FOLLOW_INTERVAL)
+
+    def _refresh_loop(self):
+        try:
+            while not self._stop_refresh.is_set():
+                try:
+                    if self._leads_polling():
+                        self.refresh_live_matches()
+                    else:
+                        self._adopt_shared()
+                except Exception as e:
+                    self.logger.error(f"Live refresh error: {e}")
+                self._stop_refresh.wait(self._refresh_wait())
+        finally:
+            if self.shared is not None:
+                self.shared.resign()
+
+    def start_background_refresh(self, interval=None):
+        """
+        Poll upstream on a schedule so requests are served from memory.
+
+        With a shared snapshot, only the worker holding its lock polls;
+        the others pick up what it publishes every FOLLOW_INTERVAL seconds.
+        """
+        if interval:
+            self.refresh_interval = interval
+        if self._refresher is not None and self._refresher.is_alive():
+            return self._refresher
+
+        self._stop_refresh.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name='live-refresh', daemon=True)
+        self._refresher.start()
+        return self._refresher
+
+    def stop_background_refresh(self):
+        self._stop_refresh.set()
+
+    def live_snapshot(self):
+        """Latest (payload, fetched_at) pair, or (None, None) before the first fetch."""
+        return self._live_snapshot or (None, None)
+
     def get_live_matches(self):
+        """
+        Latest live matches payload.
+
+        Served from the in-memory snapshot (or the one another worker
+        published); upstream is only called inline when there is no
+        snapshot yet, or it is older than two refresh intervals while no
+        background refresher is running, and no other worker is polling.
+        """
+        payload, fetched_at = self.live_snapshot()
+        refreshing = self._refresher is not None and self._refresher.is_alive()
+
+        if self._snapshot_is_fresh(payload, fetched_at, refreshing):
+            return payload
+
+        if self._adopt_shared():
+            payload, fetched_at = self.live_snapshot()
+            if self._snapshot_is_fresh(payload, fetched_at, refreshing):
+                return payload
+
+        if self._refresh_inline(refreshing):
+            return self._live_snapshot[0]
+        return payload
+
+    def _refresh_inline(self, refreshing):
+        """Fetch from a request, unless another worker holds the poller lock."""
+        held = self.shared is None or self.shared.leading
+        if not self._leads_polling():
+            return False
         try:
-            response = requests.get(
-                f"{self.BASE_URL}/matches",
-                headers=self.headers,
-                params={'status': 'LIVE,IN_PLAY,PAUSED,SCHEDULED'}
-            )
-
-            # Print debug information
-            print("API Response Status:", response.status_code)
-            print("API Response Headers:", response.headers)
-            print("API Response Content:", response.text[:500])  # First 500 chars
-
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"Error Status Code: {response.status_code}")
-                print(f"Error Response: {response.text}")
-                return None
+            return self.refresh_live_matches()
+        finally:
+            # Without a refresher here, hand the lock back for workers that poll
+            if not held and not refreshing:
+                self.shared.resign()
 
-        except Exception as e:
-            print(f"API Request Error: {str(e)}")
+    def live_matches_fetched_at(self):
+        """ISO timestamp of the snapshot served by get_live_matches, if any."""
+        _, fetched_at = self.live_snapshot()
+        if fetched_at is None:
             return None
+        return datetime.fromtimestamp(fetched_at, tz=timezone.utc).isoformat()
 
-    def handle_api_response(self, response, error_context="API"):
-        """Helper method to handle API responses consistently."""
-        try:
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            self.logger.error(f"{error_context} HTTP Error: {e}")
-            self.logger.error(f"Response content: {response.text}")
-        except Exception as e:
-            self.logger.error(f"{error_context} Error: {e}")
-        return None
+    def live_matches_json(self):
+        """
+        Latest payload (plus its fetch time) encoded as JSON bytes.
+
+        Encoding happens once per snapshot, so serving it is a memory read.
+        """
+        return self._encode_snapshot(self.get_live_matches())
+
+    def _encode_snapshot(self, payload):
+        if payload is None:
+            return None
+
+        _, fetched_at = self.live_snapshot()
+        cached = self._live_json
+        if cached is None or cached[0] != fetched_at:
+            body = json.dumps({**payload, 'fetched_at': self.live_matches_fetched_at()}).encode()
+            cached = (fetched_at, body)
+            self._live_json = cached
+        return cached[1]
+
+    def _snapshot_is_fresh(self, payload, fetched_at, refreshing):
+        return payload is not None and (refreshing or time.time() - fetched_at < 2 * self.refresh_interval)
 
     def get_matches_by_competition(self, competition_id):
         """Get matches for a specific competition."""
         try:
-            url = f"{self.BASE_URL}/competitions/{competition_id}/matches"
-            response = requests.get(url, headers=self.headers)
-            return self.handle_api_response(response, "Competition matches")
+            return self.client.get_json(f"/competitions/{competition_id}/matches",
+                                        error_context="Competition matches")
         except Exception as e:
             self.logger.error(f"Error fetching competition matches: {str(e)}")
             return None
 
+    def get_matches_by_team(self, team_id, status='SCHEDULED'):
+        """Get matches for a specific team."""
+        try:
+            return self.client.get_json(f"/teams/{team_id}/matches", params={'status': status},
+                                        error_context="Team matches")
+        except Exception as e:
+            self.logger.error(f"Error fetching team matches: {str(e)}")
+            return None
+
+    @staticmethod
+    def _todays_params():
+        today = datetime.now().strftime('%Y-%m-%d')
+        return {
+            'dateFrom': today,
+            'dateTo': today,
+            'status': 'SCHEDULED,LIVE,IN_PLAY'
+        }
+
     def get_todays_matches(self):
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
-            response = requests.get(
-                f"{self.BASE_URL}/matches",
-                headers=self.headers,
-                params={
-                    'dateFrom': today,
-                    'dateTo': today,
-                    'status': 'SCHEDULED,LIVE,IN_PLAY'
-                }
-            )
-            matches_data = self.handle_api_response(response, "Today's matches")
+            matches_data = self.client.get_json('/matches', params=self._todays_params(),
+                                                error_context="Today's matches")
             return matches_data.get('matches', []) if matches_data else []
         except Exception as e:
             self.logger.error(f"Error fetching today's matches: {str(e)}")
             return []
 
-    # app/services/football_service.py
-
-    # In football_service.py
     def get_predictions_for_matches(self):  # Only needs self
         try:
-            matches = self.get_live_matches()
-            predictions = []
+            return self._predictions_for(self.get_live_matches())
+        except Exception as e:
+            print(f"Error in get_predictions_for_matches: {str(e)}")
+            return []
+
+    def _predictions_for(self, matches):
+        """Predictions for the named fixtures of a live-matches payload."""
+        predictions = []
+
+        if not matches or 'matches' not in matches:
+            return []
+
+        if not self.predictor:
+            return []
+
+        valid_matches = []
+        for match in matches['matches']:
+            try:
+                if match['homeTeam']['name'] and match['awayTeam']['name']:
+                    valid_matches.append(match)
+            except Exception as e:
+                print(f"Error processing match: {str(e)}")
+                continue
+
+        fixtures = [(m['homeTeam']['name'], m['awayTeam']['name']) for m in valid_matches]
+        results = self.predictor.predict_batch(fixtures)
 
-            if not matches or 'matches' not in matches:
-                return []
+        for match, (match_predictions, probabilities) in zip(valid_matches, results):
+            predictions.append({
+                'match_details': {
+                    'competition': match['competition']['name'],
+                    'kickoff': match['utcDate'],
+                    'homeTeam': match['homeTeam']['name'],
+                    'awayTeam': match['awayTeam']['name'],
+                    'status': match['status']
+                },
+                'predictions': match_predictions,
+                'probabilities': probabilities
+            })
 
-            for match in matches['matches']:
+        return predictions
+
+
+class AsyncFootballDataService(FootballDataService):
+    """
+    FootballDataService for the ASGI app.
+
+    Upstream calls go through AsyncFootballDataClient and the live snapshot
+    is refreshed by an asyncio task, so no worker thread waits on upstream.
+    """
+
+    client_class = AsyncFootballDataClient
+
+    async def refresh_live_matches(self):
+        payload = await self._fetch_live_matches()
+        if payload is None:
+            return False
+        self._live_snapshot = (payload, time.time())
+        # Listeners may run predictions; keep them (and file writes) off the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._publish)
+        await loop.run_in_executor(None, self._notify, *self._live_snapshot)
+        return True
+
+    async def _refresh_loop(self):
+        try:
+            while not self._stop_refresh.is_set():
                 try:
-                    home_team = match['homeTeam']['name']
-                    away_team = match['awayTeam']['name']
-
-                    if self.predictor and home_team and away_team:  # Using self.predictor
-                        try:
-                            match_predictions, probabilities = self.predictor.predict_match(home_team, away_team)
-                            predictions.append({
-                                'match_details': {
-                                    'competition': match['competition']['name'],
-                                    'kickoff': match['utcDate'],
-                                    'homeTeam': home_team,
-                                    'awayTeam': away_team,
-                                    'status': match['status']
-                                },
-                                'predictions': match_predictions,
-                                'probabilities': probabilities
-                            })
-                            print(f"Successfully predicted {home_team} vs {away_team}")
-                        except Exception as e:
-                            print(f"Error making prediction for {home_team} vs {away_team}: {e}")
-                            continue
+                    if self._leads_polling():
+                        await self.refresh_live_matches()
+                    else:
+                        await asyncio.get_running_loop().run_in_executor(None, self._adopt_shared)
                 except Exception as e:
-                    print(f"Error processing match: {str(e)}")
-                    continue
+                    self.logger.error(f"Live refresh error: {e}")
+                await asyncio.sleep(self._refresh_wait())
+        finally:
+            if self.shared is not None:
+                self.shared.resign()
+
+    def start_background_refresh(self, interval=None):
+        """Start the refresh task on the running event loop."""
+        if interval:
+            self.refresh_interval = interval
+        if self._refresher is not None and not self._refresher.done():
+            return self._refresher
+
+        self._stop_refresh.clear()
+        self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
+        return self._refresher
+
+    async def stop_background_refresh(self):
+        self._stop_refresh.set()
+        if self._refresher is not None:
+            self._refresher.cancel()
+        await self.client.aclose()
+
+    async def get_live_matches(self):
+        payload, fetched_at = self.live_snapshot()
+        refreshing = self._refresher is not None and not self._refresher.done()
 
-            return predictions
+        if self._snapshot_is_fresh(payload, fetched_at, refreshing):
+            return payload
+
+        if await asyncio.get_running_loop().run_in_executor(None, self._adopt_shared):
+            payload, fetched_at = self.live_snapshot()
+            if self._snapshot_is_fresh(payload, fetched_at, refreshing):
+                return payload
+
+        held = self.shared is None or self.shared.leading
+        if not self._leads_polling():
+            return payload
+        try:
+            if await self.refresh_live_matches():
+                return self._live_snapshot[0]
+            return payload
+        finally:
+            if not held and not refreshing:
+                self.shared.resign()
+
+    async def live_matches_json(self):
+        return self._encode_snapshot(await self.get_live_matches())
+
+    async def get_matches_by_competition(self, competition_id):
+        try:
+            return await self.client.get_json(f"/competitions/{competition_id}/matches",
+                                              error_context="Competition matches")
+        except Exception as e:
+            self.logger.error(f"Error fetching competition matches: {str(e)}")
+            return None
+
+    async def get_matches_by_team(self, team_id, status='SCHEDULED'):
+        try:
+            return await self.client.get_json(f"/teams/{team_id}/matches", params={'status': status},
+                                              error_context="Team matches")
+        except Exception as e:
+            self.logger.error(f"Error fetching team matches: {str(e)}")
+            return None
+
+    async def get_todays_matches(self):
+        try:
+            matches_data = await self.client.get_json('/matches', params=self._todays_params(),
+                                                      error_context="Today's matches")
+            return matches_data.get('matches', []) if matches_data else []
+        except Exception as e:
+            self.logger.error(f"Error fetching today's matches: {str(e)}")
+            return []
+
+    async def get_predictions_for_matches(self):
+        try:
+            matches = await self.get_live_matches()
+            # Model inference is CPU-bound; keep it off the event loop
+            return await asyncio.get_running_loop().run_in_executor(None, self._predictions_for, matches)
         except Exception as e:
             print(f"Error in get_predictions_for_matches: {str(e)}")
-            return []
\ No newline at end of file
+            return []
@@ -0,0 +1,386 @@
+# services/http_client.py
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from footy.metrics import UPSTREAM_LATENCY, observe
+
+logger = logging.getLogger(__name__)
+# httpx logs every request at INFO; our own counters and metrics cover that
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Most a call may spend waiting for tokens and between retries: well under
+# gunicorn's 30 s worker timeout, leaving room for the requests themselves
+RETRY_BUDGET = float(os.getenv('UPSTREAM_RETRY_BUDGET', '15'))
+
+
+class TokenBucket:
+    """
+    Token bucket limiting upstream calls, corrected by the server's own counters.
+
+    football-data.org reports the calls left in the current minute
+    (X-Requests-Available-Minute) and the seconds until that counter resets
+    (X-RequestCounter-Reset); those override the local estimate, and the
+    bucket refills completely when the server's window resets.
+    """
+
+    def __init__(self, requests_per_minute=10):
+        self.capacity = float(requests_per_minute)
+        self.rate = requests_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.reset_at = None
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if self.reset_at is not None and now >= self.reset_at:
+            self.tokens = self.capacity
+            self.reset_at = None
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """
+        Take one token if one is available now.
+
+        Returns:
+            0.0 if a token was taken, otherwise the seconds to wait before retrying
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self.blocked_until and self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+
+            delay = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            if self.reset_at is not None:
+                delay = min(delay, self.reset_at - now)
+            return max(delay, self.blocked_until - now, 0.001)
+
+    def acquire(self, timeout=30.0):
+        """
+        Take one token, sleeping until one is available.
+
+        Returns:
+            Seconds spent waiting, or None if the wait would exceed ``timeout``
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if delay == 0.0:
+                return waited
+            if waited + delay > timeout:
+                return None
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self, timeout=30.0):
+        """acquire() for event loops: waits with asyncio.sleep."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if delay == 0.0:
+                return waited
+            if waited + delay > timeout:
+                return None
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def update_from_headers(self, headers):
+        """Sync the bucket with the rate-limit headers of a response."""
+        available = headers.get('X-Requests-Available-Minute')
+        reset = headers.get('X-RequestCounter-Reset')
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            try:
+                if available is not None:
+                    self.tokens = min(self.capacity, float(available))
+                if reset is not None:
+                    self.reset_at = now + float(reset)
+            except ValueError:
+                pass
+
+    def block_for(self, seconds):
+        """Hand out no tokens for ``seconds`` (after a 429)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class FootballDataClient:
+    """
+    Pooled HTTP client for football-data.org.
+
+    Reuses connections through one Session, paces calls with a token bucket,
+    retries 429/5xx and connection errors with jittered exponential backoff,
+    and revalidates repeated GETs with ETag/Last-Modified when upstream
+    provides them.
+    """
+
+    def __init__(self, base_url, api_key=None, timeout=(3.05, 10), max_retries=3,
+                 backoff=0.5, max_backoff=30.0, pool_size=10, requests_per_minute=10, max_wait=10.0,
+                 retry_budget=RETRY_BUDGET):
+        self.base_url = base_url.rstrip('/')
+        self.max_wait = max_wait
+        self.retry_budget = retry_budget
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.session = self._make_session(api_key, pool_size)
+
+        self.bucket = TokenBucket(requests_per_minute)
+        self._validators = {}  # url+params -> (etag, last_modified, payload)
+        self._lock = threading.Lock()
+
+        self.latencies = deque(maxlen=1000)
+        self.counters = {
+            'requests': 0,
+            'retries': 0,
+            'errors': 0,
+            'throttled': 0,
+            'rate_limit_waits': 0,
+            'rate_limit_wait_seconds': 0.0,
+            'not_modified': 0,
+            'budget_exhausted': 0
+        }
+
+    def _make_session(self, api_key, pool_size):
+        session = requests.Session()
+        session.headers.update({'X-Auth-Token': api_key} if api_key else {})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _backoff_delay(self, attempt, response=None):
+        """
+        Full-jitter exponential backoff, never shorter than Retry-After.
+
+        Only a 429 waits for the rate-limit window (X-RequestCounter-Reset);
+        a 5xx says nothing about the quota.
+        """
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is None and response.status_code == 429:
+                retry_after = response.headers.get('X-RequestCounter-Reset')
+            try:
+                delay = max(delay, float(retry_after))
+            except (TypeError, ValueError):
+                pass
+        return min(delay, self.max_backoff)
+
+    def _token_wait(self, deadline):
+        """Longest wait for a token that still fits the call's retry budget."""
+        return max(0.0, min(self.max_wait, deadline - time.monotonic()))
+
+    def _retry_fits(self, delay, deadline, error_context):
+        """False (and a log line) if sleeping ``delay`` would overrun the retry budget."""
+        if time.monotonic() + delay <= deadline:
+            return True
+        self._count('budget_exhausted')
+        logger.error(f"{error_context}: retry in {delay:.1f}s would exceed the "
+                     f"{self.retry_budget:.0f}s retry budget, giving up")
+        return False
+
+    def get_json(self, path, params=None, error_context="API"):
+        """
+        GET ``path`` and return the decoded JSON body, or None on failure.
+
+        Args:
+            path: Path below the base URL, e.g. '/matches'
+            params: Query parameters
+            error_context: Label used in log messages
+        """
+        url = f"{self.base_url}{path}"
+        cache_key = (url, tuple(sorted((params or {}).items())))
+        deadline = time.monotonic() + self.retry_budget
+
+        for attempt in range(self.max_retries + 1):
+            if not self._record_wait(self.bucket.acquire(self._token_wait(deadline)), error_context):
+                return None
+
+            headers, validators = self._conditional_headers(cache_key)
+
+            self._count('requests')
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                delay = self._request_failed(e, start, attempt, error_context)
+                if delay is None or not self._retry_fits(delay, deadline, error_context):
+                    return None
+                time.sleep(delay)
+                continue
+
+            done, result = self._handle_response(response, start, attempt, cache_key, validators, error_context)
+            if done:
+                return result
+            if not self._retry_fits(result, deadline, error_context):
+                return None
+            time.sleep(result)
+
+        return None
+
+    def _record_wait(self, waited, error_context):
+        """Count a token-bucket wait; False if the call has to be skipped."""
+        if waited is None:
+            self._count('throttled')
+            logger.warning(f"{error_context}: local rate limit exhausted, skipping call")
+            return False
+        if waited > 0:
+            self._count('rate_limit_waits')
+            self._count('rate_limit_wait_seconds', waited)
+        return True
+
+    def _conditional_headers(self, cache_key):
+        """If-None-Match/If-Modified-Since for a URL fetched before."""
+        headers = {}
+        validators = self._validators.get(cache_key)
+        if validators:
+            etag, last_modified, _ = validators
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers, validators
+
+    def _request_failed(self, error, start, attempt, error_context):
+        """Record a connection error; returns the retry delay, or None to give up."""
+        self.latencies.append(time.perf_counter() - start)
+        observe(UPSTREAM_LATENCY, self.latencies[-1], endpoint=error_context, status='error')
+        self._count('errors')
+        logger.error(f"{error_context} request error: {error}")
+        if attempt < self.max_retries:
+            self._count('retries')
+            return self._backoff_delay(attempt)
+        return None
+
+    def _handle_response(self, response, start, attempt, cache_key, validators, error_context):
+        """
+        Interpret one upstream response (requests or httpx).
+
+        Returns:
+            (True, payload or None) when finished, (False, delay) to retry
+        """
+        self.latencies.append(time.perf_counter() - start)
+        observe(UPSTREAM_LATENCY, self.latencies[-1], endpoint=error_context, status=str(response.status_code))
+        self.bucket.update_from_headers(response.headers)
+
+        if response.status_code == 304 and validators:
+            self._count('not_modified')
+            return True, validators[2]
+
+        if response.status_code in RETRY_STATUSES:
+            self._count('errors')
+            if response.status_code == 429:
+                self._count('throttled')
+            delay = self._backoff_delay(attempt, response)
+            if response.status_code == 429:
+                self.bucket.block_for(delay)
+            if attempt < self.max_retries:
+                self._count('retries')
+                logger.warning(f"{error_context} HTTP {response.status_code}, retrying in {delay:.1f}s")
+                return False, delay
+            logger.error(f"{error_context} HTTP {response.status_code} after {attempt + 1} attempts")
+            return True, None
+
+        try:
+            response.raise_for_status()
+            payload = response.json()
+        except Exception as e:
+            self._count('errors')
+            logger.error(f"{error_context} Error: {e}")
+            logger.debug(f"Response content: {response.text[:500]}")
+            return True, None
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._validators[cache_key] = (etag, last_modified, payload)
+        return True, payload
+
+    def metrics(self):
+        """Call counters, throttle events and latency percentiles (ms)."""
+        with self._lock:
+            counters = dict(self.counters)
+        latencies = sorted(self.latencies)
+        if latencies:
+            counters['latency_p50_ms'] = latencies[len(latencies) // 2] * 1e3
+            counters['latency_p99_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3
+        counters['tokens_available'] = round(self.bucket.tokens, 2)
+        return counters
+
+
+class AsyncFootballDataClient(FootballDataClient):
+    """
+    FootballDataClient for event loops, on a pooled ``httpx.AsyncClient``.
+
+    Same pacing, retry and revalidation behaviour; waits and backoff sleep
+    with asyncio so a slow upstream never blocks the loop.
+    """
+
+    def _make_session(self, api_key, pool_size):
+        import httpx
+
+        connect, read = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        return httpx.AsyncClient(
+            headers={'X-Auth-Token': api_key} if api_key else {},
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    async def get_json(self, path, params=None, error_context="API"):
+        """Async get_json(); returns the decoded JSON body, or None on failure."""
+        import httpx
+
+        url = f"{self.base_url}{path}"
+        cache_key = (url, tuple(sorted((params or {}).items())))
+        deadline = time.monotonic() + self.retry_budget
+
+        for attempt in range(self.max_retries + 1):
+            if not self._record_wait(await self.bucket.acquire_async(self._token_wait(deadline)), error_context):
+                return None
+
+            headers, validators = self._conditional_headers(cache_key)
+
+            self._count('requests')
+            start = time.perf_counter()
+            try:
+                response = await self.session.get(url, params=params, headers=headers)
+            except httpx.HTTPError as e:
+                delay = self._request_failed(e, start, attempt, error_context)
+                if delay is None or not self._retry_fits(delay, deadline, error_context):
+                    return None
+                await asyncio.sleep(delay)
+                continue
+
+            done, result = self._handle_response(response, start, attempt, cache_key, validators, error_context)
+            if done:
+                return result
+            if not self._retry_fits(result, deadline, error_context):
+                return None
+            await asyncio.sleep(result)
+
+        return None
+
+    async def aclose(self):
+        await self.session.aclose()
@@ -0,0 +1,93 @@
+# services/league_stats.py
+import hashlib
+import os
+import threading
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+PERCENTAGE_COLUMNS = {'Draw_Percentage': 'Draws', 'Over1.5_Percentage': 'Over1.5_Games',
+                      'Over2.5_Percentage': 'Over2.5_Games', 'BTTS_Percentage': 'BTTS_Games'}
+
+
+class LeagueStatsService:
+    """
+    Per-team league/season statistics over the cleaned match data.
+
+    The tables for every (League, Season) are computed once per data file
+    version (path, mtime, size) and filtered per request; a new file is
+    picked up on the next request.
+    """
+
+    def __init__(self, data_path=None):
+        """
+        Args:
+            data_path: Cleaned match CSV (default: MATCH_DATA_PATH or data/processed/cleaned_euro_data.csv)
+        """
+        self.data_path = data_path or os.getenv(
+            'MATCH_DATA_PATH', os.path.join(BASE_DIR, 'data', 'processed', 'cleaned_euro_data.csv'))
+        self._cached = None  # (signature, (version, table, summary))
+        self._lock = threading.Lock()
+        self.compute_seconds = None
+
+    def _signature(self):
+        stat = os.stat(self.data_path)
+        return (self.data_path, stat.st_mtime_ns, stat.st_size)
+
+    def _load(self):
+        """(version, team table, league/season summary) of the current data file."""
+        signature = self._signature()
+        cached = self._cached
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with self._lock:
+            if self._cached is None or self._cached[0] != signature:
+                import pandas as pd
+                from footy.league_analyzer import analyze_leagues, league_season_summary
+
+                start = time.perf_counter()
+                matches = pd.read_csv(self.data_path, usecols=['League', 'Season', 'HomeTeam', 'AwayTeam',
+                                                               'FTHG', 'FTAG', 'FTR', 'HF', 'AF'])
+                table = analyze_leagues(matches)
+                for column, count in PERCENTAGE_COLUMNS.items():
+                    table[column] = (table[count] / table['Games'] * 100).round(1)
+                table['AvgFouls'] = table['AvgFouls'].round(2)
+                summary = league_season_summary(matches)
+                version = hashlib.blake2b(repr(signature[1:]).encode(), digest_size=6).hexdigest()
+                self.compute_seconds = time.perf_counter() - start
+                self._cached = (signature, (version, table, summary))
+            return self._cached[1]
+
+    @property
+    def version(self):
+        """Identifier of the data file version the tables were computed from."""
+        return self._load()[0]
+
+    def table(self):
+        """Stats of every team in every (League, Season), with percentages."""
+        return self._load()[1]
+
+    def summary(self):
+        """Match-level totals per (League, Season), see league_season_summary."""
+        return self._load()[2]
+
+    def query(self, league=None, season=None, team=None):
+        """
+        Rows of the table matching the filters, as JSON-ready dicts.
+
+        Returns:
+            {'teams': [...], 'leagues': [...], 'seasons': [...]}
+        """
+        table = self.table()
+        mask = None
+        for column, value in (('League', league), ('Season', season), ('Team', team)):
+            if value:
+                condition = table[column] == value
+                mask = condition if mask is None else mask & condition
+        rows = table if mask is None else table[mask]
+        return {
+            'teams': rows.to_dict(orient='records'),
+            'leagues': sorted(table['League'].unique().tolist()),
+            'seasons': sorted(table['Season'].unique().tolist())
+        }
@@ -0,0 +1,248 @@
+# services/live_broadcaster.py
+import asyncio
+import json
+import queue
+import threading
+import time
+
+from app.services.fixtures import live_fixtures
+from app.services.prediction_store import prediction_row
+
+# Fields whose change means a match has to be pushed again
+STATE_FIELDS = ('status', 'minute', 'injuryTime', 'score', 'utcDate')
+
+KEEPALIVE = b': keepalive\n\n'
+
+
+def format_sse(data, event=None, event_id=None, retry=None):
+    """Encode one server-sent event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    if retry:
+        lines.append(f"retry: {retry}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+class Subscription:
+    """Bounded per-client event queue, filled from the refresher thread."""
+
+    def __init__(self, maxsize=32):
+        self.queue = queue.Queue(maxsize)
+        self.closed = False
+
+    def push(self, data):
+        """Queue an encoded event; a client that falls this far behind is closed."""
+        try:
+            self.queue.put_nowait(data)
+        except queue.Full:
+            self.closed = True
+        return not self.closed
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """Subscription read from an event loop (ASGI)."""
+
+    def __init__(self, maxsize=32):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def _put(self, data):
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.closed = True
+
+    def push(self, data):
+        self.loop.call_soon_threadsafe(self._put, data)
+        return not self.closed
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LiveBroadcaster:
+    """
+    Fans live scores and predictions out to every open stream.
+
+    Fed once per upstream refresh: match states are diffed against the
+    previous payload, predictions are computed only for fixtures that are
+    new (or for all of them after a model swap), and one encoded delta is
+    pushed to all subscribers. Per-refresh work therefore does not depend
+    on how many browsers are connected.
+    """
+
+    def __init__(self, bundle_provider, heartbeat=15.0, max_queue=32, store=None):
+        """
+        Args:
+            bundle_provider: Callable returning the current ModelBundle (or None)
+            heartbeat: Seconds between keepalive comments on idle streams
+            max_queue: Events buffered per client before it is dropped
+            store: Optional PredictionStore that records each new prediction
+        """
+        self.bundle_provider = bundle_provider
+        self.store = store
+        self.heartbeat = heartbeat
+        self.max_queue = max_queue
+
+        self.version = 0
+        self.fetched_at = None
+        self._matches = {}  # match id -> match payload plus 'prediction'
+        self._states = {}  # match id -> encoded STATE_FIELDS
+        self._model_version = None
+        self._snapshot = None  # (version, encoded snapshot event)
+
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self.stats = {'updates': 0, 'deltas': 0, 'predicted': 0, 'dropped': 0}
+
+    @staticmethod
+    def _state(match):
+        return json.dumps([match.get(field) for field in STATE_FIELDS], sort_keys=True, default=str)
+
+    def _predict(self, bundle, matches):
+        """Prediction entry per match id (None where the teams are unknown)."""
+        predictions = {match['id']: None for match in matches}
+        if bundle is None or not matches:
+            return predictions
+
+        resolved = []
+        for match in matches:
+            fixtures, _ = live_fixtures([match], bundle.resolver, save=False)
+            if fixtures:
+                resolved.append((match['id'], fixtures[0]))
+        # One cache write per refresh, and only when something new was resolved
+        bundle.resolver.save()
+
+        by_id = {match['id']: match for match in matches}
+        results = bundle.predictor.predict_batch([fixture for _, fixture in resolved])
+        rows = []
+        for (match_id, (home, away)), (preds, probs) in zip(resolved, results):
+            if preds and probs:
+                predictions[match_id] = {
+                    'home_team': home,
+                    'away_team': away,
+                    'predictions': preds,
+                    'probabilities': probs
+                }
+                match = by_id[match_id]
+                rows.append(prediction_row(home, away, preds, probs, source='live',
+                                           league=(match.get('competition') or {}).get('name'),
+                                           match_date=match.get('utcDate'), external_id=match_id,
+                                           model_version=bundle.model_version, data_version=bundle.data_version))
+        self.stats['predicted'] += len(resolved)
+        if self.store is not None and rows:
+            self.store.enqueue(rows)
+        return predictions
+
+    def update(self, payload, fetched_at=None):
+        """
+        Diff a live-matches payload against the last one and push the changes.
+
+        Returns:
+            Number of matches pushed (changed, new or re-predicted)
+        """
+        with self._update_lock:
+            matches = {m['id']: m for m in (payload or {}).get('matches', []) if m.get('id') is not None}
+            bundle = self.bundle_provider()
+            model_version = (bundle.model_version, bundle.data_version) if bundle else None
+
+            repredict = model_version != self._model_version
+            states = {match_id: self._state(match) for match_id, match in matches.items()}
+            to_predict = [m for match_id, m in matches.items() if repredict or match_id not in self._matches]
+            changed = [match_id for match_id in matches
+                       if states[match_id] != self._states.get(match_id)]
+            removed = [match_id for match_id in self._matches if match_id not in matches]
+
+            predictions = self._predict(bundle, to_predict)
+            changed = list(dict.fromkeys(changed + list(predictions)))
+
+            self.stats['updates'] += 1
+            self.fetched_at = fetched_at or time.time()
+            if not changed and not removed:
+                return 0
+
+            with self._lock:
+                for match_id in removed:
+                    del self._matches[match_id]
+                for match_id in changed:
+                    previous = self._matches.get(match_id, {}).get('prediction')
+                    self._matches[match_id] = {**matches[match_id],
+                                               'prediction': predictions.get(match_id, previous)}
+                self._states = states
+                self._model_version = model_version
+                self.version += 1
+
+                event = format_sse({
+                    'version': self.version,
+                    'fetched_at': self.fetched_at,
+                    'changed': [self._matches[match_id] for match_id in changed],
+                    'removed': removed
+                }, event='delta', event_id=self.version)
+                self.stats['deltas'] += 1
+
+                for subscription in list(self._subscribers):
+                    if not subscription.push(event):
+                        self._subscribers.discard(subscription)
+                        self.stats['dropped'] += 1
+
+            return len(changed)
+
+    def _snapshot_event(self):
+        """Full state as one event, encoded once per version; caller holds the lock."""
+        if self._snapshot is None or self._snapshot[0] != self.version:
+            self._snapshot = (self.version, format_sse({
+                'version': self.version,
+                'fetched_at': self.fetched_at,
+                'matches': list(self._matches.values())
+            }, event='snapshot', event_id=self.version, retry=5000))
+        return self._snapshot[1]
+
+    def subscribe(self, subscription):
+        """Register a client; it receives the current snapshot first."""
+        with self._lock:
+            subscription.push(self._snapshot_event())
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers)
+
+    def stream(self):
+        """Generator of encoded events for a WSGI response (one thread per client)."""
+        subscription = self.subscribe(Subscription(self.max_queue))
+        try:
+            while not subscription.closed:
+                data = subscription.get(self.heartbeat)
+                yield data if data is not None else KEEPALIVE
+        finally:
+            self.unsubscribe(subscription)
+
+    async def astream(self):
+        """Async generator of encoded events for an ASGI response."""
+        subscription = self.subscribe(AsyncSubscription(self.max_queue))
+        try:
+            while not subscription.closed:
+                data = await subscription.get(self.heartbeat)
+                yield data if data is not None else KEEPALIVE
+        finally:
+            self.unsubscribe(subscription)
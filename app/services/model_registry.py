@@ -0,0 +1,356 @@
+# services/model_registry.py
+import os
+import threading
+import time
+
+from footy.metrics import CACHE_HIT_RATIO, CACHE_SIZE, MODEL_LOAD_SECONDS, MODEL_LOADS, on_scrape
+from footy.prediction_cache import PredictionCache
+
+# joblib, pandas, scipy and the unpickled model libraries are imported in
+# _load_bundle, so importing the app does not pay for them up front
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+
+class ModelBundle:
+    """Everything one loaded model/data version serves from."""
+
+    def __init__(self, predictor, teams, model_version, data_version, load_seconds, resolver=None, leagues=None):
+        if resolver is None:
+            from footy.team_resolver import TeamResolver
+            resolver = TeamResolver(teams)
+        self.predictor = predictor
+        self.teams = teams
+        self.resolver = resolver
+        self.leagues = leagues or {}  # team -> league code of its latest home match
+        self.model_version = model_version
+        self.data_version = data_version
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+
+class ModelRegistry:
+    """
+    Process-wide owner of the models, serving data and prediction cache.
+
+    Artifacts are loaded once per process, on first use or ahead of it by
+    ``prewarm``. Under gunicorn with ``preload_app`` the master waits for the
+    load before forking, so workers share the loaded objects copy-on-write
+    instead of loading their own.
+
+    ``state`` moves cold -> loading -> loaded (-> warming -> ready after a
+    smoke prediction), or to failed.
+    """
+
+    def __init__(self, models_path=None, data_path=None, scoreline_path=None, cache=None, manifest_path=None,
+                 snapshot_path=None):
+        self.models_path = models_path or os.getenv(
+            'MODELS_PATH', os.path.join(BASE_DIR, 'models', 'football_models.joblib'))
+        self.data_path = data_path or os.getenv(
+            'DATA_PATH', os.path.join(BASE_DIR, 'data', 'processed', 'processed_data.pkl'))
+        # The slim serving snapshot is preferred; the engineered frame is the fallback
+        self.snapshot_path = snapshot_path or os.getenv(
+            'SNAPSHOT_PATH', os.path.join(BASE_DIR, 'models', 'serving_snapshot.npz'))
+        self.scoreline_path = scoreline_path or os.getenv(
+            'SCORELINE_PATH', os.path.join(BASE_DIR, 'models', 'scoreline_model.joblib'))
+        self.manifest_path = manifest_path or os.getenv(
+            'MANIFEST_PATH', os.path.join(BASE_DIR, 'models', 'manifest.json'))
+        self.team_cache_path = os.getenv(
+            'TEAM_CACHE_PATH', os.path.join(BASE_DIR, 'data', 'processed', 'team_resolution_cache.json'))
+        self.cache = cache or PredictionCache(
+            maxsize=int(os.getenv('PREDICTION_CACHE_SIZE', '2048')),
+            ttl=float(os.getenv('PREDICTION_CACHE_TTL', '600'))
+        )
+
+        self._bundle = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._listeners = []
+        self._watcher = None
+        self.last_error = None
+        self.reloads = 0
+        self.state = 'cold'
+        self.warm_up_seconds = None
+        self._prewarm_thread = None
+        on_scrape(self._update_metrics)
+
+    def _update_metrics(self):
+        stats = self.cache.stats()
+        CACHE_HIT_RATIO.set(stats['hit_ratio'])
+        CACHE_SIZE.set(stats['size'])
+
+    def _load_bundle(self):
+        """Load artifacts from disk into a new bundle."""
+        start = time.perf_counter()
+
+        import joblib
+        from footy.artifact_manifest import artifact_path, load_manifest
+        from footy.predictor_utils import MatchPredictor
+        from footy.scoreline_model import load_scoreline_model
+        from footy.serving_snapshot import load_snapshot
+        from footy.team_resolver import TeamResolver
+
+        if os.path.exists(self.manifest_path):
+            # Exactly the set of files one training run listed, checked against their hashes
+            manifest = load_manifest(self.manifest_path)
+            artifacts = manifest['artifacts']
+            models_path = artifact_path(self.manifest_path, manifest, 'models')
+            scoreline_path = (artifact_path(self.manifest_path, manifest, 'scoreline')
+                              if 'scoreline' in artifacts else None)
+            data_name = 'snapshot' if 'snapshot' in artifacts else 'data'
+            data_path = artifact_path(self.manifest_path, manifest, data_name)
+            model_version = artifacts['models']['version']
+            if scoreline_path is not None:
+                model_version += f"-{artifacts['scoreline']['version']}"
+            data_version = artifacts[data_name]['version']
+        else:
+            # No manifest (artifacts copied in by hand): the configured files, versioned by mtime
+            models_path = self.models_path
+            scoreline_path = self.scoreline_path if os.path.exists(self.scoreline_path) else None
+            data_name = 'snapshot' if os.path.exists(self.snapshot_path) else 'data'
+            data_path = self.snapshot_path if data_name == 'snapshot' else self.data_path
+            model_version = str(os.stat(models_path).st_mtime_ns)
+            if scoreline_path is not None:
+                model_version += f"-{os.stat(scoreline_path).st_mtime_ns}"
+            data_version = str(os.stat(data_path).st_mtime_ns)
+
+        # MatchPredictor sanitises the unpickled models once, here at load time
+        models = joblib.load(models_path)
+        scoreline_model = load_scoreline_model(scoreline_path) if scoreline_path else None
+
+        predictor_options = dict(scoreline_model=scoreline_model,
+                                 scoreline_weight=float(os.getenv('SCORELINE_WEIGHT', '0.25')),
+                                 cache=self.cache, model_version=model_version)
+
+        if data_name == 'snapshot':
+            snapshot = load_snapshot(data_path)
+            predictor = MatchPredictor.from_snapshot(snapshot, models, data_version=data_version,
+                                                     **predictor_options)
+            teams = snapshot['teams']
+            leagues = snapshot['leagues']
+        else:
+            df_engineered = joblib.load(data_path)
+            predictor = MatchPredictor(df_engineered, models, data_version=data_version, **predictor_options)
+            teams = sorted(set(df_engineered['HomeTeam'].unique()) | set(df_engineered['AwayTeam'].unique()))
+            leagues = {}
+            if 'League' in df_engineered.columns:
+                latest = df_engineered.drop_duplicates('HomeTeam', keep='last')
+                leagues = dict(zip(latest['HomeTeam'], latest['League'].astype(str)))
+
+        resolver = TeamResolver(teams, cache_path=self.team_cache_path)
+
+        load_seconds = time.perf_counter() - start
+        MODEL_LOAD_SECONDS.set(load_seconds)
+        return ModelBundle(predictor, teams, model_version, data_version, load_seconds, resolver, leagues)
+
+    def add_listener(self, callback):
+        """Call ``callback(bundle)`` whenever a bundle is loaded (now, if one already is)."""
+        self._listeners.append(callback)
+        if self._bundle is not None:
+            callback(self._bundle)
+
+    def _publish(self, bundle):
+        # A single reference assignment: requests that already hold the old
+        # bundle finish on it, new requests see the new one
+        self._bundle = bundle
+        self.cache.prune(lambda key: key[2:] == (bundle.model_version, bundle.data_version))
+        for callback in self._listeners:
+            try:
+                callback(bundle)
+            except Exception as e:
+                print(f"Warning in registry listener: {str(e)}")
+
+    def get(self):
+        """Return the loaded bundle, loading it on first use; None if loading fails."""
+        bundle = self._bundle
+        if bundle is not None:
+            return bundle
+
+        with self._lock:
+            if self._bundle is None:
+                self.state = 'loading'
+                try:
+                    print("Loading models and data...")
+                    bundle = self._load_bundle()
+                    self.last_error = None
+                    MODEL_LOADS.labels(outcome='loaded').inc()
+                    print(f"✅ Loaded {len(bundle.teams)} teams in {bundle.load_seconds:.2f}s.")
+                    self._publish(bundle)
+                    self.state = 'loaded'
+                except Exception as e:
+                    self.state = 'failed'
+                    self.last_error = str(e)
+                    MODEL_LOADS.labels(outcome='failed').inc()
+                    print(f"❌ Error loading models or data: {str(e)}")
+            return self._bundle
+
+    def current(self):
+        """The loaded bundle, or None; never loads."""
+        return self._bundle
+
+    def warm_up(self):
+        """Load the bundle if needed and run one smoke prediction through it."""
+        start = time.perf_counter()
+        bundle = self.get()
+        if bundle is None:
+            return None
+
+        self.state = 'warming'
+        try:
+            self._validate(bundle, None)
+            self.state = 'ready'
+        except Exception as e:
+            self.state = 'loaded'
+            print(f"Warning: warm-up prediction failed: {str(e)}")
+        self.warm_up_seconds = time.perf_counter() - start
+        print(f"✅ Models warm in {self.warm_up_seconds:.2f}s.")
+        return bundle
+
+    def prewarm(self):
+        """Run warm_up() on a daemon thread, unless a bundle is loaded or a warm-up is running."""
+        with self._reload_lock:
+            if self._bundle is not None:
+                return None
+            if self._prewarm_thread is None or not self._prewarm_thread.is_alive():
+                self._prewarm_thread = threading.Thread(target=self.warm_up, name='model-prewarm', daemon=True)
+                self._prewarm_thread.start()
+            return self._prewarm_thread
+
+    def wait_until_ready(self, timeout=None):
+        """Block until a running warm-up finishes (loading now if none ran); returns the bundle."""
+        thread = self._prewarm_thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        return self.get()
+
+    def status(self):
+        """Readiness report: warm-up state, timings and the versions being served."""
+        bundle = self._bundle
+        return {
+            'ready': bundle is not None,
+            'state': self.state,
+            'model_version': bundle.model_version if bundle else None,
+            'data_version': bundle.data_version if bundle else None,
+            'load_seconds': bundle.load_seconds if bundle else None,
+            'warm_up_seconds': self.warm_up_seconds,
+            'error': self.last_error
+        }
+
+    def artifact_signature(self):
+        """
+        (path, mtime, size) of the artifact manifest, used to detect new versions.
+
+        Training writes the manifest after every artifact it lists, so only
+        a manifest change means a complete new set is on disk.
+        """
+        try:
+            stat = os.stat(self.manifest_path)
+            return self.manifest_path, stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return self.manifest_path, None, None
+
+    def _validate(self, bundle, warm_fixtures):
+        """Smoke-test a freshly loaded bundle and warm its code paths."""
+        predictor = bundle.predictor
+        fixtures = warm_fixtures or [(bundle.teams[0], bundle.teams[-1])]
+        fixtures = [f for f in fixtures if f[0] in predictor._home_rows and f[1] in predictor._away_rows]
+        if not fixtures:
+            home = next(iter(predictor._home_rows))
+            away = next(iter(predictor._away_rows))
+            fixtures = [(home, away)]
+
+        results = predictor._predict_batch(fixtures)
+        if not any(predictions for predictions, _ in results):
+            raise ValueError("smoke prediction returned no results")
+
+        return fixtures, results
+
+    def reload(self):
+        """
+        Load the current artifacts into a new bundle, validate it and swap it in.
+
+        The old bundle keeps serving until the swap; if loading or validation
+        fails it stays in place.
+
+        Returns:
+            True if a new bundle was swapped in
+        """
+        with self._reload_lock:
+            try:
+                print("🔄 Reloading models and data...")
+                bundle = self._load_bundle()
+
+                # Warm the new predictor on the fixtures users are asking for right now
+                hot = list(dict.fromkeys(key[:2] for key in self.cache.hot_keys(256)))
+                fixtures, results = self._validate(bundle, hot)
+                for (home, away), result in zip(fixtures, results):
+                    if result[0] is not None:
+                        self.cache.put(bundle.predictor._cache_key(home, away), result)
+
+                with self._lock:
+                    self._publish(bundle)
+                self.reloads += 1
+                self.last_error = None
+                MODEL_LOADS.labels(outcome='reloaded').inc()
+                print(f"✅ Swapped in models {bundle.model_version} / data {bundle.data_version} "
+                      f"(loaded in {bundle.load_seconds:.2f}s).")
+                return True
+
+            except Exception as e:
+                self.last_error = str(e)
+                MODEL_LOADS.labels(outcome='failed').inc()
+                print(f"❌ Reload failed, keeping current models: {str(e)}")
+                return False
+
+    def reload_in_background(self):
+        """Run reload() on a daemon thread."""
+        thread = threading.Thread(target=self.reload, name='model-reload', daemon=True)
+        thread.start()
+        return thread
+
+    def start_watcher(self, interval=30.0):
+        """Poll the artifact manifest and hot-reload when it changes."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+        self._watcher = ArtifactWatcher(self, interval)
+        self._watcher.start()
+        return self._watcher
+
+    @property
+    def predictor(self):
+        bundle = self.get()
+        return bundle.predictor if bundle else None
+
+    @property
+    def teams(self):
+        bundle = self.get()
+        return bundle.teams if bundle else []
+
+
+class ArtifactWatcher(threading.Thread):
+    """Background thread that reloads the registry when the artifact manifest changes."""
+
+    def __init__(self, registry, interval=30.0):
+        super().__init__(name='artifact-watcher', daemon=True)
+        self.registry = registry
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        current = self.registry.artifact_signature()
+
+        while not self._stop_event.wait(self.interval):
+            signature = self.registry.artifact_signature()
+            if signature == current or signature[1] is None:
+                continue
+
+            # Remember the signature even on failure so a bad artifact set is
+            # not retried every poll; the next training run rewrites the manifest
+            self.registry.reload()
+            current = signature
+
+
+registry = ModelRegistry()
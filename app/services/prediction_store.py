@@ -0,0 +1,312 @@
+# services/prediction_store.py
+import json
+import os
+import queue
+import threading
+import time
+from datetime import date, datetime, timezone
+
+from sqlalchemy import (Column, Date, DateTime, Float, Index, Integer, MetaData, String, Table, Text,
+                        and_, case, create_engine, event, func, insert, or_, select, tuple_, union_all,
+                        update)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+metadata = MetaData()
+
+predictions_table = Table(
+    'predictions', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('created_at', DateTime, nullable=False),
+    Column('match_date', Date, nullable=False),
+    Column('league', String(64)),
+    Column('home_team', String(64), nullable=False),
+    Column('away_team', String(64), nullable=False),
+    Column('model_version', String(64)),
+    Column('data_version', String(64)),
+    Column('source', String(16), nullable=False),
+    Column('external_id', String(32)),
+    Column('predicted_outcome', String(16)),
+    Column('p_home', Float),
+    Column('p_draw', Float),
+    Column('p_away', Float),
+    Column('p_over_1_5', Float),
+    Column('p_over_2_5', Float),
+    Column('p_btts', Float),
+    Column('predictions', Text),
+    Column('probabilities', Text),
+    Column('home_score', Integer),
+    Column('away_score', Integer),
+    # History is read newest first within a filter, so every index ends in
+    # (match_date, id) and keyset pages are index range scans
+    Index('ix_predictions_date', 'match_date', 'id'),
+    Index('ix_predictions_league_date', 'league', 'match_date', 'id'),
+    Index('ix_predictions_home_date', 'home_team', 'match_date', 'id'),
+    Index('ix_predictions_away_date', 'away_team', 'match_date', 'id'),
+    Index('ix_predictions_model_date', 'model_version', 'match_date', 'id'),
+    # Every worker predicts the same live fixtures; keep one row per model version
+    Index('ux_predictions_external', 'external_id', 'model_version', 'data_version', unique=True),
+)
+
+MAX_PAGE_SIZE = 200
+
+
+def _percent(value):
+    """'45.10%' -> 0.451 (probabilities are stored as display strings)."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).rstrip('%')) / 100
+    except ValueError:
+        return None
+
+
+def _as_date(value):
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).date()
+
+
+def prediction_row(home_team, away_team, predictions, probabilities=None, source='manual', league=None,
+                   match_date=None, model_version=None, data_version=None, external_id=None):
+    """Build one table row from a (predictions, probabilities) pair as returned by MatchPredictor."""
+    probabilities = probabilities or {}
+    outcome = probabilities.get('Match Outcome') or {}
+    return {
+        'created_at': datetime.now(timezone.utc).replace(tzinfo=None),
+        'match_date': _as_date(match_date),
+        'league': league,
+        'home_team': home_team,
+        'away_team': away_team,
+        'model_version': model_version,
+        'data_version': data_version,
+        'source': source,
+        'external_id': str(external_id) if external_id is not None else None,
+        'predicted_outcome': (predictions or {}).get('Match Outcome'),
+        'p_home': _percent(outcome.get('Home Win')),
+        'p_draw': _percent(outcome.get('Draw')),
+        'p_away': _percent(outcome.get('Away Win')),
+        'p_over_1_5': _percent(probabilities.get('Over 1.5 Goals')),
+        'p_over_2_5': _percent(probabilities.get('Over 2.5 Goals')),
+        'p_btts': _percent(probabilities.get('Both Teams to Score')),
+        'predictions': json.dumps(predictions or {}),
+        'probabilities': json.dumps(probabilities),
+        'home_score': None,
+        'away_score': None
+    }
+
+
+class PredictionStore:
+    """
+    SQLite-backed prediction history.
+
+    Hot paths (batch and live predictions) hand rows to ``enqueue``; a
+    writer thread inserts them in batches, one transaction per flush.
+    History reads use keyset pagination on (match_date, id), so a page
+    costs the same however deep it is and however many rows are stored.
+    """
+
+    def __init__(self, url=None, flush_interval=1.0, flush_size=500):
+        """
+        Args:
+            url: SQLAlchemy URL (default: PREDICTIONS_DB_URL or data/predictions.db)
+            flush_interval: Seconds the writer waits to gather a batch
+            flush_size: Rows that trigger an immediate flush
+        """
+        self.url = url or os.getenv(
+            'PREDICTIONS_DB_URL', f"sqlite:///{os.path.join(BASE_DIR, 'data', 'predictions.db')}")
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+
+        if self.url.startswith('sqlite:///'):
+            os.makedirs(os.path.dirname(os.path.abspath(self.url[len('sqlite:///'):])), exist_ok=True)
+        self.engine = create_engine(self.url, connect_args={'timeout': 30} if self.url.startswith('sqlite') else {})
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', self._sqlite_pragmas)
+        metadata.create_all(self.engine)
+        # Do not hand pooled connections opened here to forked workers
+        self.engine.dispose()
+
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self.written = 0
+
+    @staticmethod
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run while a worker writes; NORMAL sync is safe under WAL
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+    def add_many(self, rows):
+        """Insert rows in one transaction; returns the number inserted."""
+        rows = list(rows)
+        if not rows:
+            return 0
+        statement = insert(predictions_table)
+        if self.engine.dialect.name == 'sqlite':
+            statement = statement.prefix_with('OR IGNORE')
+        with self.engine.begin() as conn:
+            conn.execute(statement, rows)
+        self.written += len(rows)
+        return len(rows)
+
+    def add(self, row):
+        """Insert one row and return its id."""
+        with self.engine.begin() as conn:
+            result = conn.execute(insert(predictions_table).values(**row))
+        self.written += 1
+        return result.inserted_primary_key[0]
+
+    def enqueue(self, rows):
+        """Queue rows for the background writer (started on first use)."""
+        for row in rows:
+            self._queue.put(row)
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name='prediction-writer', daemon=True)
+                self._writer.start()
+
+    def _drain(self, first):
+        """Gather rows for up to flush_interval seconds or flush_size rows."""
+        rows = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(rows) < self.flush_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                rows.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return rows
+
+    def _write_loop(self):
+        while True:
+            rows = self._drain(self._queue.get())
+            try:
+                self.add_many(rows)
+            except Exception as e:
+                print(f"❌ Failed to store {len(rows)} predictions: {str(e)}")
+
+    def flush(self):
+        """Write everything queued so far from the calling thread."""
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return self.add_many(rows)
+
+    def record_result(self, prediction_id, home_score, away_score):
+        """Attach the final score to a stored prediction; False if it does not exist."""
+        with self.engine.begin() as conn:
+            result = conn.execute(update(predictions_table)
+                                  .where(predictions_table.c.id == prediction_id)
+                                  .values(home_score=home_score, away_score=away_score))
+        return result.rowcount > 0
+
+    @staticmethod
+    def _row_dict(row):
+        data = dict(row._mapping)
+        data['predictions'] = json.loads(data['predictions'] or '{}')
+        data['probabilities'] = json.loads(data['probabilities'] or '{}')
+        data['match_date'] = data['match_date'].isoformat()
+        data['created_at'] = data['created_at'].isoformat()
+        return data
+
+    @staticmethod
+    def encode_cursor(row):
+        return f"{row['match_date']}_{row['id']}"
+
+    @staticmethod
+    def decode_cursor(cursor):
+        match_date, prediction_id = cursor.rsplit('_', 1)
+        return date.fromisoformat(match_date), int(prediction_id)
+
+    def _filters(self, league=None, team=None, model_version=None, date_from=None, date_to=None):
+        """WHERE conditions except the team filter, which query() splits per side."""
+        c = predictions_table.c
+        conditions = []
+        if league:
+            conditions.append(c.league == league)
+        if model_version:
+            conditions.append(c.model_version == model_version)
+        if date_from:
+            conditions.append(c.match_date >= _as_date(date_from))
+        if date_to:
+            conditions.append(c.match_date <= _as_date(date_to))
+        return conditions
+
+    def query(self, limit=50, cursor=None, team=None, **filters):
+        """
+        One page of predictions, newest match date first.
+
+        Args:
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            cursor: ``next_cursor`` of the previous page
+            team: Only fixtures this team plays in (home or away)
+            **filters: league, model_version, date_from, date_to
+
+        Returns:
+            {'predictions': [...], 'next_cursor': str or None}
+        """
+        c = predictions_table.c
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        conditions = self._filters(**filters)
+        if cursor:
+            # Row-value comparison, so SQLite seeks straight into the index
+            conditions.append(tuple_(c.match_date, c.id) < tuple_(*self.decode_cursor(cursor)))
+        order = (c.match_date.desc(), c.id.desc())
+
+        if team:
+            # Two index-ordered scans (home side, away side) merged, instead of
+            # an OR that has to sort every match the team ever played
+            sides = [select(predictions_table).where(side == team, *conditions).order_by(*order).limit(limit + 1)
+                     for side in (c.home_team, c.away_team)]
+            merged = union_all(*(side.subquery().select() for side in sides)).subquery()
+            statement = select(merged).order_by(merged.c.match_date.desc(), merged.c.id.desc()).limit(limit + 1)
+        else:
+            statement = select(predictions_table).where(*conditions).order_by(*order).limit(limit + 1)
+
+        with self.engine.connect() as conn:
+            rows = [self._row_dict(row) for row in conn.execute(statement)]
+
+        next_cursor = self.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return {'predictions': rows[:limit], 'next_cursor': next_cursor}
+
+    def accuracy(self, team=None, **filters):
+        """Hit rates of stored predictions that have a final score."""
+        c = predictions_table.c
+        total_goals = c.home_score + c.away_score
+        actual_outcome = case((c.home_score > c.away_score, 'Home Win'),
+                              (c.home_score < c.away_score, 'Away Win'), else_='Draw')
+
+        def hit_rate(hit):
+            return func.avg(case((hit, 1.0), else_=0.0))
+
+        statement = select(
+            func.count().label('settled'),
+            hit_rate(c.predicted_outcome == actual_outcome).label('match_outcome'),
+            hit_rate((c.p_over_2_5 > 0.5) == (total_goals > 2)).label('over_2_5'),
+            hit_rate((c.p_btts > 0.5) == and_(c.home_score > 0, c.away_score > 0)).label('btts'),
+        ).where(c.home_score.is_not(None), c.away_score.is_not(None), *self._filters(**filters))
+        if team:
+            statement = statement.where(or_(c.home_team == team, c.away_team == team))
+
+        with self.engine.connect() as conn:
+            return dict(conn.execute(statement).one()._mapping)
@@ -0,0 +1,95 @@
+# services/shared_snapshot.py
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: every process polls for itself
+    fcntl = None
+
+
+class SharedSnapshot:
+    """
+    Live-matches payload shared by every worker process through a file.
+
+    One process at a time holds an exclusive lock on ``<path>.lock`` and
+    is the only one calling upstream; it publishes each payload to
+    ``path`` with an atomic rename and the others read it from there. The
+    OS drops the lock when its holder exits, and the next worker to ask
+    takes over the polling.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: JSON file the snapshot is published to
+        """
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self._lock_file = None
+        self._seen = None  # (mtime_ns, size) of the last file read or written
+
+    @property
+    def leading(self):
+        return self._lock_file is not None
+
+    def try_lead(self):
+        """Take the poller lock if no other process holds it; True if this process holds it."""
+        if self._lock_file is not None:
+            return True
+        if fcntl is None:
+            return True
+
+        os.makedirs(os.path.dirname(self.lock_path) or '.', exist_ok=True)
+        lock_file = open(self.lock_path, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def resign(self):
+        """Release the poller lock so another process can take over."""
+        lock_file, self._lock_file = self._lock_file, None
+        if lock_file is not None:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def publish(self, payload, fetched_at):
+        """Write the payload for the other workers (atomically)."""
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'fetched_at': fetched_at, 'payload': payload}, f)
+            os.replace(tmp_path, self.path)
+            self._seen = self._stat()
+        except OSError as e:
+            print(f"Warning: could not publish live snapshot {self.path}: {str(e)}")
+
+    def read_if_changed(self):
+        """
+        Returns:
+            (payload, fetched_at) if the file changed since the last read
+            or write in this process, otherwise None
+        """
+        seen = self._stat()
+        if seen is None or seen == self._seen:
+            return None
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._seen = seen
+        return data['payload'], data['fetched_at']
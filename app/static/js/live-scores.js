@@ -2,16 +2,60 @@
 
 class LiveScoresManager {
     constructor() {
-        this.updateInterval = 180000; // Update every minute
+        this.updateInterval = 180000; // Polling fallback when EventSource is unavailable
         this.container = document.getElementById('liveScores');
+        this.matches = new Map();
         this.init();
     }
 
     async init() {
+        if (window.EventSource) {
+            this.connectStream();
+            return;
+        }
+        await this.startPolling();
+    }
+
+    async startPolling() {
         await this.updateScores();
         setInterval(() => this.updateScores(), this.updateInterval);
     }
 
+    connectStream() {
+        // One shared server-side poll; the server pushes a snapshot, then deltas.
+        // EventSource reconnects by itself and the server resends a snapshot.
+        this.showLoading();
+        const source = new EventSource('/api/live-stream');
+
+        source.addEventListener('snapshot', (event) => {
+            const data = JSON.parse(event.data);
+            this.matches = new Map(data.matches.map(match => [match.id, match]));
+            this.render();
+        });
+
+        source.addEventListener('delta', (event) => {
+            const data = JSON.parse(event.data);
+            data.changed.forEach(match => this.matches.set(match.id, match));
+            data.removed.forEach(id => this.matches.delete(id));
+            this.render();
+        });
+
+        source.onerror = () => {
+            // A refused stream (503: no free threads) is closed for good: poll instead
+            if (source.readyState === EventSource.CLOSED) {
+                console.warn('Live stream unavailable, polling instead');
+                this.startPolling();
+                return;
+            }
+            console.warn('Live stream interrupted, reconnecting...');
+        };
+    }
+
+    render() {
+        this.displayScores(Array.from(this.matches.values()));
+        this.updateLastUpdated();
+    }
+
     async updateScores() {
     try {
         this.showLoading();
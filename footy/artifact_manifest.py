@@ -0,0 +1,85 @@
+# footy/artifact_manifest.py
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict
+
+MANIFEST_FORMAT = 1
+
+
+def file_sha256(path) -> str:
+    """SHA-256 of a file's contents, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(2 ** 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_manifest(path, artifacts: Dict[str, str]) -> Dict:
+    """
+    Record one consistent set of training outputs for the web app.
+
+    main.py writes the manifest after every artifact it lists, so a
+    serving process that reloads on a manifest change never pairs new
+    models with the previous run's snapshot.
+
+    Args:
+        path: Manifest file (models/manifest.json)
+        artifacts: Artifact name ('models', 'scoreline', 'snapshot',
+            'data') -> file path; missing files are left out
+
+    Returns:
+        The manifest written
+    """
+    path = str(path)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    entries = {}
+    for name, artifact_path in artifacts.items():
+        artifact_path = str(artifact_path)
+        if not os.path.exists(artifact_path):
+            continue
+        sha256 = file_sha256(artifact_path)
+        entries[name] = {
+            'file': os.path.relpath(os.path.abspath(artifact_path), base_dir),
+            'size': os.path.getsize(artifact_path),
+            'sha256': sha256,
+            'version': sha256[:12]
+        }
+
+    manifest = {'format': MANIFEST_FORMAT, 'created_at': time.time(), 'artifacts': entries}
+    os.makedirs(base_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    print(f"Artifact manifest saved to {path} ({', '.join(sorted(entries))})")
+    return manifest
+
+
+def load_manifest(path) -> Dict:
+    """Read a manifest written by ``write_manifest``."""
+    with open(str(path)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != MANIFEST_FORMAT:
+        raise ValueError(f"Unsupported manifest format {manifest.get('format')}")
+    return manifest
+
+
+def artifact_path(manifest_path, manifest: Dict, name: str) -> str:
+    """
+    Path of a listed artifact, after checking it is still the file the
+    manifest recorded.
+
+    Raises:
+        KeyError: the manifest does not list ``name``
+        ValueError: the file changed since the manifest was written
+            (e.g. a newer training run is still writing its outputs)
+    """
+    entry = manifest['artifacts'][name]
+    path = os.path.join(os.path.dirname(os.path.abspath(str(manifest_path))), entry['file'])
+    if not os.path.exists(path) or os.path.getsize(path) != entry['size'] or file_sha256(path) != entry['sha256']:
+        raise ValueError(f"{entry['file']} does not match the manifest")
+    return path
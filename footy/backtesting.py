@@ -0,0 +1,330 @@
+# footy/backtesting.py
+
+import time
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Optional, Sequence
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.model_selection import TimeSeriesSplit
+
+from footy.model_training import FootballPredictor
+
+TASKS = ('match_outcome', 'over_1_5', 'over_2_5', 'btts')
+
+# Column holding the predicted probability of each task's positive class
+PROBABILITY_COLUMNS = {'over_1_5': 'p_over_1_5', 'over_2_5': 'p_over_2_5', 'btts': 'p_btts'}
+OUTCOME_COLUMNS = ['p_home', 'p_draw', 'p_away']
+FIXTURE_COLUMNS = ['Date', 'League', 'Season', 'HomeTeam', 'AwayTeam']
+
+_EPS = 1e-15
+
+
+def _prior_rolling(values: pd.DataFrame, keys: pd.Series, window: int, how: str = 'mean') -> pd.DataFrame:
+    """
+    Rolling statistic over each key's previous rows, excluding the current one.
+
+    ``values`` must already be in date order; the result keeps its index.
+    """
+    grouped = values.groupby(keys, sort=False)
+    shifted = grouped.shift(1)
+    rolled = getattr(shifted.groupby(keys, sort=False).rolling(window, min_periods=1), how)()
+    return rolled.reset_index(level=0, drop=True).sort_index()
+
+
+def point_in_time_features(df: pd.DataFrame, window: int = 5) -> pd.DataFrame:
+    """
+    Build the model features from raw (cleaned, unscaled) match data using
+    only matches played before each fixture.
+
+    The training pipeline's rolling windows include the match itself, which
+    leaks the result into its own features; here every rolling statistic is
+    shifted by one match per team, so a row only sees its team's history.
+
+    Args:
+        df: Cleaned match data (Date, League, Season, teams, goals, shots, fouls)
+        window: Number of previous home/away matches per team
+
+    Returns:
+        Date-ordered DataFrame with the FootballPredictor feature columns and
+        the targets of every task
+    """
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'])
+    df = df.sort_values('Date', kind='mergesort').reset_index(drop=True)
+
+    teams = sorted(pd.concat([df['HomeTeam'], df['AwayTeam']]).unique())
+    encodings = {team: idx for idx, team in enumerate(teams)}
+
+    total_goals = df['FTHG'] + df['FTAG']
+    features = pd.DataFrame({
+        'Date': df['Date'],
+        'League': df.get('League'),
+        'Season': df.get('Season'),
+        'HomeTeam': df['HomeTeam'],
+        'AwayTeam': df['AwayTeam'],
+        'HomeTeam_encoded': df['HomeTeam'].map(encodings),
+        'AwayTeam_encoded': df['AwayTeam'].map(encodings),
+    })
+
+    for side, team_col, goals_for, goals_against, shots, on_target, fouls, win in (
+            ('Home', 'HomeTeam', 'FTHG', 'FTAG', 'HS', 'HST', 'HF', 'H'),
+            ('Away', 'AwayTeam', 'FTAG', 'FTHG', 'AS', 'AST', 'AF', 'A')):
+        match_stats = pd.DataFrame({
+            'Form': df['FTR'].map({win: 1.0, 'D': 0.5}).fillna(0.0),
+            'GoalsFor': df[goals_for].astype(float),
+            'GoalsAgainst': df[goals_against].astype(float),
+            'ShotAccuracy': (df[on_target] / df[shots].where(df[shots] > 0)),
+            'Fouls': df[fouls].astype(float),
+            'Over1.5': (total_goals > 1.5).astype(float),
+            'Over2.5': (total_goals > 2.5).astype(float),
+            'TotalGoals': total_goals.astype(float),
+        })
+        means = _prior_rolling(match_stats, df[team_col], window)
+        variance = _prior_rolling(match_stats[['TotalGoals']], df[team_col], window, how='std')
+
+        features[f'{side}TeamForm'] = means['Form']
+        features[f'{side}GoalsScoredAvg_5'] = means['GoalsFor']
+        features[f'{side}GoalsConcededAvg_5'] = means['GoalsAgainst']
+        features[f'{side}ShotAccuracyRolling'] = means['ShotAccuracy']
+        features[f'{side}FoulsAvg'] = means['Fouls']
+        features[f'{side}ScoringRate_5'] = means['GoalsFor']
+        features[f'{side}ConcedingRate_5'] = means['GoalsAgainst']
+        features[f'{side}OverRate1.5_5'] = means['Over1.5']
+        features[f'{side}OverRate2.5_5'] = means['Over2.5']
+        features[f'{side}TotalGoalsRate_5'] = means['TotalGoals']
+        features[f'{side}GoalVariance_5'] = variance['TotalGoals']
+
+    features['match_outcome'] = df['FTR'].map({'H': 0, 'D': 1, 'A': 2})
+    features['over_1_5'] = (total_goals > 1.5).astype(int)
+    features['over_2_5'] = (total_goals > 2.5).astype(int)
+    features['btts'] = ((df['FTHG'] > 0) & (df['FTAG'] > 0)).astype(int)
+
+    predictor = FootballPredictor()
+    feature_names = predictor.base_features + predictor.goal_features
+    features[feature_names] = features[feature_names].fillna(0)
+    return features[features['match_outcome'].notna()].reset_index(drop=True)
+
+
+def default_model_factory(task: str):
+    """Fast gradient-boosted model per task, so frequent retrains stay cheap."""
+    return HistGradientBoostingClassifier(max_iter=150, learning_rate=0.05, max_depth=4,
+                                          l2_regularization=1.0, random_state=42)
+
+
+def _aligned_proba(model, X: np.ndarray, n_classes: int) -> np.ndarray:
+    """predict_proba with one column per class label 0..n_classes-1."""
+    proba = model.predict_proba(X)
+    classes = np.asarray(model.classes_).astype(int)
+    if len(classes) == n_classes and (classes == np.arange(n_classes)).all():
+        return proba
+    aligned = np.zeros((len(X), n_classes))
+    aligned[:, classes] = proba
+    return aligned
+
+
+class BacktestResult:
+    """Out-of-sample probabilities of a backtest and the metrics derived from them."""
+
+    def __init__(self, predictions: pd.DataFrame, tasks: Sequence[str], seconds: float = 0.0, fits: int = 0):
+        self.predictions = predictions
+        self.tasks = [task for task in tasks if task in predictions.columns]
+        self.seconds = seconds
+        self.fits = fits
+
+    def _scored(self, task: str) -> pd.DataFrame:
+        """Per-fixture hit, log-loss, Brier score and calibration pair for one task."""
+        df = self.predictions
+        if task == 'match_outcome':
+            proba = df[OUTCOME_COLUMNS].to_numpy()
+            y = df[task].to_numpy().astype(int)
+            rows = np.arange(len(df))
+            onehot = np.zeros_like(proba)
+            onehot[rows, y] = 1.0
+            hit = proba.argmax(axis=1) == y
+            # Top-label calibration: confidence of the predicted class vs. hit rate
+            prob, observed = proba.max(axis=1), hit.astype(float)
+            log_loss = -np.log(np.clip(proba[rows, y], _EPS, 1.0))
+            brier = ((proba - onehot) ** 2).sum(axis=1)
+        else:
+            p = df[PROBABILITY_COLUMNS[task]].to_numpy()
+            y = df[task].to_numpy().astype(float)
+            hit = (p > 0.5) == (y == 1)
+            prob, observed = p, y
+            clipped = np.clip(p, _EPS, 1 - _EPS)
+            log_loss = -(y * np.log(clipped) + (1 - y) * np.log(1 - clipped))
+            brier = (p - y) ** 2
+
+        scored = df[[column for column in FIXTURE_COLUMNS if column in df.columns]].copy()
+        scored['hit'] = hit.astype(float)
+        scored['log_loss'] = log_loss
+        scored['brier'] = brier
+        scored['prob'] = prob
+        scored['observed'] = observed
+        return scored
+
+    def calibration(self, task: str, bins: int = 10, by: Sequence[str] = ()) -> pd.DataFrame:
+        """
+        Reliability table: mean predicted probability vs. observed frequency per bin.
+
+        Args:
+            task: Task name
+            bins: Number of equal-width probability bins
+            by: Optional grouping columns, e.g. ('League',)
+        """
+        scored = self._scored(task)
+        scored['bin'] = np.minimum((scored['prob'] * bins).astype(int), bins - 1)
+        return (scored.groupby(list(by) + ['bin'], observed=True)
+                .agg(predicted=('prob', 'mean'), observed=('observed', 'mean'), count=('prob', 'size'))
+                .reset_index())
+
+    def summary(self, by: Sequence[str] = ('League', 'Season'), bins: int = 10) -> pd.DataFrame:
+        """
+        Accuracy, log-loss, Brier score and expected calibration error per group and task.
+
+        Returns:
+            Long DataFrame with one row per (group..., task)
+        """
+        by = list(by)
+        frames = []
+        for task in self.tasks:
+            scored = self._scored(task)
+            metrics = scored.groupby(by, observed=True).agg(
+                matches=('hit', 'size'), accuracy=('hit', 'mean'),
+                log_loss=('log_loss', 'mean'), brier=('brier', 'mean'))
+
+            table = self.calibration(task, bins=bins, by=by)
+            table['gap'] = (table['predicted'] - table['observed']).abs() * table['count']
+            totals = table.groupby(by, observed=True)[['gap', 'count']].sum()
+            metrics['ece'] = totals['gap'] / totals['count']
+
+            metrics['task'] = task
+            frames.append(metrics.reset_index())
+
+        columns = by + ['task', 'matches', 'accuracy', 'log_loss', 'brier', 'ece']
+        return pd.concat(frames, ignore_index=True)[columns] if frames else pd.DataFrame(columns=columns)
+
+
+class WalkForwardBacktest:
+    """
+    Replays history in date order, matchday period by matchday period.
+
+    Features are rebuilt point-in-time from the raw data, models are refit on
+    every fixture played before the current period (on a configurable
+    cadence), and all fixtures of a period are scored with one
+    ``predict_proba`` call per task instead of one ``predict_match`` call per
+    fixture.
+    """
+
+    def __init__(self, model_factory: Optional[Callable[[str], object]] = None, period: str = 'W',
+                 retrain_every: int = 4, min_train_matches: int = 1000, window: int = 5,
+                 tasks: Sequence[str] = TASKS):
+        """
+        Args:
+            model_factory: Callable task -> unfitted classifier (default: HistGradientBoosting)
+            period: pandas period alias grouping fixtures into matchdays ('W' = weekly)
+            retrain_every: Refit the models every this many periods
+            min_train_matches: Fixtures required before the first period is scored
+            window: Rolling window for the point-in-time features
+            tasks: Tasks to backtest
+        """
+        self.model_factory = model_factory or default_model_factory
+        self.period = period
+        self.retrain_every = max(1, int(retrain_every))
+        self.min_train_matches = min_train_matches
+        self.window = window
+        self.tasks = list(tasks)
+        predictor = FootballPredictor()
+        self.features = predictor.base_features + predictor.goal_features
+
+    def _fit(self, X: np.ndarray, targets: Dict[str, np.ndarray], end: int) -> Dict[str, object]:
+        models = {}
+        for task in self.tasks:
+            model = self.model_factory(task)
+            model.fit(X[:end], targets[task][:end])
+            models[task] = model
+        return models
+
+    def run(self, df: pd.DataFrame) -> BacktestResult:
+        """
+        Backtest on raw cleaned match data (e.g. ``merged_df_cleaned``).
+
+        Returns:
+            BacktestResult with one row per scored fixture
+        """
+        start_time = time.perf_counter()
+        data = point_in_time_features(df, self.window)
+
+        X = data[self.features].to_numpy(dtype=np.float32)
+        targets = {task: data[task].to_numpy().astype(int) for task in self.tasks}
+
+        # Rows are date-ordered, so every period is one contiguous slice
+        period_start = data['Date'].dt.to_period(self.period).dt.start_time.to_numpy()
+        starts = np.unique(period_start)
+        bounds = np.searchsorted(period_start, starts, side='left')
+        bounds = np.append(bounds, len(data))
+
+        proba = {task: np.full((len(data), 3 if task == 'match_outcome' else 2), np.nan) for task in self.tasks}
+        models, periods_since_fit, fits = None, 0, 0
+
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if lo < self.min_train_matches:
+                continue
+            if models is None or periods_since_fit >= self.retrain_every:
+                # Only fixtures played before this period
+                models = self._fit(X, targets, lo)
+                periods_since_fit, fits = 0, fits + 1
+            for task, model in models.items():
+                proba[task][lo:hi] = _aligned_proba(model, X[lo:hi], proba[task].shape[1])
+            periods_since_fit += 1
+
+        scored = ~np.isnan(proba[self.tasks[0]][:, 0])
+        predictions = data.loc[scored, FIXTURE_COLUMNS + self.tasks].copy()
+        for task in self.tasks:
+            if task == 'match_outcome':
+                predictions[OUTCOME_COLUMNS] = proba[task][scored]
+            else:
+                predictions[PROBABILITY_COLUMNS[task]] = proba[task][scored, 1]
+        predictions = predictions.reset_index(drop=True)
+
+        seconds = time.perf_counter() - start_time
+        print(f"✅ Backtest scored {len(predictions)} fixtures in {len(starts)} periods "
+              f"({fits} refits) in {seconds:.1f}s")
+        return BacktestResult(predictions, self.tasks, seconds=seconds, fits=fits)
+
+
+def backtest_fold_models(predictor: FootballPredictor, df: pd.DataFrame, n_splits: int = 5) -> BacktestResult:
+    """
+    Score each TimeSeriesSplit validation fold with the model trained for it.
+
+    Reuses ``predictor.fold_models`` from ``train_models`` instead of refitting,
+    so no retraining is needed; ``df`` must be the engineered frame the
+    predictor was trained on. Its features are the training pipeline's, so
+    unlike ``WalkForwardBacktest`` this is not strictly point-in-time.
+    """
+    start_time = time.perf_counter()
+    df = df.sort_values('Date')
+    X, y = predictor.prepare_data(df)
+    splits = list(TimeSeriesSplit(n_splits=n_splits).split(X))
+
+    val_rows = np.concatenate([val_idx for _, val_idx in splits])
+    predictions = df.iloc[val_rows][FIXTURE_COLUMNS].reset_index(drop=True)
+    tasks = [task for task in TASKS if task in y and len(predictor.fold_models.get(task, [])) == len(splits)]
+
+    for task in tasks:
+        y_task = y[task].to_numpy()
+        if task != 'match_outcome':
+            # Frames engineered before the flags were left unscaled hold scaled
+            # binary targets; either way the larger value is the positive class
+            y_task = (y_task == np.nanmax(y_task)).astype(int)
+        proba = np.vstack([_aligned_proba(model, X.iloc[val_idx], 3) if task == 'match_outcome'
+                           else model.predict_proba(X.iloc[val_idx])
+                           for model, (_, val_idx) in zip(predictor.fold_models[task], splits)])
+        predictions[task] = y_task[val_rows]
+        if task == 'match_outcome':
+            predictions[OUTCOME_COLUMNS] = proba
+        else:
+            predictions[PROBABILITY_COLUMNS[task]] = proba[:, 1]
+
+    seconds = time.perf_counter() - start_time
+    print(f"✅ Fold backtest scored {len(predictions)} fixtures in {seconds:.1f}s")
+    return BacktestResult(predictions, tasks, seconds=seconds)
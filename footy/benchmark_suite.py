@@ -0,0 +1,342 @@
+# footy/benchmark_suite.py
+#
+# Offline benchmarks of the pipeline stages on the bundled match data and
+# on scaled-up copies of it, compared against a JSON baseline:
+#   python -m footy.benchmark_suite --update-baseline     # record
+#   python -m footy.benchmark_suite --threshold 0.2       # exit 1 on a >20% regression
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from footy.benchmarks import _latency_summary, _time_calls
+
+DEFAULT_DATA_PATH = Path("data/processed/cleaned_euro_data.csv")
+DEFAULT_BASELINE_PATH = Path(os.getenv('BENCHMARK_BASELINE', 'benchmarks/baseline.json'))
+# Peak-memory growth below this is noise (e.g. predict_match peaks under 1 MB)
+MIN_MEMORY_DELTA_MB = 1.0
+STAGES = ['load_season_data', 'add_rolling_features', 'engineer_features', 'compact_dtypes',
+          'train_models', 'predict_match']
+
+
+class StageSkipped(Exception):
+    """A stage cannot run here (missing optional dependency or input)."""
+
+
+def scaled_matches(df: pd.DataFrame, scale: int) -> pd.DataFrame:
+    """
+    ``scale`` copies of the match data, each with its own teams and leagues.
+
+    Copies are renamed rather than appended to the same teams, so per-team
+    work grows with the number of teams like it would with more leagues.
+    """
+    if scale <= 1:
+        return df.copy()
+    copies = [df]
+    for k in range(1, scale):
+        copy = df.copy()
+        for column in ('HomeTeam', 'AwayTeam', 'League'):
+            copy[column] = copy[column].astype(str) + f" #{k}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def _measure(fn: Callable, repeats: int) -> Dict:
+    """
+    Peak traced memory of one run, then wall time of ``repeats`` more.
+
+    The traced run doubles as warm-up; tracemalloc slows allocation-heavy
+    code, so it is kept out of the timed runs.
+    """
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    return {
+        'best_s': float(min(times)),
+        'median_s': float(np.median(times)),
+        'peak_mb': peak / 2 ** 20,
+        'result': result
+    }
+
+
+class BenchmarkSuite:
+    """
+    Times load_season_data, add_rolling_features, engineer_features,
+    compact_dtypes, train_models and MatchPredictor.predict_match per
+    input scale.
+
+    Each stage feeds the next, as in main.py, so training and prediction
+    run on the compacted frame the pipeline trains on. Stages whose optional
+    dependencies are missing (openpyxl, xgboost, catboost, imblearn) are
+    reported as skipped; predict_match then falls back to the models
+    saved under MODELS_PATH.
+    """
+
+    def __init__(self, data_path=DEFAULT_DATA_PATH, scales: Sequence[int] = (1, 2),
+                 stages: Optional[Sequence[str]] = None, repeats: int = 3, train_repeats: int = 1,
+                 predict_calls: int = 2000, synthetic: bool = False):
+        """
+        Args:
+            data_path: Cleaned match CSV (the bundled cleaned_euro_data.csv)
+            scales: Input sizes as multiples of the bundled data
+            stages: Stages to run (default: all of STAGES)
+            repeats: Timed runs per stage
+            train_repeats: Timed runs of train_models, which takes minutes
+            predict_calls: predict_match calls timed per run
+            synthetic: Generate 22 * scale leagues with footy.synthetic_data
+                instead of copying the bundled data
+        """
+        self.data_path = Path(data_path)
+        self.scales = list(scales)
+        self.stages = list(stages or STAGES)
+        self.repeats = repeats
+        self.train_repeats = train_repeats
+        self.predict_calls = predict_calls
+        self.synthetic = synthetic
+
+    def _matches(self, scale: int) -> pd.DataFrame:
+        if self.synthetic:
+            from footy.synthetic_data import generate_matches
+            return generate_matches(leagues=22 * scale, teams_per_league=20, seasons=2, first_season=2023, seed=scale)
+        return scaled_matches(pd.read_csv(self.data_path), scale)
+
+    def _load_stage(self, matches: pd.DataFrame):
+        """load_season_data on per-league workbooks written from the matches."""
+        try:
+            import openpyxl  # noqa: F401
+            from footy.load_data import load_and_merge_seasons, load_season_data
+        except ImportError as e:
+            raise StageSkipped(str(e))
+
+        tmp = tempfile.TemporaryDirectory()
+        season_paths = {}
+        for season, season_df in matches.groupby('Season'):
+            path = Path(tmp.name) / f"{season}.xlsx"
+            with pd.ExcelWriter(path) as writer:
+                for league, league_df in season_df.groupby('League'):
+                    league_df.drop(columns=['Season', 'League']).to_excel(writer, sheet_name=str(league)[:31],
+                                                                         index=False)
+            season_paths[season] = path
+
+        # Newest season first, as main.py passes them
+        seasons = sorted(season_paths, reverse=True)
+        if len(seasons) != 2:
+            tmp.cleanup()
+            raise StageSkipped(f"load_and_merge_seasons merges two seasons, the data has {len(seasons)}")
+
+        def run():
+            data, _ = load_season_data(season_paths)
+            return load_and_merge_seasons(data[seasons[0]], data[seasons[1]])
+
+        return run, tmp
+
+    def _models_for_prediction(self, trained) -> Dict:
+        if trained is not None:
+            return trained.models
+        models_path = os.getenv('MODELS_PATH', 'models/football_models.joblib')
+        if not os.path.exists(models_path):
+            raise StageSkipped(f"no trained models (train_models skipped and {models_path} missing)")
+        import joblib
+        return joblib.load(models_path)
+
+    def run_scale(self, scale: int) -> Dict:
+        """Run the selected stages on ``scale`` copies of the data."""
+        from footy.feature_engineering import FootballFeatureEngineering
+        from footy.predictor_utils import MatchPredictor
+        from footy.rolling_features import RollingFeatureGenerator
+
+        matches = self._matches(scale)
+        rows = len(matches)
+        results = {}
+
+        def record(stage, fn, repeats, items=None):
+            if stage not in self.stages:
+                return None
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    measured = _measure(fn, repeats)
+            except StageSkipped as e:
+                results[stage] = {'skipped': str(e)}
+                print(f"  {stage:<22} skipped: {e}")
+                return None
+            items = items or rows
+            output = measured.pop('result')
+            measured['throughput_per_s'] = items / measured['best_s']
+            results[stage] = measured
+            print(f"  {stage:<22} best {measured['best_s'] * 1e3:10.1f} ms | median {measured['median_s'] * 1e3:10.1f} ms"
+                  f" | peak {measured['peak_mb']:8.1f} MB | {measured['throughput_per_s']:12.0f}/s")
+            return output
+
+        if 'load_season_data' in self.stages:
+            try:
+                run, tmp = self._load_stage(matches)
+                with tmp:
+                    record('load_season_data', run, self.repeats)
+            except StageSkipped as e:
+                results['load_season_data'] = {'skipped': str(e)}
+                print(f"  {'load_season_data':<22} skipped: {e}")
+
+        feature_engineering = FootballFeatureEngineering()
+        encoded = feature_engineering.encode_teams(matches.copy())
+        with_rolling = record('add_rolling_features',
+                              lambda: RollingFeatureGenerator().add_rolling_features(encoded.copy()), self.repeats)
+        if with_rolling is None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                with_rolling = RollingFeatureGenerator().add_rolling_features(encoded.copy())
+
+        downstream = {'compact_dtypes', 'train_models', 'predict_match'} & set(self.stages)
+        engineered = record('engineer_features',
+                            lambda: feature_engineering.engineer_features(with_rolling.copy()), self.repeats)
+        if engineered is None and downstream:
+            with contextlib.redirect_stdout(io.StringIO()):
+                engineered = feature_engineering.engineer_features(with_rolling.copy())
+
+        # main.py trains and serves from the compacted frame
+        compacted = record('compact_dtypes', lambda: feature_engineering.compact_dtypes(engineered), self.repeats)
+        if compacted is None and downstream:
+            compacted = feature_engineering.compact_dtypes(engineered)
+        engineered = compacted
+
+        def train():
+            try:
+                from footy.model_training import FootballPredictor
+            except ImportError as e:
+                raise StageSkipped(str(e))
+            predictor = FootballPredictor()
+            predictor.train_models(engineered)
+            return predictor
+
+        trained = record('train_models', train, self.train_repeats)
+
+        if 'predict_match' in self.stages:
+            try:
+                models = self._models_for_prediction(trained)
+            except StageSkipped as e:
+                results['predict_match'] = {'skipped': str(e)}
+                print(f"  {'predict_match':<22} skipped: {e}")
+            else:
+                predictor = MatchPredictor(engineered, models)
+                home_teams, away_teams = list(predictor._home_rows), list(predictor._away_rows)
+                calls = [(home_teams[i % len(home_teams)], away_teams[(i * 7 + 1) % len(away_teams)])
+                         for i in range(self.predict_calls)]
+                record('predict_match', lambda: _latency_summary(_time_calls(predictor._predict_match, calls)),
+                       self.repeats, items=len(calls))
+
+        return {'rows': rows, 'stages': results}
+
+    def run(self) -> Dict:
+        """Run every scale; returns the report written to the baseline file."""
+        report = {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__
+            },
+            'input': 'synthetic' if self.synthetic else str(self.data_path),
+            'scales': {}
+        }
+        for scale in self.scales:
+            print(f"Scale x{scale}:")
+            report['scales'][str(scale)] = self.run_scale(scale)
+        return report
+
+
+def compare(report: Dict, baseline: Dict, threshold: float = 0.2, memory_threshold: Optional[float] = None) -> List[str]:
+    """
+    Stages that got slower (best wall time) or hungrier (peak memory) than the baseline.
+
+    Args:
+        report: Result of BenchmarkSuite.run()
+        baseline: An earlier report
+        threshold: Allowed relative slowdown, e.g. 0.2 for 20%
+        memory_threshold: Allowed relative peak-memory growth (default: same as threshold)
+
+    Returns:
+        One message per regression; empty when everything is within bounds
+    """
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    regressions = []
+    for scale, current in report['scales'].items():
+        previous = baseline.get('scales', {}).get(scale)
+        if previous is None:
+            continue
+        for stage, now in current['stages'].items():
+            before = previous['stages'].get(stage)
+            if 'skipped' in now or not before or 'skipped' in before:
+                continue
+            for metric, limit in (('best_s', threshold), ('peak_mb', memory_threshold)):
+                if metric == 'peak_mb' and now[metric] - before[metric] < MIN_MEMORY_DELTA_MB:
+                    continue
+                if before[metric] > 0 and now[metric] > before[metric] * (1 + limit):
+                    regressions.append(f"x{scale} {stage}: {metric} {before[metric]:.4g} -> {now[metric]:.4g} "
+                                       f"(+{(now[metric] / before[metric] - 1) * 100:.0f}%, limit {limit * 100:.0f}%)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the football pipeline against a baseline.")
+    parser.add_argument('--data', default=str(DEFAULT_DATA_PATH), help="cleaned match CSV")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 2], help="input size multiples")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, help="stages to run (default: all)")
+    parser.add_argument('--synthetic', action='store_true',
+                        help="generate 22 x scale leagues instead of copying the bundled data")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE_PATH))
+    parser.add_argument('--threshold', type=float, default=float(os.getenv('BENCHMARK_THRESHOLD', '0.2')),
+                        help="allowed relative slowdown before failing")
+    parser.add_argument('--memory-threshold', type=float, default=None,
+                        help="allowed relative peak-memory growth (default: --threshold)")
+    parser.add_argument('--update-baseline', action='store_true', help="write this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    report = BenchmarkSuite(args.data, args.scales, args.stages, args.repeats, synthetic=args.synthetic).run()
+    baseline_path = Path(args.baseline)
+
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f"✅ Baseline written to {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline to record one.")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    if baseline.get('input', str(DEFAULT_DATA_PATH)) != report['input']:
+        print(f"Warning: baseline input {baseline.get('input')} differs from {report['input']}")
+    regressions = compare(report, baseline, args.threshold, args.memory_threshold)
+    for message in regressions:
+        print(f"❌ {message}")
+    if not regressions:
+        print(f"✅ No stage regressed beyond {args.threshold * 100:.0f}% of {baseline_path}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,441 @@
+# footy/benchmarks.py
+
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional
+
+
+def _latency_summary(samples: List[float]) -> Dict:
+    """Summarise a list of per-call latencies (seconds) in microseconds."""
+    samples_us = np.asarray(samples) * 1e6
+    return {
+        'calls': len(samples_us),
+        'mean_us': float(samples_us.mean()),
+        'p50_us': float(np.percentile(samples_us, 50)),
+        'p99_us': float(np.percentile(samples_us, 99))
+    }
+
+
+def _time_calls(fn: Callable, args_list: List[tuple]) -> List[float]:
+    """Time each call of ``fn`` individually."""
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def benchmark_team_lookup(predictor, teams: Optional[List[str]] = None, repeats: int = 200) -> Dict:
+    """
+    Compare indexed team-stat lookups with the full-frame scan.
+
+    Args:
+        predictor: MatchPredictor instance
+        teams: Teams to look up (default: every indexed home team)
+        repeats: Number of lookups per path
+
+    Returns:
+        Dict with the index build time and latency summaries for both paths
+    """
+    teams = teams or list(predictor._home_rows)
+    calls = [(teams[i % len(teams)], i % 2 == 0) for i in range(repeats)]
+
+    scan = _latency_summary(_time_calls(predictor._scan_team_stats, calls))
+    indexed = _latency_summary(_time_calls(predictor.get_team_stats, calls))
+
+    results = {
+        'index_build_ms': predictor.index_build_seconds * 1e3,
+        'scan': scan,
+        'indexed': indexed,
+        'speedup_p50': scan['p50_us'] / max(indexed['p50_us'], 1e-9)
+    }
+
+    print(f"Team index built in {results['index_build_ms']:.1f} ms")
+    print(f"Scan lookup:    p50 {scan['p50_us']:.1f} us, p99 {scan['p99_us']:.1f} us")
+    print(f"Indexed lookup: p50 {indexed['p50_us']:.1f} us, p99 {indexed['p99_us']:.1f} us")
+    print(f"Speedup (p50): {results['speedup_p50']:.0f}x")
+
+    return results
+
+
+def benchmark_batch_prediction(predictor, sizes=(1, 50, 500), repeats: int = 3) -> Dict:
+    """
+    Compare per-fixture predict_match calls with a single predict_batch call.
+
+    Args:
+        predictor: MatchPredictor instance
+        sizes: Fixture counts to benchmark
+        repeats: Runs per size; the fastest is reported
+
+    Returns:
+        Dict keyed by size with latency (ms) and throughput (fixtures/s) per path
+    """
+    home_teams = list(predictor._home_rows)
+    away_teams = list(predictor._away_rows)
+    results = {}
+
+    for size in sizes:
+        fixtures = [(home_teams[i % len(home_teams)], away_teams[(i * 7 + 1) % len(away_teams)])
+                    for i in range(size)]
+
+        loop_times, batch_times = [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for home, away in fixtures:
+                predictor.predict_match(home, away)
+            loop_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            predictor.predict_batch(fixtures)
+            batch_times.append(time.perf_counter() - start)
+
+        loop_s, batch_s = min(loop_times), min(batch_times)
+        results[size] = {
+            'loop_ms': loop_s * 1e3,
+            'batch_ms': batch_s * 1e3,
+            'loop_fixtures_per_s': size / loop_s,
+            'batch_fixtures_per_s': size / batch_s,
+            'speedup': loop_s / batch_s
+        }
+        print(f"{size:>5} fixtures: loop {loop_s * 1e3:9.1f} ms ({size / loop_s:8.0f}/s) | "
+              f"batch {batch_s * 1e3:9.1f} ms ({size / batch_s:8.0f}/s) | {loop_s / batch_s:5.1f}x")
+
+    return results
+
+
+def _predict_match_frame(predictor, models: Dict, home_team: str, away_team: str):
+    """
+    predict_match as it was before the array path (reference path): a
+    float64 row wrapped in a one-row DataFrame, the ``use_label_encoder``
+    check on every call and models that still validate column names.
+    """
+    import pandas as pd
+
+    scoreline_probs = None
+    if predictor.scoreline_model is not None:
+        home = predictor.team_mapper.standardize_name(home_team)
+        away = predictor.team_mapper.standardize_name(away_team)
+        if predictor.scoreline_model.has_team(home) and predictor.scoreline_model.has_team(away):
+            batch = predictor._scoreline_probabilities([home], [away])
+            scoreline_probs = {task: probs[0] for task, probs in batch.items()}
+
+    if scoreline_probs is not None and predictor.scoreline_weight >= 1.0:
+        return predictor._format_predictions(scoreline_probs)
+
+    home_vector = predictor.get_team_vector(home_team, is_home=True)
+    away_vector = predictor.get_team_vector(away_team, is_home=False)
+    if home_vector is None or away_vector is None:
+        return None, None
+
+    row = np.empty(len(predictor.features))
+    row[predictor._home_positions] = home_vector
+    row[predictor._away_positions] = away_vector
+    match_data = pd.DataFrame(row[None, :], columns=predictor.features)
+
+    task_probs = {}
+    for task_name, model in models.items():
+        if hasattr(model, 'use_label_encoder'):
+            delattr(model, 'use_label_encoder')
+        task_probs[task_name] = model.predict_proba(match_data)[0]
+
+    if scoreline_probs is not None:
+        task_probs = predictor._blend(task_probs, scoreline_probs)
+    return predictor._format_predictions(task_probs)
+
+
+def benchmark_predict_match(predictor, models: Optional[Dict] = None, repeats: int = 2000) -> Dict:
+    """
+    Per-call latency of uncached predict_match, before and after the array path.
+
+    Both paths run in the same process on the same fixtures: the one-row
+    DataFrame path on the models as loaded, and predict_match on the
+    predictor's sanitised copies.
+
+    Args:
+        predictor: MatchPredictor instance (its cache is bypassed)
+        models: The models as loaded, before MatchPredictor sanitised them
+            (default: the predictor's own, which no longer check column names)
+        repeats: Number of calls per path
+
+    Returns:
+        Latency summaries in microseconds for both paths, the p50 speedup
+        and whether both paths returned the same predictions
+    """
+    import copy
+
+    # The reference path strips attributes the way the old code did, so give it a copy
+    models = copy.deepcopy(models if models is not None else predictor.models)
+
+    home_teams = list(predictor._home_rows)
+    away_teams = list(predictor._away_rows)
+    calls = [(home_teams[i % len(home_teams)], away_teams[(i * 7 + 1) % len(away_teams)])
+             for i in range(repeats)]
+
+    def frame_path(home, away):
+        return _predict_match_frame(predictor, models, home, away)
+
+    # Warm up lazy initialisation (thread-local buffers, first-call warnings)
+    _time_calls(frame_path, calls[:20])
+    _time_calls(predictor._predict_match, calls[:20])
+    frame = _latency_summary(_time_calls(frame_path, calls))
+    array = _latency_summary(_time_calls(predictor._predict_match, calls))
+
+    sample = calls[:50]
+    results = {
+        'frame': frame,
+        'array': array,
+        'speedup_p50': frame['p50_us'] / max(array['p50_us'], 1e-9),
+        'same_predictions': all(frame_path(*call)[0] == predictor._predict_match(*call)[0] for call in sample)
+    }
+
+    print(f"predict_match (one-row frame): p50 {frame['p50_us']:.1f} us, p99 {frame['p99_us']:.1f} us")
+    print(f"predict_match (float32 array): p50 {array['p50_us']:.1f} us, p99 {array['p99_us']:.1f} us")
+    print(f"Speedup (p50): {results['speedup_p50']:.1f}x over {repeats} calls, "
+          f"same predictions: {results['same_predictions']}")
+    return results
+
+
+def worker_memory(master_pid: int) -> List[Dict]:
+    """
+    Resident memory of every worker forked from a gunicorn master.
+
+    RSS counts shared copy-on-write pages in every worker; USS is what each
+    worker holds privately and PSS splits the shared pages between them.
+
+    Args:
+        master_pid: PID of the gunicorn master process
+
+    Returns:
+        One dict per worker with rss_mb, uss_mb and pss_mb (Linux)
+    """
+    import psutil
+
+    report = []
+    for worker in psutil.Process(master_pid).children():
+        info = worker.memory_full_info()
+        report.append({
+            'pid': worker.pid,
+            'rss_mb': info.rss / 2 ** 20,
+            'uss_mb': info.uss / 2 ** 20,
+            'pss_mb': getattr(info, 'pss', 0) / 2 ** 20
+        })
+        print(f"worker {worker.pid}: RSS {report[-1]['rss_mb']:.1f} MB, "
+              f"USS {report[-1]['uss_mb']:.1f} MB, PSS {report[-1]['pss_mb']:.1f} MB")
+    return report
+
+
+# Run in a fresh interpreter by benchmark_serving_memory
+_MEMORY_PROBE = """
+import json, time, psutil
+start = time.perf_counter()
+from app.services.model_registry import ModelRegistry
+bundle = ModelRegistry().get()
+info = psutil.Process().memory_full_info()
+print(json.dumps({{'rss_mb': info.rss / 2 ** 20, 'uss_mb': info.uss / 2 ** 20,
+                   'load_s': time.perf_counter() - start, 'teams': len(bundle.teams) if bundle else 0}}))
+"""
+
+
+def benchmark_serving_memory(snapshot_path: str, runs: int = 3) -> Dict:
+    """
+    Memory of a process booted from the full engineered frame vs the serving snapshot.
+
+    Each run loads the registry in a fresh interpreter, once with the
+    snapshot hidden (so it falls back to DATA_PATH) and once from it.
+
+    Args:
+        snapshot_path: Serving snapshot written by footy.serving_snapshot.save_snapshot
+        runs: Fresh interpreters per variant; medians are reported
+
+    Returns:
+        Dict keyed by 'full_frame' and 'snapshot' with median rss_mb, uss_mb and load_s
+    """
+    import json
+    import os
+    import subprocess
+    import sys
+
+    variants = {'full_frame': os.devnull + '.missing', 'snapshot': os.path.abspath(snapshot_path)}
+    results = {}
+    for name, path in variants.items():
+        env = dict(os.environ, SNAPSHOT_PATH=path)
+        samples = []
+        for _ in range(runs):
+            proc = subprocess.run([sys.executable, '-c', _MEMORY_PROBE.format()], capture_output=True,
+                                  text=True, env=env, cwd=os.getcwd())
+            if proc.returncode != 0:
+                raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'probe failed')
+            samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        results[name] = {key: float(np.median([s[key] for s in samples])) for key in ('rss_mb', 'uss_mb', 'load_s')}
+        print(f"{name:>10}: RSS {results[name]['rss_mb']:.1f} MB | USS {results[name]['uss_mb']:.1f} MB | "
+              f"load {results[name]['load_s']:.2f}s")
+
+    print(f"Saved per process: {results['full_frame']['uss_mb'] - results['snapshot']['uss_mb']:.1f} MB USS")
+    return results
+
+
+async def _load_run(url: str, requests: int, concurrency: int, method: str, json_body) -> Dict:
+    import asyncio
+    import httpx
+
+    samples, errors = [], 0
+    queue = iter(range(requests))
+
+    async def client_loop(client):
+        nonlocal errors
+        for _ in queue:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=json_body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            samples.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies_ms = np.asarray(samples) * 1e3
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'requests_per_s': len(samples) / elapsed,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99))
+    }
+
+
+def benchmark_http_load(url: str, requests: int = 500, concurrency: int = 50,
+                        method: str = 'GET', json_body=None) -> Dict:
+    """
+    Closed-loop HTTP load test: ``concurrency`` clients issuing ``requests`` in total.
+
+    Args:
+        url: Endpoint to hit
+        requests: Total number of requests
+        concurrency: Simultaneous connections
+        method: HTTP method
+        json_body: Optional JSON body (e.g. for /api/predict/batch)
+
+    Returns:
+        Dict with throughput, p50/p99 latency (ms) and error count
+    """
+    import asyncio
+    return asyncio.run(_load_run(url, requests, concurrency, method, json_body))
+
+
+def compare_deployments(base_urls: Dict[str, str], path: str, requests: int = 500,
+                        concurrencies=(1, 10, 50), method: str = 'GET', json_body=None) -> Dict:
+    """
+    Run the same load against several deployments (e.g. Flask vs ASGI).
+
+    Args:
+        base_urls: Deployment name to base URL, e.g. {'flask': 'http://127.0.0.1:8000'}
+        path: Endpoint path to load
+        requests: Requests per run
+        concurrencies: Concurrency levels to test
+
+    Returns:
+        Dict keyed by deployment, then concurrency
+    """
+    results = {}
+    for name, base_url in base_urls.items():
+        results[name] = {}
+        for concurrency in concurrencies:
+            run = benchmark_http_load(f"{base_url.rstrip('/')}{path}", requests, concurrency, method, json_body)
+            results[name][concurrency] = run
+            print(f"{name:>6} c={concurrency:<4} {run['requests_per_s']:8.1f} req/s | "
+                  f"p50 {run['p50_ms']:8.1f} ms | p99 {run['p99_ms']:8.1f} ms | errors {run['errors']}")
+    return results
+
+
+# Run in a fresh interpreter by benchmark_startup; markers on stderr split
+# the -X importtime log into the import and load phases
+_STARTUP_PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+sys.stderr.write('--- imported\\n')
+from app.services.model_registry import registry
+bundle = registry.get()
+loaded = time.perf_counter()
+sys.stderr.write('--- loaded\\n')
+if bundle is not None:
+    registry._validate(bundle, None)
+warmed = time.perf_counter()
+print(json.dumps({{'import_s': imported - start, 'load_s': loaded - imported,
+                   'first_prediction_s': warmed - loaded, 'ready_s': warmed - start,
+                   'loaded': bundle is not None}}))
+"""
+
+
+def _slowest_imports(log: str, module: str, top: int) -> Dict[str, List]:
+    """
+    Slowest imports (cumulative ms) per phase of an -X importtime log.
+
+    Lists the direct imports of ``module`` for the import phase and the
+    top-level imports triggered by loading (unpickling) for the load phase.
+    """
+    phases = {'import': [], 'load': []}
+    phase = 'import'
+    for line in log.splitlines():
+        if line.startswith('--- '):
+            phase = 'load' if line == '--- imported' else None
+            continue
+        if phase is None or not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if name != module and depth <= (1 if phase == 'import' else 0):
+            phases[phase].append((name, int(cumulative) / 1e3))
+    return {phase: sorted(modules, key=lambda m: -m[1])[:top] for phase, modules in phases.items()}
+
+
+def benchmark_startup(module: str = 'app.run', runs: int = 3, top: int = 8) -> Dict:
+    """
+    Cold-start breakdown of the web app, each run in a fresh interpreter.
+
+    Importing ``module`` (with PREWARM=0, so nothing loads in the background)
+    is timed separately from loading the models/data and from the first
+    prediction, and the slowest top-level imports of both phases are listed.
+
+    Args:
+        module: Module to import, e.g. 'app.run' or 'app.asgi'
+        runs: Fresh interpreters to start; medians are reported
+        top: Slowest imports to list per phase
+
+    Returns:
+        Dict with median import_s, load_s, first_prediction_s, ready_s and
+        the slowest imports of the last run
+    """
+    import json
+    import os
+    import subprocess
+    import sys
+
+    env = dict(os.environ, PREWARM='0', LIVE_REFRESH_INTERVAL='0')
+    samples, slowest = [], {}
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', _STARTUP_PROBE.format(module=module)],
+                              capture_output=True, text=True, env=env, cwd=os.getcwd())
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'probe failed')
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        slowest = _slowest_imports(proc.stderr, module, top)
+
+    results = {key: float(np.median([s[key] for s in samples]))
+               for key in ('import_s', 'load_s', 'first_prediction_s', 'ready_s')}
+    results['slowest_imports'] = slowest
+
+    print(f"{module}: import {results['import_s']:.2f}s | load {results['load_s']:.2f}s | "
+          f"first prediction {results['first_prediction_s']:.2f}s | ready {results['ready_s']:.2f}s")
+    for phase, modules in slowest.items():
+        print(f"  slowest during {phase}: " + ', '.join(f"{name} {ms:.0f} ms" for name, ms in modules))
+    return results
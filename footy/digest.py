@@ -0,0 +1,321 @@
+# footy/digest.py
+
+import csv
+import json
+import os
+import queue
+import random
+import smtplib
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from email import policy
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import make_msgid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from jinja2 import Environment
+
+# Compiled once at import; rendering a digest is then a plain function call
+_html_env = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True)
+_text_env = Environment(autoescape=False, trim_blocks=True, lstrip_blocks=True)
+
+HTML_TEMPLATE = _html_env.from_string("""\
+<h2>Today's Predictions</h2>
+{% if subscriber.name %}<p>Hi {{ subscriber.name }},</p>{% endif %}
+<table cellpadding="6" style="border-collapse: collapse">
+  <tr><th align="left">Match</th><th>Outcome</th><th>Home / Draw / Away</th><th>Over 2.5</th><th>BTTS</th></tr>
+{% for p in predictions %}
+  <tr>
+    <td><b>{{ p.home_team }} vs {{ p.away_team }}</b></td>
+    <td>{{ p.predictions['Match Outcome'] }}</td>
+    <td>{{ p.probabilities['Match Outcome']['Home Win'] }} / {{ p.probabilities['Match Outcome']['Draw'] }} / {{ p.probabilities['Match Outcome']['Away Win'] }}</td>
+    <td>{{ p.probabilities['Over 2.5 Goals'] }}</td>
+    <td>{{ p.probabilities['Both Teams to Score'] }}</td>
+  </tr>
+{% endfor %}
+</table>
+""")
+
+TEXT_TEMPLATE = _text_env.from_string("""\
+Today's Predictions
+{% for p in predictions %}
+- {{ p.home_team }} vs {{ p.away_team }}: {{ p.predictions['Match Outcome'] }} (over 2.5: {{ p.probabilities['Over 2.5 Goals'] }}, BTTS: {{ p.probabilities['Both Teams to Score'] }})
+{% endfor %}
+""")
+
+# smtplib only normalises line endings of str messages; bytes must be CRLF already
+WIRE_POLICY = policy.compat32.clone(linesep='\r\n')
+
+# Worth another attempt: dropped connections, timeouts and 4xx replies
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+def load_subscribers(path: str) -> List[Dict]:
+    """
+    Read subscribers from a JSON list or a CSV file.
+
+    Each subscriber has an ``email`` and optionally a ``name`` and ``teams``
+    / ``leagues`` filters (lists in JSON, ``;``-separated in CSV); empty
+    filters mean every fixture.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+
+    subscribers = []
+    for row in rows:
+        email = (row.get('email') or '').strip()
+        if not email:
+            continue
+        subscriber = {'email': email, 'name': (row.get('name') or '').strip()}
+        for key in ('teams', 'leagues'):
+            value = row.get(key) or []
+            if isinstance(value, str):
+                value = [v.strip() for v in value.split(';') if v.strip()]
+            subscriber[key] = set(value)
+        subscribers.append(subscriber)
+    return subscribers
+
+
+def select_predictions(subscriber: Dict, predictions: List[Dict]) -> List[Dict]:
+    """The predictions matching a subscriber's team and league filters."""
+    teams, leagues = subscriber.get('teams'), subscriber.get('leagues')
+    if not teams and not leagues:
+        return predictions
+    return [p for p in predictions
+            if (teams and (p['home_team'] in teams or p['away_team'] in teams))
+            or (leagues and p.get('league') in leagues)]
+
+
+def render_digest(subscriber: Dict, predictions: List[Dict]) -> Tuple[str, str]:
+    """(plain text, HTML) bodies of one subscriber's digest."""
+    context = {'subscriber': subscriber, 'predictions': predictions}
+    return TEXT_TEMPLATE.render(context), HTML_TEMPLATE.render(context)
+
+
+class SMTPPool:
+    """
+    Reusable SMTP connections shared by the sender threads.
+
+    A connection is opened (and logged in) once and then carries many
+    messages; it is recycled after ``max_messages`` sends or on any
+    connection-level error.
+    """
+
+    def __init__(self, host: str, port: int = 465, username: Optional[str] = None,
+                 password: Optional[str] = None, use_ssl: bool = True, starttls: bool = False,
+                 size: int = 4, max_messages: int = 100, timeout: float = 30.0):
+        """
+        Args:
+            host, port: SMTP server
+            username, password: Login, skipped when no username is given
+            use_ssl: Connect with implicit TLS (SMTP_SSL)
+            starttls: Upgrade a plain connection with STARTTLS
+            size: Maximum number of open connections
+            max_messages: Messages sent on a connection before it is reopened
+            timeout: Socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.size = size
+        self.max_messages = max_messages
+        self.timeout = timeout
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _open(self):
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                      context=ssl.create_default_context())
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                server.starttls(context=ssl.create_default_context())
+        if self.username:
+            server.login(self.username, self.password or '')
+        with self._lock:
+            self.opened += 1
+        self._counts[id(server)] = 0
+        return server
+
+    @staticmethod
+    def _close(server) -> None:
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it goes back to the pool unless it failed."""
+        self._slots.acquire()
+        server = None
+        try:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                server = self._open()
+            yield server
+            self._counts[id(server)] += 1
+            if self._counts[id(server)] >= self.max_messages:
+                self._discard(server)
+            else:
+                self._idle.put(server)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+            # The message was refused but the session is intact
+            try:
+                server.rset()
+                self._idle.put(server)
+            except Exception:
+                self._discard(server)
+            raise
+        except BaseException:
+            if server is not None:
+                self._discard(server)
+            raise
+        finally:
+            self._slots.release()
+
+    def _discard(self, server) -> None:
+        self._counts.pop(id(server), None)
+        self._close(server)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    # 4xx replies are temporary failures, 5xx are permanent
+    code = getattr(error, 'smtp_code', None)
+    if code is None and isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(400 <= c < 500 for c in codes)
+    return code is not None and 400 <= code < 500
+
+
+class DigestSender:
+    """Renders and sends one digest per subscriber over a shared SMTPPool."""
+
+    def __init__(self, pool: SMTPPool, sender: str, subject: str = "Daily Football Predictions ⚽",
+                 concurrency: Optional[int] = None, retries: int = 3, backoff: float = 1.0):
+        """
+        Args:
+            pool: SMTPPool to send through
+            sender: From address
+            subject: Subject line
+            concurrency: Sender threads (default: the pool size)
+            retries: Extra attempts for transient failures
+            backoff: Base delay in seconds, doubled per attempt (with jitter)
+        """
+        self.pool = pool
+        self.sender = sender
+        self.subject = subject
+        self.concurrency = concurrency or pool.size
+        self.retries = retries
+        self.backoff = backoff
+
+    def build_message(self, subscriber: Dict, predictions: List[Dict]) -> MIMEMultipart:
+        # compat32 MIME classes build and serialise about 3x faster than EmailMessage
+        text, html = render_digest(subscriber, predictions)
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = f"{self.subject} - {date.today():%d %b %Y}"
+        msg['From'] = self.sender
+        msg['To'] = subscriber['email']
+        msg['Message-ID'] = make_msgid(domain=self.sender.rpartition('@')[2] or None)
+        msg.attach(MIMEText(text, 'plain', 'utf-8'))
+        msg.attach(MIMEText(html, 'html', 'utf-8'))
+        return msg
+
+    def _deliver(self, subscriber: Dict, predictions: List[Dict]) -> Tuple[bool, int, Optional[str]]:
+        """Build and send one digest with retries; returns (sent, attempts, error)."""
+        data = self.build_message(subscriber, predictions).as_bytes(policy=WIRE_POLICY)
+        for attempt in range(self.retries + 1):
+            try:
+                with self.pool.connection() as server:
+                    server.sendmail(self.sender, [subscriber['email']], data)
+                return True, attempt + 1, None
+            except Exception as e:
+                if attempt >= self.retries or not _is_transient(e):
+                    return False, attempt + 1, str(e)
+                time.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+        return False, self.retries + 1, None
+
+    def send(self, subscribers: Iterable[Dict], predictions: List[Dict]) -> Dict:
+        """
+        Send every subscriber their digest.
+
+        Subscribers whose filters match no fixture get no email.
+
+        Returns:
+            Counts of sent, skipped and failed messages, retries and the
+            failed addresses with their last error
+        """
+        start = time.perf_counter()
+        jobs = []
+        skipped = 0
+        for subscriber in subscribers:
+            selected = select_predictions(subscriber, predictions)
+            if selected:
+                jobs.append((subscriber, selected))
+            else:
+                skipped += 1
+
+        report = {'sent': 0, 'skipped': skipped, 'failed': 0, 'retries': 0, 'errors': {}}
+        # Messages are rendered in the sender threads, so sending starts at once
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='digest') as executor:
+            outcomes = executor.map(lambda job: self._deliver(*job), jobs)
+            for (subscriber, _), (sent, attempts, error) in zip(jobs, outcomes):
+                report['retries'] += attempts - 1
+                if sent:
+                    report['sent'] += 1
+                else:
+                    report['failed'] += 1
+                    report['errors'][subscriber['email']] = error
+        self.pool.close()
+
+        report['seconds'] = time.perf_counter() - start
+        report['connections'] = self.pool.opened
+        return report
+
+
+def pool_from_env() -> SMTPPool:
+    """
+    SMTPPool configured from the SMTP_* environment variables.
+
+    For a local stand-in (e.g. ``python -m aiosmtpd -n -l 127.0.0.1:8025``)
+    set SMTP_HOST=127.0.0.1, SMTP_PORT=8025 and SMTP_SSL=0.
+    """
+    return SMTPPool(
+        host=os.getenv('SMTP_HOST', 'smtp.gmail.com'),
+        port=int(os.getenv('SMTP_PORT', '465')),
+        username=os.getenv('SMTP_USER'),
+        password=os.getenv('SMTP_PASSWORD'),
+        use_ssl=os.getenv('SMTP_SSL', '1') == '1',
+        starttls=os.getenv('SMTP_STARTTLS', '0') == '1',
+        size=int(os.getenv('DIGEST_CONCURRENCY', '4')),
+        max_messages=int(os.getenv('SMTP_MAX_MESSAGES', '100'))
+    )
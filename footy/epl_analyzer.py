@@ -5,46 +5,21 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from footy.league_analyzer import analyze_leagues
 
-def analyze_epl_current_season(df):
+
+def analyze_epl_current_season(df, league='E0', season='2024-2025'):
     """
     Analyze current season EPL (E0) statistics
+
+    Any other league/season works too; see footy.league_analyzer.analyze_leagues
+    for every (League, Season) at once.
     """
-    # Filter for EPL current season
-    epl_df = df[(df['League'] == 'E0') & (df['Season'] == '2024-2025')].copy()
-
-    # Calculate match statistics
-    epl_df['TotalGoals'] = epl_df['FTHG'] + epl_df['FTAG']
-    epl_df['TotalFouls'] = epl_df['HF'] + epl_df['AF']
-    epl_df['BTTS'] = ((epl_df['FTHG'] > 0) & (epl_df['FTAG'] > 0)).astype(int)
-    epl_df['Over1.5'] = (epl_df['TotalGoals'] > 1.5).astype(int)
-    epl_df['Over2.5'] = (epl_df['TotalGoals'] > 2.5).astype(int)
-
-    # Create team statistics
-    team_stats = []
-    for team in epl_df['HomeTeam'].unique():
-        home_games = epl_df[epl_df['HomeTeam'] == team]
-        away_games = epl_df[epl_df['AwayTeam'] == team]
-
-        stats = {
-            'Team': team,
-            'Games': len(home_games) + len(away_games),
-            'Draws': len(home_games[home_games['FTR'] == 'D']) + len(away_games[away_games['FTR'] == 'D']),
-            'TotalFouls': home_games['TotalFouls'].sum() + away_games['TotalFouls'].sum(),
-            'AvgFouls': (home_games['TotalFouls'].sum() + away_games['TotalFouls'].sum()) / (
-                        len(home_games) + len(away_games)),
-            'GoalsScored': home_games['FTHG'].sum() + away_games['FTAG'].sum(),
-            'GoalsConceded': home_games['FTAG'].sum() + away_games['FTHG'].sum(),
-            'Over1.5_Games': len(home_games[home_games['Over1.5'] == 1]) + len(away_games[away_games['Over1.5'] == 1]),
-            'Over2.5_Games': len(home_games[home_games['Over2.5'] == 1]) + len(away_games[away_games['Over2.5'] == 1]),
-            'BTTS_Games': len(home_games[home_games['BTTS'] == 1]) + len(away_games[away_games['BTTS'] == 1])
-        }
-        team_stats.append(stats)
-
-    return pd.DataFrame(team_stats)
-
-
-def create_epl_visualizations(team_stats):
+    team_stats = analyze_leagues(df, leagues=[league], seasons=[season])
+    return team_stats.drop(columns=['League', 'Season'])
+
+
+def create_epl_visualizations(team_stats, title="EPL Season Analysis"):
     """
     Create comprehensive EPL visualizations
     """
@@ -155,7 +130,7 @@ def create_epl_visualizations(team_stats):
         height=1500,
         width=1200,
         showlegend=True,
-        title_text="EPL 2023-2024 Season Analysis",
+        title_text=title,
         barmode='group'
     )
 
@@ -182,14 +157,14 @@ def calculate_percentages(team_stats):
     return percentage_stats
 
 
-def run_epl_analysis(merged_df):
+def run_epl_analysis(merged_df, league='E0', season='2024-2025'):
     """
-    Run complete EPL analysis
+    Run complete EPL analysis (on raw match data; engineered goals are scaled)
     """
-    team_stats = analyze_epl_current_season(merged_df)
+    team_stats = analyze_epl_current_season(merged_df, league, season)
     percentage_stats = calculate_percentages(team_stats)
 
     # Create visualization
-    fig = create_epl_visualizations(team_stats)
+    fig = create_epl_visualizations(team_stats, f"{league} {season} Season Analysis")
 
     return team_stats, percentage_stats, fig
\ No newline at end of file
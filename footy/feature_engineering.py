@@ -6,6 +6,14 @@ from scipy import stats
 from sklearn.preprocessing import StandardScaler
 from itertools import takewhile
 
+# Kept out of the scaler: binary flags (also the training targets), team
+# encodings and calendar fields are used as-is and stored as small ints
+UNSCALED_COLUMNS = ['BTTS', 'Over1.5', 'Over2.5', 'Over3.5',
+                    'HomeTeam_encoded', 'AwayTeam_encoded', 'DayOfWeek', 'Month']
+
+# Label columns stored as categoricals by compact_dtypes
+CATEGORICAL_COLUMNS = ['HomeTeam', 'AwayTeam', 'League', 'Season', 'FTR', 'HTR']
+
 
 class FootballFeatureEngineering:
     """Class for engineering football match features."""
@@ -260,8 +268,34 @@ class FootballFeatureEngineering:
         # Handle missing values and scale
         print("Handling missing values and scaling features...")
         df = df.fillna(0)
-        numerical_cols = df.select_dtypes(include=['float64', 'int64']).columns
+        numerical_cols = [col for col in df.select_dtypes(include=['float64', 'int64']).columns
+                          if col not in UNSCALED_COLUMNS]
         df[numerical_cols] = self.scaler.fit_transform(df[numerical_cols])
 
         print("Feature engineering completed.")
-        return df
\ No newline at end of file
+        return df
+
+    def compact_dtypes(self, df):
+        """
+        Shrink the engineered frame before it is trained on, saved and served.
+
+        Integer columns go to the smallest integer type that holds them and
+        label columns to categoricals (both lossless); the remaining floats,
+        all standardised, go to float32.
+        """
+        df = df.copy()
+        for col in df.columns:
+            series = df[col]
+            if col in CATEGORICAL_COLUMNS:
+                df[col] = series.astype('category')
+            elif pd.api.types.is_bool_dtype(series):
+                continue
+            elif pd.api.types.is_integer_dtype(series):
+                df[col] = pd.to_numeric(series, downcast='integer')
+            elif pd.api.types.is_float_dtype(series):
+                values = series.to_numpy()
+                if col in UNSCALED_COLUMNS and np.isfinite(values).all() and (values == np.round(values)).all():
+                    df[col] = pd.to_numeric(series.astype(np.int64), downcast='integer')
+                else:
+                    df[col] = series.astype(np.float32)
+        return df
@@ -0,0 +1,108 @@
+# footy/league_analyzer.py
+
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional
+
+GROUP_COLUMNS = ['League', 'Season', 'Team']
+
+STAT_COLUMNS = ['Games', 'Draws', 'TotalFouls', 'AvgFouls', 'GoalsScored', 'GoalsConceded',
+                'Over1.5_Games', 'Over2.5_Games', 'BTTS_Games']
+
+
+def team_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reshape matches into one row per team per match.
+
+    Match-level flags (draw, over 1.5/2.5, BTTS, total fouls) are computed
+    once per match, then a single melt turns HomeTeam/AwayTeam into a Team
+    column; scored/conceded goals are picked by side.
+
+    Args:
+        df: Match data with raw (unscaled) FTHG, FTAG, FTR, HF and AF
+
+    Returns:
+        DataFrame with League, Season, Team, Side and the per-match stats
+    """
+    total_goals = df['FTHG'].to_numpy() + df['FTAG'].to_numpy()
+    matches = pd.DataFrame({
+        'League': df['League'].to_numpy(),
+        'Season': df['Season'].to_numpy(),
+        'HomeTeam': df['HomeTeam'].to_numpy(),
+        'AwayTeam': df['AwayTeam'].to_numpy(),
+        'FTHG': df['FTHG'].to_numpy(),
+        'FTAG': df['FTAG'].to_numpy(),
+        'Draw': (df['FTR'] == 'D').to_numpy(),
+        'TotalFouls': df['HF'].to_numpy() + df['AF'].to_numpy(),
+        'Over1.5': total_goals > 1.5,
+        'Over2.5': total_goals > 2.5,
+        'BTTS': ((df['FTHG'] > 0) & (df['FTAG'] > 0)).to_numpy()
+    })
+
+    rows = matches.melt(id_vars=['League', 'Season', 'FTHG', 'FTAG', 'Draw', 'TotalFouls',
+                                 'Over1.5', 'Over2.5', 'BTTS'],
+                        value_vars=['HomeTeam', 'AwayTeam'], var_name='Side', value_name='Team')
+    home = (rows['Side'] == 'HomeTeam').to_numpy()
+    rows['GoalsScored'] = np.where(home, rows['FTHG'], rows['FTAG'])
+    rows['GoalsConceded'] = np.where(home, rows['FTAG'], rows['FTHG'])
+    return rows.drop(columns=['FTHG', 'FTAG'])
+
+
+def analyze_leagues(df: pd.DataFrame, leagues: Optional[Iterable[str]] = None,
+                    seasons: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Draws, fouls, goals, over and BTTS counts per team for every (League, Season).
+
+    Args:
+        df: Match data with raw goals and fouls (not the scaled engineered frame)
+        leagues: Only these league codes (default: all)
+        seasons: Only these seasons (default: all)
+
+    Returns:
+        DataFrame with League, Season, Team and STAT_COLUMNS, sorted by those keys
+    """
+    if leagues is not None:
+        df = df[df['League'].isin(list(leagues))]
+    if seasons is not None:
+        df = df[df['Season'].isin(list(seasons))]
+
+    stats = team_rows(df).groupby(GROUP_COLUMNS, sort=True).agg(
+        Games=('Team', 'size'),
+        Draws=('Draw', 'sum'),
+        TotalFouls=('TotalFouls', 'sum'),
+        AvgFouls=('TotalFouls', 'mean'),
+        GoalsScored=('GoalsScored', 'sum'),
+        GoalsConceded=('GoalsConceded', 'sum'),
+        **{'Over1.5_Games': ('Over1.5', 'sum'),
+           'Over2.5_Games': ('Over2.5', 'sum'),
+           'BTTS_Games': ('BTTS', 'sum')}
+    )
+    return stats.reset_index()
+
+
+def league_season_summary(df: pd.DataFrame, over_thresholds: Iterable[float] = (1.5, 2.5)) -> pd.DataFrame:
+    """
+    Match-level totals per (League, Season), the aggregates the league charts plot.
+
+    Args:
+        df: Match data with raw FTHG, FTAG, FTR, HF and AF
+        over_thresholds: Goal lines to count 'Over{threshold}_Games' for
+
+    Returns:
+        DataFrame with League, Season, Matches, Draws, HomeGoals, AwayGoals,
+        TotalFouls, BTTS_Games and one Over column per threshold
+    """
+    total_goals = df['FTHG'].to_numpy() + df['FTAG'].to_numpy()
+    matches = pd.DataFrame({
+        'League': df['League'].to_numpy(),
+        'Season': df['Season'].to_numpy(),
+        'Draws': (df['FTR'] == 'D').to_numpy(),
+        'HomeGoals': df['FTHG'].to_numpy(),
+        'AwayGoals': df['FTAG'].to_numpy(),
+        'TotalFouls': df['HF'].to_numpy() + df['AF'].to_numpy(),
+        'BTTS_Games': ((df['FTHG'] > 0) & (df['FTAG'] > 0)).to_numpy(),
+        **{f'Over{threshold}_Games': total_goals > threshold for threshold in over_thresholds}
+    })
+    summary = matches.groupby(['League', 'Season'], sort=True).agg(
+        Matches=('Draws', 'size'), **{column: (column, 'sum') for column in matches.columns[2:]})
+    return summary.reset_index()
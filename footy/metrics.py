@@ -0,0 +1,136 @@
+# footy/metrics.py
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+    from prometheus_client import multiprocess
+except ImportError:  # metrics become no-ops without prometheus_client
+    prometheus_client = None
+
+# Under gunicorn every worker writes its samples to this directory and a
+# scrape of any worker aggregates all of them
+MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+FAST_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1)
+REQUEST_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+class _NullMetric:
+    """Stands in for a metric when prometheus_client is not installed."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+
+def _metric(cls_name: str, name: str, documentation: str, labelnames=(), **kwargs):
+    if prometheus_client is None:
+        return _NullMetric()
+    if cls_name == 'Gauge' and MULTIPROC_DIR:
+        kwargs.setdefault('multiprocess_mode', 'livemax')
+    cls = {'Counter': Counter, 'Gauge': Gauge, 'Histogram': Histogram}[cls_name]
+    return cls(name, documentation, labelnames, **kwargs)
+
+
+# Serving
+ROUTE_LATENCY = _metric('Histogram', 'footy_http_request_seconds', 'Flask route latency',
+                        ('route', 'method', 'status'), buckets=REQUEST_BUCKETS)
+PREDICT_LATENCY = _metric('Histogram', 'footy_predict_proba_seconds', 'predict_proba latency per task model',
+                          ('task',), buckets=FAST_BUCKETS + REQUEST_BUCKETS[6:])
+LOOKUP_LATENCY = _metric('Histogram', 'footy_feature_lookup_seconds', 'Team feature-index lookup time',
+                         ('path',), buckets=FAST_BUCKETS)
+UPSTREAM_LATENCY = _metric('Histogram', 'footy_upstream_request_seconds', 'football-data.org request latency',
+                           ('endpoint', 'status'), buckets=REQUEST_BUCKETS)
+CACHE_HIT_RATIO = _metric('Gauge', 'footy_prediction_cache_hit_ratio', 'Prediction cache hit ratio')
+CACHE_SIZE = _metric('Gauge', 'footy_prediction_cache_entries', 'Prediction cache entries')
+MODEL_LOAD_SECONDS = _metric('Gauge', 'footy_model_load_seconds', 'Duration of the last model/data load')
+MODEL_LOADS = _metric('Counter', 'footy_model_loads', 'Model/data loads', ('outcome',))
+WORKER_RSS = _metric('Gauge', 'footy_worker_rss_bytes', 'Resident memory of the serving process',
+                     **({'multiprocess_mode': 'all'} if MULTIPROC_DIR else {}))
+
+# Offline pipeline
+STAGE_SECONDS = _metric('Histogram', 'footy_pipeline_stage_seconds', 'Pipeline stage duration',
+                        ('stage',), buckets=STAGE_BUCKETS)
+
+_scrape_hooks: List[Callable[[], None]] = []
+
+
+def observe(metric, seconds: float, **labels) -> None:
+    """Record one observation, with labels if given."""
+    (metric.labels(**labels) if labels else metric).observe(seconds)
+
+
+@contextmanager
+def timed(metric, **labels):
+    """Time the enclosed block into a histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(metric, time.perf_counter() - start, **labels)
+
+
+def on_scrape(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register a callable that refreshes gauges right before each scrape."""
+    _scrape_hooks.append(hook)
+    return hook
+
+
+def _update_process_gauges() -> None:
+    try:
+        import psutil
+        WORKER_RSS.set(psutil.Process().memory_info().rss)
+    except ImportError:
+        pass
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """
+    Current metrics in the Prometheus text format.
+
+    Returns:
+        (body, content_type); an empty body when prometheus_client is missing
+    """
+    if prometheus_client is None:
+        return b'', 'text/plain; charset=utf-8'
+
+    _update_process_gauges()
+    for hook in _scrape_hooks:
+        try:
+            hook()
+        except Exception as e:
+            print(f"Warning in metrics hook: {str(e)}")
+
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a dead gunicorn worker's live gauges (multiprocess mode)."""
+    if prometheus_client is not None and MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+
+def write_textfile(path: Optional[str]) -> None:
+    """Dump the metrics to a file for node_exporter's textfile collector (offline runs)."""
+    if prometheus_client is None or not path:
+        return
+    prometheus_client.write_to_textfile(path, prometheus_client.REGISTRY)
@@ -18,6 +18,8 @@ class FootballPredictor:
     def __init__(self):
         self.models = {}
         self.metrics = {}
+        # Every TimeSeriesSplit fold's model per task, for backtesting
+        self.fold_models = {}
 
         # Enhanced feature list including goal-specific features
         self.base_features = [
@@ -50,7 +52,8 @@ class FootballPredictor:
         # Prepare targets including over/under
         y = {}
         if 'FTR' in df.columns:
-            y['match_outcome'] = df['FTR'].map({'H': 0, 'D': 1, 'A': 2})
+            # FTR is a categorical after compact_dtypes, and so would the mapped labels be
+            y['match_outcome'] = df['FTR'].map({'H': 0, 'D': 1, 'A': 2}).astype('int64')
         if 'Over1.5' in df.columns:
             y['over_1_5'] = df['Over1.5']
         if 'Over2.5' in df.columns:
@@ -191,34 +194,70 @@ class FootballPredictor:
 
         return metrics
 
-    def train_models(self, df):
-        """Train models with enhanced validation and metrics"""
+    def train_fold(self, task, X, y_task, train_idx, val_idx):
+        """
+        Train and evaluate one TimeSeriesSplit fold.
+
+        Returns:
+            (fitted stacking model, validation metrics)
+        """
+        X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
+        y_train, y_val = y_task.iloc[train_idx], y_task.iloc[val_idx]
+
+        # Apply SMOTE for balanced training
+        smote = SMOTE(random_state=42)
+        X_train_res, y_train_res = smote.fit_resample(X_train, y_train)
+
+        # Create and train stacking model
+        model = self.create_stacking_model(task, X_train_res, y_train_res)
+        model.fit(X_train_res, y_train_res)
+
+        return model, self.evaluate_model(model, X_val, y_val, task)
+
+    def train_models(self, df, checkpoint_dir=None):
+        """
+        Train models with enhanced validation and metrics.
+
+        Args:
+            df: Engineered frame
+            checkpoint_dir: Save each finished (task, fold) unit here and
+                resume from the units already there for the same data
+                (including units trained by ``footy.training_jobs`` workers)
+        """
         print("Preparing data...")
         X, y = self.prepare_data(df)
 
-        tscv = TimeSeriesSplit(n_splits=5)
+        n_splits = 5
+        splits = list(TimeSeriesSplit(n_splits=n_splits).split(X))
+
+        checkpoint = signature = None
+        if checkpoint_dir is not None:
+            from footy.training_jobs import TrainingCheckpoint, data_signature
+            checkpoint = TrainingCheckpoint(checkpoint_dir)
+            signature = data_signature(X, y, n_splits)
+            completed = checkpoint.prepare(signature, n_splits)
+            if completed:
+                print(f"Resuming: {len(completed)} of {len(y) * n_splits} units already checkpointed")
 
         for task, y_task in y.items():
             print(f"\nTraining models for {task}")
             cv_metrics = []
             best_metric = 0
             best_model = None
+            self.fold_models[task] = []
+
+            for fold, (train_idx, val_idx) in enumerate(splits):
+                unit = checkpoint.load(task, fold, signature) if checkpoint is not None else None
+                if unit is not None:
+                    model, fold_metrics = unit
+                    print(f"Fold {fold + 1}/{n_splits} restored from checkpoint")
+                else:
+                    model, fold_metrics = self.train_fold(task, X, y_task, train_idx, val_idx)
+                    if checkpoint is not None:
+                        checkpoint.save(task, fold, model, fold_metrics, signature)
 
-            for train_idx, val_idx in tscv.split(X):
-                X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-                y_train, y_val = y_task.iloc[train_idx], y_task.iloc[val_idx]
-
-                # Apply SMOTE for balanced training
-                smote = SMOTE(random_state=42)
-                X_train_res, y_train_res = smote.fit_resample(X_train, y_train)
-
-                # Create and train stacking model
-                model = self.create_stacking_model(task, X_train_res, y_train_res)
-                model.fit(X_train_res, y_train_res)
-
-                # Evaluate
-                fold_metrics = self.evaluate_model(model, X_val, y_val, task)
                 cv_metrics.append(fold_metrics)
+                self.fold_models[task].append(model)
 
                 # Track best model
                 current_metric = fold_metrics['f1']
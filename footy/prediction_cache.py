@@ -0,0 +1,158 @@
+# footy/prediction_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class _Pending:
+    """A computation in flight that concurrent callers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache with per-entry TTL and request coalescing.
+
+    Concurrent misses on the same key share a single computation: the first
+    caller computes, the others wait for its result.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 600.0):
+        """
+        Args:
+            maxsize: Maximum number of cached entries
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._in_flight: Dict[Hashable, _Pending] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _lookup(self, key: Hashable, now: float):
+        """Return (True, value) for a fresh entry; caller must hold the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any, now: float) -> None:
+        """Insert an entry and evict the least recently used; caller must hold the lock."""
+        self._entries[key] = (now + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable):
+        """Return the cached value or None, counting a hit or a miss."""
+        with self._lock:
+            found, value = self._lookup(key, time.monotonic())
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache a value computed outside the cache."""
+        with self._lock:
+            self._store(key, value, time.monotonic())
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any],
+                       should_cache: Callable[[Any], bool] = lambda value: True):
+        """
+        Return the cached value for ``key`` or compute it once.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument callable producing the value
+            should_cache: Predicate deciding whether a computed value is stored
+
+        Returns:
+            The cached or freshly computed value
+        """
+        with self._lock:
+            found, value = self._lookup(key, time.monotonic())
+            if found:
+                self.hits += 1
+                return value
+
+            pending = self._in_flight.get(key)
+            leader = pending is None
+            if leader:
+                self.misses += 1
+                pending = _Pending()
+                self._in_flight[key] = pending
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            value = compute()
+            pending.value = value
+            if should_cache(value):
+                with self._lock:
+                    self._store(key, value, time.monotonic())
+            return value
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            pending.event.set()
+
+    def hot_keys(self, limit: int) -> List[Hashable]:
+        """Most recently used keys that are still fresh, newest first."""
+        now = time.monotonic()
+        with self._lock:
+            keys = [key for key, (expires_at, _) in reversed(self._entries.items()) if expires_at > now]
+        return keys[:limit]
+
+    def prune(self, keep: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key does not satisfy ``keep``."""
+        with self._lock:
+            for key in [key for key in self._entries if not keep(key)]:
+                del self._entries[key]
+
+    def invalidate(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits + self.coalesced) / lookups if lookups else 0.0
+            }
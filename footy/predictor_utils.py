@@ -1,9 +1,16 @@
 # footy/predictor_utils.py
 
+import copy
+import hashlib
+import threading
+import time
+import uuid
 import pandas as pd
 import numpy as np
 from typing import Dict, Tuple, Optional, List, Union
 
+from footy.metrics import LOOKUP_LATENCY, PREDICT_LATENCY, observe, timed
+
 
 class TeamMapper:
     """Handles team name mappings and standardization."""
@@ -25,13 +32,58 @@ class TeamMapper:
         return cls.TEAM_MAPPINGS.get(team, team)
 
 
+def _sanitize_estimator(estimator) -> None:
+    """
+    Prepare a private copy of a model (and its sub-estimators) for array input.
+
+    Drops the stale XGBoost ``use_label_encoder`` attribute and the stored
+    training column names, so predict_proba takes a bare NumPy array
+    without per-call name checks or warnings.
+    """
+    # HOTFIX: `use_label_encoder` breaks predict on newer XGBoost versions
+    if hasattr(estimator, 'use_label_encoder'):
+        delattr(estimator, 'use_label_encoder')
+    if 'feature_names_in_' in vars(estimator):
+        del estimator.feature_names_in_
+    if hasattr(estimator, 'get_booster'):
+        try:
+            estimator.get_booster().feature_names = None
+        except Exception:
+            pass
+
+    children = []
+    if isinstance(getattr(estimator, 'estimators_', None), list):
+        children.extend(estimator.estimators_)
+    if getattr(estimator, 'final_estimator_', None) is not None:
+        children.append(estimator.final_estimator_)
+    children.extend(step for _, step in getattr(estimator, 'steps', []))
+    for child in children:
+        if hasattr(child, 'predict') and not isinstance(child, str):
+            _sanitize_estimator(child)
+
+
 class MatchPredictor:
     """Handles match prediction and stat retrieval."""
 
-    def __init__(self, df: pd.DataFrame, models: Dict):
+    def __init__(self, df: Optional[pd.DataFrame], models: Dict, scoreline_model=None, scoreline_weight: float = 0.0,
+                 cache=None, model_version: Optional[str] = None, data_version: Optional[str] = None,
+                 snapshot: Optional[Dict] = None):
+        """
+        Args:
+            df: Engineered match data (None when serving from a snapshot)
+            models: Task name to fitted ensemble
+            scoreline_model: Optional fitted ScorelineModel
+            scoreline_weight: Share of the scoreline probabilities when blending
+                with the ensembles; 1.0 serves from the scoreline model alone
+            cache: Optional PredictionCache in front of predict_match
+            model_version: Identifier of the loaded models (default: unique per instance)
+            data_version: Identifier of the data snapshot (default: hash of the team index)
+            snapshot: Serving snapshot (see footy.serving_snapshot) to index instead of ``df``
+        """
         self.df = df
-        self.models = models
         self.team_mapper = TeamMapper()
+        self.scoreline_model = scoreline_model
+        self.scoreline_weight = scoreline_weight if scoreline_model is not None else 0.0
 
         # Updated with goal-specific features
         self.features = [
@@ -58,8 +110,140 @@ class MatchPredictor:
             'btts': 'Both Teams to Score'
         }
 
+        self.home_features = [f for f in self.features if f.startswith('Home')]
+        self.away_features = [f for f in self.features if f.startswith('Away')]
+        self._home_positions = np.array([self.features.index(f) for f in self.home_features])
+        self._away_positions = np.array([self.features.index(f) for f in self.away_features])
+
+        # Per-task column order where a model was trained on a different one
+        self._columns = {}
+        self.models = self._prepare_models(models or {})
+        # One reusable single-row buffer per serving thread
+        self._buffers = threading.local()
+
+        if snapshot is not None:
+            self._load_team_index(snapshot)
+        else:
+            self._build_team_index()
+
+        # Cache keys carry both versions, so entries of other versions never match
+        self.model_version = model_version or uuid.uuid4().hex[:12]
+        self.data_version = data_version or self._index_fingerprint()
+        self.cache = cache
+
+    def _build_team_index(self) -> None:
+        """Index each team's latest home-side and away-side feature rows."""
+        start = time.perf_counter()
+
+        ordered = self.df.sort_values('Date', kind='mergesort')
+
+        latest_home = ordered.drop_duplicates('HomeTeam', keep='last')
+        self._home_rows = {team: idx for idx, team in enumerate(latest_home['HomeTeam'])}
+        self._home_matrix = np.ascontiguousarray(latest_home[self.home_features].to_numpy(dtype=np.float32))
+
+        latest_away = ordered.drop_duplicates('AwayTeam', keep='last')
+        self._away_rows = {team: idx for idx, team in enumerate(latest_away['AwayTeam'])}
+        self._away_matrix = np.ascontiguousarray(latest_away[self.away_features].to_numpy(dtype=np.float32))
+
+        self.index_build_seconds = time.perf_counter() - start
+
+    def _load_team_index(self, snapshot: Dict) -> None:
+        """Take the team index from a serving snapshot, aligning its columns by name."""
+        start = time.perf_counter()
+
+        for side, features in (('home', self.home_features), ('away', self.away_features)):
+            names = snapshot[f'{side}_features']
+            missing = set(features) - set(names)
+            if missing:
+                raise ValueError(f"Snapshot is missing {side} features: {sorted(missing)}")
+            matrix = np.asarray(snapshot[f'{side}_matrix'])
+            if names != features:
+                matrix = matrix[:, [names.index(f) for f in features]]
+            setattr(self, f'_{side}_rows', {team: idx for idx, team in enumerate(snapshot[f'{side}_teams'])})
+            setattr(self, f'_{side}_matrix', np.ascontiguousarray(matrix, dtype=np.float32))
+
+        self.index_build_seconds = time.perf_counter() - start
+
+    @classmethod
+    def from_snapshot(cls, snapshot, models: Dict, **kwargs) -> 'MatchPredictor':
+        """
+        Build a predictor from a serving snapshot alone, without the engineered frame.
+
+        Args:
+            snapshot: Snapshot dict or path of a file written by save_snapshot
+            models: Task name to fitted ensemble
+            **kwargs: Other MatchPredictor arguments
+        """
+        if not isinstance(snapshot, dict):
+            from footy.serving_snapshot import load_snapshot
+            snapshot = load_snapshot(snapshot)
+        return cls(None, models, snapshot=snapshot, **kwargs)
+
+    def _prepare_models(self, models: Dict) -> Dict:
+        """
+        Sanitise a copy of each model once at load time (see ``_sanitize_estimator``).
+
+        The caller's models keep their feature names, so other predictors
+        built on the same dict still find the training column order.
+        """
+        prepared = {}
+        for task_name, model in models.items():
+            names = getattr(model, 'feature_names_in_', None)
+            if names is not None and list(names) != self.features:
+                self._columns[task_name] = np.array([self.features.index(f) for f in names])
+            try:
+                model = copy.deepcopy(model)
+                _sanitize_estimator(model)
+            except Exception as e:
+                print(f"Warning cleaning model {task_name}: {str(e)}")
+            prepared[task_name] = model
+        return prepared
+
+    def _row_buffer(self) -> np.ndarray:
+        """This thread's preallocated (1, n_features) float32 row."""
+        row = getattr(self._buffers, 'row', None)
+        if row is None:
+            row = self._buffers.row = np.empty((1, len(self.features)), dtype=np.float32)
+        return row
+
+    def _index_fingerprint(self) -> str:
+        """Short hash of the indexed team rows, used as the data snapshot version."""
+        digest = hashlib.blake2b(digest_size=8)
+        for rows, matrix in ((self._home_rows, self._home_matrix), (self._away_rows, self._away_matrix)):
+            digest.update('\x1f'.join(rows).encode())
+            digest.update(matrix.tobytes())
+        return digest.hexdigest()
+
+    def _cache_key(self, home_team: str, away_team: str) -> Tuple:
+        return (home_team, away_team, self.model_version, self.data_version)
+
+    def get_team_vector(self, team: str, is_home: bool = True) -> Optional[np.ndarray]:
+        """Latest feature row for a team, ordered like ``home_features``/``away_features``."""
+        start = time.perf_counter()
+        team = self.team_mapper.standardize_name(team)
+        rows, matrix = (self._home_rows, self._home_matrix) if is_home else (self._away_rows, self._away_matrix)
+
+        idx = rows.get(team)
+        if idx is None:
+            print(f"Error getting stats for {team}: no {'home' if is_home else 'away'} matches")
+            return None
+        vector = matrix[idx]
+        observe(LOOKUP_LATENCY, time.perf_counter() - start, path='single')
+        return vector
+
     def get_team_stats(self, team: str, is_home: bool = True) -> Optional[Dict]:
         """Get latest statistics for a team."""
+        vector = self.get_team_vector(team, is_home)
+        if vector is None:
+            return None
+
+        names = self.home_features if is_home else self.away_features
+        return dict(zip(names, vector.tolist()))
+
+    def _scan_team_stats(self, team: str, is_home: bool = True) -> Optional[Dict]:
+        """Get latest statistics for a team by scanning the full frame (reference path)."""
+        if self.df is None:
+            return self.get_team_stats(team, is_home)
         team = self.team_mapper.standardize_name(team)
 
         try:
@@ -80,58 +264,211 @@ class MatchPredictor:
             print(f"Error getting stats for {team}: {str(e)}")
             return None
 
+    def _scoreline_probabilities(self, home_teams: List[str], away_teams: List[str]) -> Dict:
+        """Per-task probability arrays derived from the scoreline model for a batch."""
+        markets = self.scoreline_model.predict_markets(home_teams, away_teams)
+        over_1_5 = markets['over'][1.5]
+        over_2_5 = markets['over'][2.5]
+        btts = markets['btts']
+        return {
+            'match_outcome': markets['outcome'],
+            'over_1_5': np.stack([1 - over_1_5, over_1_5], axis=1),
+            'over_2_5': np.stack([1 - over_2_5, over_2_5], axis=1),
+            'btts': np.stack([1 - btts, btts], axis=1),
+            'correct_score': markets['correct_score']
+        }
+
+    def _blend(self, task_probs: Dict, scoreline_probs: Dict) -> Dict:
+        """Blend ensemble probabilities with the scoreline model for one fixture."""
+        weight = self.scoreline_weight
+        for task_name, probs in scoreline_probs.items():
+            if task_name in task_probs and task_name != 'correct_score':
+                task_probs[task_name] = (1 - weight) * task_probs[task_name] + weight * probs
+            elif task_name not in task_probs:
+                task_probs[task_name] = probs
+        return task_probs
+
+    def _predict_proba(self, task_name: str, model, match_data: np.ndarray) -> np.ndarray:
+        """Call predict_proba on a task model with a feature array in ``self.features`` order."""
+        columns = self._columns.get(task_name)
+        if columns is not None:
+            match_data = match_data[:, columns]
+
+        with timed(PREDICT_LATENCY, task=task_name):
+            return model.predict_proba(match_data)
+
+    def _format_predictions(self, task_probs: Dict) -> Tuple[Dict, Dict]:
+        """Turn per-task probability vectors into display predictions."""
+        predictions = {}
+        probabilities = {}
+
+        for task_name, probs in task_probs.items():
+            if task_name == 'correct_score':
+                predictions['Correct Score'] = probs[0][0]
+                probabilities['Correct Score'] = {score: f"{p:.2%}" for score, p in probs}
+                continue
+
+            display_name = self.task_mapping.get(task_name, task_name)
+            # Python floats format faster than NumPy scalars
+            probs = probs.tolist() if isinstance(probs, np.ndarray) else probs
+
+            if task_name == 'match_outcome':
+                pred_idx = probs.index(max(probs))
+                predictions[display_name] = ['Home Win', 'Draw', 'Away Win'][pred_idx]
+                probabilities[display_name] = {
+                    'Home Win': f"{probs[0]:.2%}",
+                    'Draw': f"{probs[1]:.2%}",
+                    'Away Win': f"{probs[2]:.2%}"
+                }
+            else:
+                predictions[display_name] = 'Yes' if probs[1] > 0.5 else 'No'
+                probabilities[display_name] = f"{probs[1]:.2%}"
+
+        return predictions, probabilities
+
     def predict_match(self, home_team: str, away_team: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Make predictions for a match, served from the cache when one is attached."""
+        if self.cache is None:
+            return self._predict_match(home_team, away_team)
+
+        home = self.team_mapper.standardize_name(home_team)
+        away = self.team_mapper.standardize_name(away_team)
+        return self.cache.get_or_compute(
+            self._cache_key(home, away),
+            lambda: self._predict_match(home, away),
+            should_cache=lambda result: result[0] is not None
+        )
+
+    def _predict_match(self, home_team: str, away_team: str) -> Tuple[Optional[Dict], Optional[Dict]]:
         """Make predictions for a match."""
         try:
-            home_stats = self.get_team_stats(home_team, is_home=True)
-            away_stats = self.get_team_stats(away_team, is_home=False)
+            scoreline_probs = None
+            if self.scoreline_model is not None:
+                home = self.team_mapper.standardize_name(home_team)
+                away = self.team_mapper.standardize_name(away_team)
+                if self.scoreline_model.has_team(home) and self.scoreline_model.has_team(away):
+                    batch = self._scoreline_probabilities([home], [away])
+                    scoreline_probs = {task: probs[0] for task, probs in batch.items()}
 
-            if home_stats is None or away_stats is None:
+            # Fast path: serve every market from the score matrix
+            if scoreline_probs is not None and self.scoreline_weight >= 1.0:
+                return self._format_predictions(scoreline_probs)
+
+            home_vector = self.get_team_vector(home_team, is_home=True)
+            away_vector = self.get_team_vector(away_team, is_home=False)
+
+            if home_vector is None or away_vector is None:
                 return None, None
 
-            match_data = pd.DataFrame([{**home_stats, **away_stats}])[self.features]
+            row = self._row_buffer()
+            row[0, self._home_positions] = home_vector
+            row[0, self._away_positions] = away_vector
 
-            predictions = {}
-            probabilities = {}
+            task_probs = {}
 
             for task_name, model in self.models.items():
-                display_name = self.task_mapping.get(task_name, task_name)
-
-                # HOTFIX: Remove `use_label_encoder` right before predict
-                if hasattr(model, 'use_label_encoder'):
-                    try:
-                        delattr(model, 'use_label_encoder')
-                    except Exception as e:
-                        print(f"Warning deleting use_label_encoder from {task_name}: {str(e)}")
-
-                probs = model.predict_proba(match_data)[0]
-
-                if task_name == 'match_outcome':
-                    pred_idx = np.argmax(probs)
-                    predictions[display_name] = ['Home Win', 'Draw', 'Away Win'][pred_idx]
-                    probabilities[display_name] = {
-                        'Home Win': f"{probs[0]:.2%}",
-                        'Draw': f"{probs[1]:.2%}",
-                        'Away Win': f"{probs[2]:.2%}"
-                    }
-                else:
-                    predictions[display_name] = 'Yes' if probs[1] > 0.5 else 'No'
-                    probabilities[display_name] = f"{probs[1]:.2%}"
-
-            return predictions, probabilities
+                task_probs[task_name] = self._predict_proba(task_name, model, row)[0]
+
+            if scoreline_probs is not None:
+                task_probs = self._blend(task_probs, scoreline_probs)
+
+            return self._format_predictions(task_probs)
 
         except Exception as e:
             print(f"Error predicting {home_team} vs {away_team}: {str(e)}")
             return None, None
 
+    def predict_batch(self, fixtures: List[Tuple[str, str]]) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        """
+        Make predictions for many matches with one predict_proba call per model.
+
+        Args:
+            fixtures: (home_team, away_team) pairs
+
+        Returns:
+            One (predictions, probabilities) pair per fixture, in order;
+            (None, None) where a team has no stats
+        """
+        fixtures = [(self.team_mapper.standardize_name(home), self.team_mapper.standardize_name(away))
+                    for home, away in fixtures]
+
+        if self.cache is None:
+            return self._predict_batch(fixtures)
+
+        results = [self.cache.get(self._cache_key(home, away)) for home, away in fixtures]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            computed = self._predict_batch([fixtures[i] for i in missing])
+            for i, result in zip(missing, computed):
+                results[i] = result
+                if result[0] is not None:
+                    self.cache.put(self._cache_key(*fixtures[i]), result)
+
+        return results
+
+    def _predict_batch(self, fixtures: List[Tuple[str, str]]) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        """Uncached batch prediction over standardized team names."""
+        n = len(fixtures)
+        results = [(None, None)] * n
+        if n == 0:
+            return results
+
+        # Scoreline model for every fixture it knows both teams of
+        scoreline_rows = {}
+        if self.scoreline_model is not None:
+            known = [i for i, (home, away) in enumerate(fixtures)
+                     if self.scoreline_model.has_team(home) and self.scoreline_model.has_team(away)]
+            if known:
+                batch = self._scoreline_probabilities([fixtures[i][0] for i in known],
+                                                      [fixtures[i][1] for i in known])
+                for pos, i in enumerate(known):
+                    scoreline_rows[i] = {task: probs[pos] for task, probs in batch.items()}
+
+        # Ensembles for everything the fast path does not fully cover
+        lookup_start = time.perf_counter()
+        ensemble_rows, home_idx, away_idx = [], [], []
+        for i, (home, away) in enumerate(fixtures):
+            if i in scoreline_rows and self.scoreline_weight >= 1.0:
+                continue
+            h = self._home_rows.get(home)
+            a = self._away_rows.get(away)
+            if h is None or a is None:
+                print(f"Error getting stats for {home if h is None else away}: no matches")
+                continue
+            ensemble_rows.append(i)
+            home_idx.append(h)
+            away_idx.append(a)
+
+        ensemble_probs = {}
+        if ensemble_rows and self.models:
+            X = np.empty((len(ensemble_rows), len(self.features)), dtype=np.float32)
+            X[:, self._home_positions] = self._home_matrix[home_idx]
+            X[:, self._away_positions] = self._away_matrix[away_idx]
+            observe(LOOKUP_LATENCY, time.perf_counter() - lookup_start, path='batch')
+
+            for task_name, model in self.models.items():
+                ensemble_probs[task_name] = self._predict_proba(task_name, model, X)
+
+        for pos, i in enumerate(ensemble_rows):
+            task_probs = {task: probs[pos] for task, probs in ensemble_probs.items()}
+            if i in scoreline_rows:
+                task_probs = self._blend(task_probs, scoreline_rows[i])
+            if task_probs:
+                results[i] = self._format_predictions(task_probs)
+
+        for i, probs in scoreline_rows.items():
+            if results[i][0] is None and self.scoreline_weight >= 1.0:
+                results[i] = self._format_predictions(probs)
+
+        return results
+
     def predict_matches(self, matches: List[Tuple[str, str]]) -> None:
         """Predict multiple matches and print results."""
         print("\nMatch Predictions:")
-        for home_team, away_team in matches:
+        results = self.predict_batch(matches)
+        for (home_team, away_team), (predictions, probabilities) in zip(matches, results):
             print(f"\n{home_team} vs {away_team}")
 
-            predictions, probabilities = self.predict_match(home_team, away_team)
-
             if predictions and probabilities:
                 print("\nPredictions:")
                 for task, pred in predictions.items():
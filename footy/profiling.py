@@ -0,0 +1,214 @@
+# footy/profiling.py
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from footy.metrics import STAGE_SECONDS, observe
+
+PROFILERS = ('cprofile', 'sample')
+
+
+def _shape(obj) -> Optional[List[int]]:
+    """[rows, columns] of a DataFrame/array (or [rows] of a Series)."""
+    shape = getattr(obj, 'shape', None)
+    return list(shape) if shape is not None else None
+
+
+def _rss() -> Optional[int]:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+class _Monitor(threading.Thread):
+    """
+    Polls the process RSS for its peak and, optionally, samples the stack
+    of the profiled thread into folded stacks ("a;b;c count", the input
+    format of flamegraph.pl and speedscope).
+    """
+
+    def __init__(self, thread_id: int, interval: float, sample_stacks: bool):
+        super().__init__(name='stage-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.sample_stacks = sample_stacks
+        self.peak_rss = _rss()
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            rss = _rss()
+            if rss is not None and rss > (self.peak_rss or 0):
+                self.peak_rss = rss
+            if self.sample_stacks:
+                frame = sys._current_frames().get(self.thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class StageRecord:
+    """What one stage measured; set ``output`` to record the output shape."""
+
+    def __init__(self, name: str, inputs=None):
+        self.name = name
+        self.input_shape = _shape(inputs)
+        self.output = None
+        self.stats = {}
+
+    def as_dict(self) -> Dict:
+        return {'stage': self.name, 'input_shape': self.input_shape,
+                'output_shape': _shape(self.output), **self.stats}
+
+
+class StageProfiler:
+    """
+    Per-stage wall time, CPU time, peak RSS delta and input/output shapes.
+
+    Stage durations always go to the footy_pipeline_stage_seconds metric;
+    the rest is only measured when the profiler is enabled, optionally
+    with a cProfile dump (``<stage>.prof``, for pstats/snakeviz) or a
+    sampling-profiler dump (``<stage>.folded``) per stage.
+    """
+
+    def __init__(self, enabled: bool = False, profiler: Optional[str] = None,
+                 output_dir='profiles', sample_interval: float = 0.005):
+        """
+        Args:
+            enabled: Measure more than the stage duration
+            profiler: None, 'cprofile' or 'sample'
+            output_dir: Directory for the report and profile dumps
+            sample_interval: Seconds between RSS polls and stack samples
+        """
+        if profiler is not None and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}', expected one of {PROFILERS}")
+        self.enabled = enabled
+        self.profiler = profiler if enabled else None
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval
+        self.records: List[StageRecord] = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, inputs=None):
+        """
+        Profile the enclosed block as stage ``name``.
+
+        Args:
+            name: Stage name (also the metric label)
+            inputs: The stage's input frame, for its shape
+        """
+        record = StageRecord(name, inputs)
+        if not self.enabled:
+            start = time.perf_counter()
+            try:
+                yield record
+            finally:
+                observe(STAGE_SECONDS, time.perf_counter() - start, stage=name)
+            return
+
+        monitor = _Monitor(threading.get_ident(), self.sample_interval, self.profiler == 'sample')
+        rss_before = monitor.peak_rss
+        profile = None
+        if self.profiler == 'cprofile':
+            import cProfile
+            profile = cProfile.Profile()
+
+        monitor.start()
+        cpu_start, start = time.process_time(), time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            wall, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+            monitor.stop()
+            observe(STAGE_SECONDS, wall, stage=name)
+
+            rss_after = _rss()
+            record.stats = {
+                'wall_s': wall,
+                'cpu_s': cpu,
+                'cpu_utilisation': cpu / wall if wall > 0 else None,
+                'rss_before_mb': rss_before / 2 ** 20 if rss_before is not None else None,
+                'rss_after_mb': rss_after / 2 ** 20 if rss_after is not None else None,
+                'peak_rss_delta_mb': ((max(monitor.peak_rss, rss_after) - rss_before) / 2 ** 20
+                                      if rss_before is not None else None)
+            }
+            if profile is not None or monitor.stacks:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+            if profile is not None:
+                path = self.output_dir / f"{name}.prof"
+                profile.dump_stats(str(path))
+                record.stats['profile'] = str(path)
+            if monitor.stacks:
+                path = self.output_dir / f"{name}.folded"
+                path.write_text(''.join(f"{stack} {count}\n" for stack, count in monitor.stacks.most_common()))
+                record.stats['profile'] = str(path)
+                record.stats['samples'] = sum(monitor.stacks.values())
+            self.records.append(record)
+
+    def report(self) -> Dict:
+        """Every profiled stage plus totals; each stage's share of the profiled wall time."""
+        stages = [record.as_dict() for record in self.records]
+        profiled = sum(stage['wall_s'] for stage in stages)
+        for stage in stages:
+            stage['share'] = stage['wall_s'] / profiled if profiled else None
+        return {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'total_wall_s': time.perf_counter() - self.started,
+            'profiled_wall_s': profiled,
+            'stages': stages
+        }
+
+    def table(self, report: Optional[Dict] = None) -> str:
+        """The report as a fixed-width text table."""
+        report = report or self.report()
+
+        def shape(value):
+            return 'x'.join(str(v) for v in value) if value else '-'
+
+        def number(value, fmt):
+            return format(value, fmt) if value is not None else '-'
+
+        lines = [f"{'stage':<20} {'wall s':>9} {'share':>6} {'cpu s':>9} {'cpu/wall':>8} "
+                 f"{'peak ΔRSS MB':>12} {'in':>12} {'out':>12}"]
+        for stage in report['stages']:
+            lines.append(f"{stage['stage']:<20} {stage['wall_s']:9.2f} {stage['share'] * 100:5.1f}% "
+                         f"{stage['cpu_s']:9.2f} {number(stage['cpu_utilisation'], '8.2f')} "
+                         f"{number(stage['peak_rss_delta_mb'], '12.1f')} "
+                         f"{shape(stage['input_shape']):>12} {shape(stage['output_shape']):>12}")
+        lines.append(f"{'total':<20} {report['total_wall_s']:9.2f} "
+                     f"(profiled stages {report['profiled_wall_s']:.2f} s)")
+        return '\n'.join(lines)
+
+    def write(self, path=None) -> Optional[Path]:
+        """Write the JSON report (default: <output_dir>/profile_report.json) and print the table."""
+        if not self.enabled:
+            return None
+        report = self.report()
+        path = Path(path) if path else self.output_dir / 'profile_report.json'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f"\n{self.table(report)}\n\nProfile report written to {path}")
+        return path
@@ -0,0 +1,280 @@
+# footy/scoreline_model.py
+
+import os
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.special import gammaln
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def outcome_probabilities(matrices: np.ndarray) -> np.ndarray:
+    """
+    Collapse score matrices into home/draw/away probabilities.
+
+    Args:
+        matrices: Array of shape (n, G+1, G+1), rows are home goals
+
+    Returns:
+        Array of shape (n, 3) ordered Home Win, Draw, Away Win
+    """
+    home = np.tril(matrices, -1).sum(axis=(1, 2))
+    draw = np.trace(matrices, axis1=1, axis2=2)
+    away = np.triu(matrices, 1).sum(axis=(1, 2))
+    return np.stack([home, draw, away], axis=1)
+
+
+def over_probability(matrices: np.ndarray, line: float) -> np.ndarray:
+    """Probability that total goals exceed ``line`` for each matrix."""
+    size = matrices.shape[-1]
+    totals = np.add.outer(np.arange(size), np.arange(size))
+    return matrices[:, totals > line].sum(axis=1)
+
+
+def btts_probability(matrices: np.ndarray) -> np.ndarray:
+    """Probability that both teams score for each matrix."""
+    return matrices[:, 1:, 1:].sum(axis=(1, 2))
+
+
+def correct_score_probabilities(matrices: np.ndarray, top_n: int = 3) -> List[List[Tuple[str, float]]]:
+    """
+    Most likely exact scores for each matrix.
+
+    Args:
+        matrices: Array of shape (n, G+1, G+1)
+        top_n: Number of scorelines to return per fixture
+
+    Returns:
+        One list of ("home-away", probability) pairs per fixture
+    """
+    size = matrices.shape[-1]
+    flat = matrices.reshape(len(matrices), -1)
+    top = np.argsort(flat, axis=1)[:, ::-1][:, :top_n]
+    return [
+        [(f"{idx // size}-{idx % size}", float(row[idx])) for idx in order]
+        for row, order in zip(flat, top)
+    ]
+
+
+class ScorelineModel:
+    """
+    Dixon-Coles bivariate Poisson model of full-time scorelines.
+
+    Each team gets an attack and a defence parameter, shared by a global
+    intercept, a home advantage term and the Dixon-Coles low-score
+    correlation ``rho``. Every goal market is derived from one score matrix.
+    """
+
+    def __init__(self, max_goals: int = 10, xi: float = 0.0, l2: float = 1e-3):
+        """
+        Args:
+            max_goals: Largest goal count per side kept in the score matrix
+            xi: Exponential time-decay rate per day for older matches
+            l2: Ridge penalty on attack/defence parameters (identifiability)
+        """
+        self.max_goals = max_goals
+        self.xi = xi
+        self.l2 = l2
+        self.teams: List[str] = []
+        self.team_index: Dict[str, int] = {}
+        self.attack = np.zeros(0)
+        self.defence = np.zeros(0)
+        self.intercept = 0.0
+        self.home_advantage = 0.0
+        self.rho = 0.0
+
+    def _unpack(self, params: np.ndarray) -> Tuple[float, float, float, np.ndarray, np.ndarray]:
+        n = len(self.teams)
+        return params[0], params[1], params[2], params[3:3 + n], params[3 + n:3 + 2 * n]
+
+    @staticmethod
+    def _tau(x, y, lam, mu, rho):
+        """Dixon-Coles correction factor and its log-derivatives."""
+        tau = np.ones_like(lam)
+        d_lam = np.zeros_like(lam)
+        d_mu = np.zeros_like(lam)
+        d_rho = np.zeros_like(lam)
+
+        m00 = (x == 0) & (y == 0)
+        m01 = (x == 0) & (y == 1)
+        m10 = (x == 1) & (y == 0)
+        m11 = (x == 1) & (y == 1)
+
+        tau[m00] = 1 - lam[m00] * mu[m00] * rho
+        tau[m01] = 1 + lam[m01] * rho
+        tau[m10] = 1 + mu[m10] * rho
+        tau[m11] = 1 - rho
+        tau = np.maximum(tau, 1e-10)
+
+        # Derivatives of log(tau) w.r.t. log(lambda), log(mu) and rho
+        d_lam[m00] = -lam[m00] * mu[m00] * rho / tau[m00]
+        d_mu[m00] = d_lam[m00]
+        d_rho[m00] = -lam[m00] * mu[m00] / tau[m00]
+        d_lam[m01] = lam[m01] * rho / tau[m01]
+        d_rho[m01] = lam[m01] / tau[m01]
+        d_mu[m10] = mu[m10] * rho / tau[m10]
+        d_rho[m10] = mu[m10] / tau[m10]
+        d_rho[m11] = -1 / tau[m11]
+
+        return tau, d_lam, d_mu, d_rho
+
+    def _negative_log_likelihood(self, params, home_idx, away_idx, x, y, weights, const):
+        """Weighted negative log-likelihood and its gradient over all matches."""
+        n = len(self.teams)
+        intercept, home_adv, rho, attack, defence = self._unpack(params)
+
+        log_lam = intercept + home_adv + attack[home_idx] + defence[away_idx]
+        log_mu = intercept + attack[away_idx] + defence[home_idx]
+        lam = np.exp(log_lam)
+        mu = np.exp(log_mu)
+
+        tau, d_lam, d_mu, d_rho = self._tau(x, y, lam, mu, rho)
+        ll = weights * (x * log_lam - lam + y * log_mu - mu + np.log(tau) - const)
+
+        # Gradients w.r.t. the two linear predictors
+        g_lam = weights * (x - lam + d_lam)
+        g_mu = weights * (y - mu + d_mu)
+
+        grad = np.empty_like(params)
+        grad[0] = g_lam.sum() + g_mu.sum()
+        grad[1] = g_lam.sum()
+        grad[2] = (weights * d_rho).sum()
+        grad[3:3 + n] = (np.bincount(home_idx, g_lam, minlength=n) +
+                         np.bincount(away_idx, g_mu, minlength=n))
+        grad[3 + n:] = (np.bincount(away_idx, g_lam, minlength=n) +
+                        np.bincount(home_idx, g_mu, minlength=n))
+
+        penalty = self.l2 * (np.sum(attack ** 2) + np.sum(defence ** 2))
+        grad[3:] -= 2 * self.l2 * params[3:]
+
+        return -(ll.sum() - penalty), -grad
+
+    def fit(self, df: pd.DataFrame) -> 'ScorelineModel':
+        """
+        Fit team parameters by maximum likelihood.
+
+        Args:
+            df: Match data with HomeTeam, AwayTeam, FTHG, FTAG (and Date for decay)
+
+        Returns:
+            The fitted model
+        """
+        df = df.dropna(subset=['HomeTeam', 'AwayTeam', 'FTHG', 'FTAG'])
+
+        self.teams = sorted(set(df['HomeTeam']) | set(df['AwayTeam']))
+        self.team_index = {team: idx for idx, team in enumerate(self.teams)}
+        n = len(self.teams)
+
+        home_idx = df['HomeTeam'].map(self.team_index).to_numpy()
+        away_idx = df['AwayTeam'].map(self.team_index).to_numpy()
+        x = df['FTHG'].to_numpy(dtype=float)
+        y = df['FTAG'].to_numpy(dtype=float)
+
+        if self.xi > 0 and 'Date' in df.columns:
+            dates = pd.to_datetime(df['Date'])
+            days_ago = (dates.max() - dates).dt.days.to_numpy(dtype=float)
+            weights = np.exp(-self.xi * days_ago)
+        else:
+            weights = np.ones(len(df))
+
+        const = gammaln(x + 1) + gammaln(y + 1)
+
+        params = np.zeros(3 + 2 * n)
+        params[0] = np.log(max((x.mean() + y.mean()) / 2, 1e-3))
+        bounds = [(None, None), (None, None), (-0.2, 0.2)] + [(None, None)] * (2 * n)
+
+        result = minimize(
+            self._negative_log_likelihood,
+            params,
+            args=(home_idx, away_idx, x, y, weights, const),
+            jac=True,
+            method='L-BFGS-B',
+            bounds=bounds
+        )
+
+        self.intercept, self.home_advantage, self.rho, self.attack, self.defence = self._unpack(result.x)
+        self.attack = self.attack.copy()
+        self.defence = self.defence.copy()
+        return self
+
+    def has_team(self, team: str) -> bool:
+        """Whether the team was seen during fitting."""
+        return team in self.team_index
+
+    def expected_goals(self, home_teams: Sequence[str], away_teams: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Expected home and away goals for each fixture."""
+        unknown = [t for t in set(home_teams) | set(away_teams) if t not in self.team_index]
+        if unknown:
+            raise ValueError(f"Unknown teams for scoreline model: {', '.join(sorted(unknown))}")
+
+        home_idx = np.fromiter((self.team_index[t] for t in home_teams), dtype=np.intp, count=len(home_teams))
+        away_idx = np.fromiter((self.team_index[t] for t in away_teams), dtype=np.intp, count=len(away_teams))
+
+        lam = np.exp(self.intercept + self.home_advantage + self.attack[home_idx] + self.defence[away_idx])
+        mu = np.exp(self.intercept + self.attack[away_idx] + self.defence[home_idx])
+        return lam, mu
+
+    def score_matrix(self, home_teams: Sequence[str], away_teams: Sequence[str]) -> np.ndarray:
+        """
+        Score probability matrices for a batch of fixtures.
+
+        Args:
+            home_teams: Home team names
+            away_teams: Away team names, aligned with ``home_teams``
+
+        Returns:
+            Array of shape (n, max_goals+1, max_goals+1); entry [k, i, j] is
+            the probability that fixture k ends i-j
+        """
+        lam, mu = self.expected_goals(home_teams, away_teams)
+
+        goals = np.arange(self.max_goals + 1)
+        log_fact = gammaln(goals + 1)
+        home_pmf = np.exp(goals * np.log(lam)[:, None] - lam[:, None] - log_fact)
+        away_pmf = np.exp(goals * np.log(mu)[:, None] - mu[:, None] - log_fact)
+
+        matrices = home_pmf[:, :, None] * away_pmf[:, None, :]
+
+        # Dixon-Coles adjustment of the four low-scoring cells
+        rho = self.rho
+        matrices[:, 0, 0] *= 1 - lam * mu * rho
+        matrices[:, 0, 1] *= 1 + lam * rho
+        matrices[:, 1, 0] *= 1 + mu * rho
+        matrices[:, 1, 1] *= 1 - rho
+
+        matrices /= matrices.sum(axis=(1, 2), keepdims=True)
+        return matrices
+
+    def predict_markets(self, home_teams: Sequence[str], away_teams: Sequence[str],
+                        lines: Iterable[float] = (1.5, 2.5), top_n: int = 3) -> Dict:
+        """
+        Derive every goal market for a batch of fixtures from one matrix each.
+
+        Returns:
+            Dict with 'outcome' (n, 3), 'over' {line: (n,)}, 'btts' (n,)
+            and 'correct_score' (list of top scorelines per fixture)
+        """
+        matrices = self.score_matrix(home_teams, away_teams)
+        return {
+            'outcome': outcome_probabilities(matrices),
+            'over': {line: over_probability(matrices, line) for line in lines},
+            'btts': btts_probability(matrices),
+            'correct_score': correct_score_probabilities(matrices, top_n)
+        }
+
+    def save(self, path):
+        """Save the fitted model to disk"""
+        import joblib
+        joblib.dump(self, path)
+
+
+def load_scoreline_model(path) -> Optional[ScorelineModel]:
+    """Load a saved scoreline model, or return None if it is not available."""
+    if not os.path.exists(path):
+        return None
+    try:
+        import joblib
+        return joblib.load(path)
+    except Exception as e:
+        print(f"Error loading scoreline model: {str(e)}")
+        return None
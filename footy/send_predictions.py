@@ -1,45 +1,80 @@
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-import requests
+# footy/send_predictions.py
 
-def send_daily_predictions_email():
-    try:
-        # Fetch live predictions
-        response = requests.get('http://127.0.0.1:5000/api/live-predictions')
-        data = response.json()
+import os
 
-        if data['status'] != 'success':
-            print("[ERROR] No predictions to send today.")
-            return
+from footy.digest import DigestSender, load_subscribers, pool_from_env
+
+
+def collect_predictions():
+    """
+    Today's live and scheduled fixtures, predicted in-process.
+
+    Uses the same model bundle, team resolver and batch predictor as the
+    web app, without going through its HTTP API.
+    """
+    from app.services.fixtures import live_fixtures
+    from app.services.football_service import FootballDataService
+    from app.services.model_registry import registry
+
+    bundle = registry.get()
+    if bundle is None:
+        print("[ERROR] Models not loaded.")
+        return []
 
-        predictions = data['predictions']
+    matches = (FootballDataService().get_live_matches() or {}).get('matches', [])
+    fixtures, skipped = live_fixtures(matches, bundle.resolver)
+    if skipped:
+        print(f"[SKIPPED❗] {len(skipped)} fixtures without a team match")
 
-        # Build the email content
-        html = "<h2>Today's Predictions</h2><ul>"
-        for pred in predictions:
-            html += f"<li><b>{pred['home_team']} vs {pred['away_team']}</b>: {pred['predictions']['Match Outcome']}</li>"
-        html += "</ul>"
+    return [
+        {
+            'home_team': home,
+            'away_team': away,
+            'league': bundle.leagues.get(home),
+            'predictions': preds,
+            'probabilities': probs
+        }
+        for (home, away), (preds, probs) in zip(fixtures, bundle.predictor.predict_batch(fixtures))
+        if preds and probs
+    ]
 
-        # Set up email
-        sender_email = "your_email@gmail.com"
-        receiver_email = "recipient_email@gmail.com"
-        password = "your_password"
 
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = "Daily Football Predictions ⚽"
-        msg['From'] = sender_email
-        msg['To'] = receiver_email
+def send_daily_predictions_email(subscribers=None, predictions=None, pool=None):
+    """
+    Send today's digest to every subscriber.
 
-        part = MIMEText(html, 'html')
-        msg.attach(part)
+    Args:
+        subscribers: Subscriber dicts (default: loaded from DIGEST_SUBSCRIBERS)
+        predictions: Prediction dicts (default: collect_predictions())
+        pool: SMTPPool (default: configured from the SMTP_* variables)
 
-        # Send
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(sender_email, password)
-            server.sendmail(sender_email, receiver_email, msg.as_string())
+    Returns:
+        DigestSender report, or None when there was nothing to send
+    """
+    try:
+        if subscribers is None:
+            subscribers = load_subscribers(os.getenv('DIGEST_SUBSCRIBERS', 'data/subscribers.csv'))
+        if predictions is None:
+            predictions = collect_predictions()
+
+        if not predictions:
+            print("[ERROR] No predictions to send today.")
+            return None
 
-        print("[✅] Email sent successfully!")
+        sender = DigestSender(pool or pool_from_env(),
+                              sender=os.getenv('DIGEST_FROM', os.getenv('SMTP_USER', 'predictions@localhost')),
+                              retries=int(os.getenv('DIGEST_RETRIES', '3')))
+        report = sender.send(subscribers, predictions)
+
+        print(f"[✅] Digest sent to {report['sent']} subscribers ({report['skipped']} skipped, "
+              f"{report['failed']} failed, {report['retries']} retries) over {report['connections']} "
+              f"connections in {report['seconds']:.1f}s")
+        return report
 
     except Exception as e:
         print(f"[🚨] Error sending daily predictions: {str(e)}")
+        return None
+
+
+if __name__ == "__main__":
+    send_daily_predictions_email()
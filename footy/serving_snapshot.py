@@ -0,0 +1,78 @@
+# footy/serving_snapshot.py
+
+import json
+import os
+import time
+import numpy as np
+from typing import Dict, Optional
+
+SNAPSHOT_FORMAT = 1
+
+
+def build_snapshot(df, team_encodings: Optional[Dict[str, int]] = None) -> Dict:
+    """
+    Extract what serving needs from the engineered frame.
+
+    That is each team's latest home-side and away-side feature row (the
+    rows MatchPredictor indexes), the team list and encodings, and each
+    team's league.
+
+    Args:
+        df: Engineered match data
+        team_encodings: FootballFeatureEngineering.team_encodings (default: sorted team order)
+
+    Returns:
+        Snapshot dict, see ``save_snapshot``
+    """
+    from footy.predictor_utils import MatchPredictor
+
+    index = MatchPredictor(df, {})
+    teams = sorted(set(df['HomeTeam'].unique()) | set(df['AwayTeam'].unique()))
+
+    leagues = {}
+    if 'League' in df.columns:
+        latest = df.sort_values('Date', kind='mergesort').drop_duplicates('HomeTeam', keep='last')
+        leagues = dict(zip(latest['HomeTeam'], latest['League'].astype(str)))
+
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'created_at': time.time(),
+        'teams': teams,
+        'encodings': {team: int(code) for team, code in (team_encodings or
+                                                         {t: i for i, t in enumerate(teams)}).items()},
+        'leagues': leagues,
+        'home_features': index.home_features,
+        'away_features': index.away_features,
+        'home_teams': list(index._home_rows),
+        'away_teams': list(index._away_rows),
+        'home_matrix': index._home_matrix.astype(np.float32),
+        'away_matrix': index._away_matrix.astype(np.float32)
+    }
+
+
+def save_snapshot(snapshot: Dict, path) -> None:
+    """
+    Write a snapshot as an uncompressed ``.npz``: the two matrices plus a
+    JSON metadata entry. No pickles, so loading needs neither pandas nor
+    the training code. Written atomically, since workers may hot-reload it.
+    """
+    path = str(path)
+    metadata = {key: value for key, value in snapshot.items() if not key.endswith('_matrix')}
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path,
+             metadata=np.array(json.dumps(metadata)),
+             home_matrix=np.ascontiguousarray(snapshot['home_matrix'], dtype=np.float32),
+             away_matrix=np.ascontiguousarray(snapshot['away_matrix'], dtype=np.float32))
+    os.replace(tmp_path, path)
+    print(f"Serving snapshot saved to {path} ({os.path.getsize(path) / 2 ** 10:.0f} KB)")
+
+
+def load_snapshot(path) -> Dict:
+    """Read a snapshot written by ``save_snapshot``."""
+    with np.load(str(path), allow_pickle=False) as data:
+        snapshot = json.loads(str(data['metadata']))
+        if snapshot.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format {snapshot.get('format')}")
+        snapshot['home_matrix'] = data['home_matrix']
+        snapshot['away_matrix'] = data['away_matrix']
+    return snapshot
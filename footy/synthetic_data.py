@@ -0,0 +1,199 @@
+# footy/synthetic_data.py
+
+import numpy as np
+import pandas as pd
+from scipy.stats import poisson, skellam
+from typing import Iterator, List, Optional, Sequence
+
+# Same columns, in the same order, as the merged workbooks (cleaned_euro_data.csv)
+COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'FTR', 'HTHG', 'HTAG', 'HTR',
+           'HS', 'AS', 'HST', 'AST', 'HF', 'AF', 'HC', 'AC', 'HY', 'AY', 'HR', 'AR',
+           'B365H', 'B365D', 'B365A', 'B365CH', 'B365CD', 'B365CA', 'B365C>2.5', 'B365C<2.5',
+           'B365CAHH', 'B365CAHA', 'Season', 'League', 'IWCH', 'IWCD', 'IWCA', 'VCCH', 'VCCD', 'VCCA']
+
+LEAGUE_CODES = ['E0', 'E1', 'E2', 'E3', 'EC', 'SC0', 'SC1', 'SC2', 'SC3', 'D1', 'D2', 'I1', 'I2',
+                'SP1', 'SP2', 'F1', 'F2', 'N1', 'B1', 'P1', 'T1', 'G1']
+
+# Goal rates before the team-strength spread, which lifts the averages to
+# the bundled data's 1.53 home / 1.25 away goals per match
+HOME_GOALS = 1.45
+AWAY_GOALS = 1.19
+BOOKMAKER_MARGIN = 0.05
+
+
+def round_robin(n_teams: int) -> np.ndarray:
+    """
+    Double round-robin schedule by the circle method.
+
+    Returns:
+        int array (rounds, n_teams // 2, 2) of (home, away) team indices;
+        every pair meets once at each ground. An odd team count gets a bye.
+    """
+    n = n_teams + n_teams % 2
+    rounds = np.arange(n - 1)[:, None]
+    positions = np.arange(n // 2)[None, :]
+
+    def team_at(position):
+        # Position 0 stays put, the others rotate one step per round
+        return np.where(position == 0, 0, (position - 1 + rounds) % (n - 1) + 1)
+
+    first, second = team_at(positions), team_at(n - 1 - positions)
+    # Swap grounds every other round: a team moves one position per round
+    # and so alternates home and away, with a repeat when it crosses sides
+    swap = np.broadcast_to(rounds % 2 == 1, first.shape)
+    home, away = np.where(swap, second, first), np.where(swap, first, second)
+
+    half = np.stack([home, away], axis=-1)
+    schedule = np.concatenate([half, half[..., ::-1]])
+    if n != n_teams:
+        # Drop the matches against the bye slot
+        keep = (schedule < n_teams).all(axis=-1)
+        schedule = schedule[keep].reshape(2 * (n - 1), n_teams // 2, 2)
+    return schedule
+
+
+def _odds(probabilities: np.ndarray, rng: np.random.Generator, noise: float) -> np.ndarray:
+    """Decimal odds with a bookmaker margin and some per-book noise."""
+    jitter = rng.normal(1.0, noise, probabilities.shape) if noise else 1.0
+    return np.round(1.0 / np.clip(probabilities * (1 + BOOKMAKER_MARGIN) * jitter, 0.01, 0.99), 2).astype(np.float32)
+
+
+def generate_matches(leagues: int = 22, teams_per_league: int = 20, seasons: int = 2,
+                     first_season: int = 2023, seed: Optional[int] = 0,
+                     league_codes: Optional[Sequence[str]] = None, odds: bool = True) -> pd.DataFrame:
+    """
+    Synthetic matches in the football-data.co.uk format.
+
+    Every league plays a double round-robin per season, one round a week
+    (or more often when there are many teams) from mid-August. Goals are
+    Poisson with per-team attack/defence strengths that drift between
+    seasons; shots, fouls, corners and cards are drawn around their
+    real-data averages and odds follow from the goal model. Everything is
+    generated with array operations, so tens of millions of matches take
+    seconds to minutes, and team/league/season columns are categoricals.
+
+    Args:
+        leagues: Number of leagues
+        teams_per_league: Teams in each league
+        seasons: Consecutive seasons per league
+        first_season: Start year of the first season
+        seed: RNG seed; the same arguments and seed give the same frame
+        league_codes: League names (default: real codes, then L23, L24, ...)
+        odds: Include the bookmaker odds columns
+
+    Returns:
+        DataFrame with COLUMNS (minus the odds when ``odds`` is False),
+        sorted by date
+    """
+    rng = np.random.default_rng(seed)
+    schedule = round_robin(teams_per_league)
+    n_rounds, per_round = schedule.shape[:2]
+
+    codes = list(league_codes or LEAGUE_CODES[:leagues])
+    codes += [f"L{i + 1}" for i in range(len(codes), leagues)]
+
+    # Team order is reshuffled per (league, season) so fixtures differ between seasons
+    shuffle = np.argsort(rng.random((leagues, seasons, teams_per_league)), axis=-1)
+    home_slot, away_slot = schedule[..., 0].ravel(), schedule[..., 1].ravel()
+    home_local = np.take_along_axis(shuffle, np.broadcast_to(home_slot, (leagues, seasons, home_slot.size)), -1)
+    away_local = np.take_along_axis(shuffle, np.broadcast_to(away_slot, (leagues, seasons, away_slot.size)), -1)
+    league_index = np.broadcast_to(np.arange(leagues)[:, None, None], home_local.shape)
+    season_index = np.broadcast_to(np.arange(seasons)[None, :, None], home_local.shape)
+    home = (league_index * teams_per_league + home_local).ravel()
+    away = (league_index * teams_per_league + away_local).ravel()
+    league_index, season_index = league_index.ravel(), season_index.ravel()
+    n = home.size
+
+    # Dates: weekly rounds from mid-August, tighter when a season has more rounds
+    round_index = np.tile(np.repeat(np.arange(n_rounds), per_round), leagues * seasons)
+    spacing = min(7.0, 280.0 / n_rounds)
+    season_start = np.array([f"{first_season + s}-08-10" for s in range(seasons)], dtype='datetime64[D]')
+    offsets = np.floor(round_index * spacing).astype(np.int64) + rng.integers(0, 3, n)
+    dates = season_start[season_index] + offsets.astype('timedelta64[D]')
+
+    # Goal model: log-rate = base + attack(home) - defence(away), strengths drifting per season
+    n_teams = leagues * teams_per_league
+    attack = rng.normal(0, 0.25, n_teams)[:, None] + rng.normal(0, 0.08, (n_teams, seasons)).cumsum(axis=1)
+    defence = rng.normal(0, 0.20, n_teams)[:, None] + rng.normal(0, 0.08, (n_teams, seasons)).cumsum(axis=1)
+    home_rate = HOME_GOALS * np.exp(attack[home, season_index] - defence[away, season_index])
+    away_rate = AWAY_GOALS * np.exp(attack[away, season_index] - defence[home, season_index])
+
+    fthg = rng.poisson(home_rate).astype(np.int16)
+    ftag = rng.poisson(away_rate).astype(np.int16)
+    hthg = rng.binomial(fthg, 0.45).astype(np.int16)
+    htag = rng.binomial(ftag, 0.45).astype(np.int16)
+
+    def result(home_goals, away_goals):
+        return pd.Categorical.from_codes(np.sign(home_goals - away_goals).astype(np.int8) + 1,
+                                         categories=['A', 'D', 'H'])
+
+    # Shots on target include the goals; better attacks shoot more
+    hst = fthg + rng.poisson(2.6 * home_rate / HOME_GOALS)
+    ast = ftag + rng.poisson(2.6 * away_rate / AWAY_GOALS)
+    hs = hst + rng.poisson(8.5, n)
+    as_ = ast + rng.poisson(7.5, n)
+
+    team_names = [f"{codes[league]} Team {team + 1:02d}"
+                  for league in range(leagues) for team in range(teams_per_league)]
+
+    data = {
+        'Date': dates,
+        'HomeTeam': pd.Categorical.from_codes(home, categories=team_names),
+        'AwayTeam': pd.Categorical.from_codes(away, categories=team_names),
+        'FTHG': fthg, 'FTAG': ftag, 'FTR': result(fthg, ftag),
+        'HTHG': hthg, 'HTAG': htag, 'HTR': result(hthg, htag),
+        'HS': hs.astype(np.int16), 'AS': as_.astype(np.int16),
+        'HST': hst.astype(np.int16), 'AST': ast.astype(np.int16),
+        'HF': rng.poisson(11.5, n).astype(np.int16), 'AF': rng.poisson(12.0, n).astype(np.int16),
+        'HC': rng.poisson(5.3, n).astype(np.int16), 'AC': rng.poisson(4.4, n).astype(np.int16),
+        'HY': rng.poisson(1.8, n).astype(np.int16), 'AY': rng.poisson(2.0, n).astype(np.int16),
+        'HR': rng.binomial(1, 0.05, n).astype(np.int16), 'AR': rng.binomial(1, 0.06, n).astype(np.int16),
+    }
+
+    if odds:
+        p_home = skellam.sf(0, home_rate, away_rate)
+        p_away = skellam.cdf(-1, home_rate, away_rate)
+        p_draw = np.clip(1.0 - p_home - p_away, 0.0, 1.0)
+        p_under = poisson.cdf(2, home_rate + away_rate)
+        opening = _odds(np.stack([p_home, p_draw, p_away]), rng, 0.04)
+        closing = _odds(np.stack([p_home, p_draw, p_away]), rng, 0.02)
+        totals = _odds(np.stack([1.0 - p_under, p_under]), rng, 0.02)
+        handicap = _odds(np.full((2, n), 0.5), rng, 0.03)
+        data.update({
+            'B365H': opening[0], 'B365D': opening[1], 'B365A': opening[2],
+            'B365CH': closing[0], 'B365CD': closing[1], 'B365CA': closing[2],
+            'B365C>2.5': totals[0], 'B365C<2.5': totals[1],
+            'B365CAHH': handicap[0], 'B365CAHA': handicap[1]
+        })
+
+    data['Season'] = pd.Categorical.from_codes(
+        season_index, categories=[f"{first_season + s}-{first_season + s + 1}" for s in range(seasons)])
+    data['League'] = pd.Categorical.from_codes(league_index, categories=codes[:leagues])
+
+    if odds:
+        for book, noise in (('IW', 0.03), ('VC', 0.03)):
+            book_odds = _odds(np.stack([p_home, p_draw, p_away]), rng, noise)
+            data.update({f'{book}CH': book_odds[0], f'{book}CD': book_odds[1], f'{book}CA': book_odds[2]})
+
+    df = pd.DataFrame(data)
+    order = np.argsort(dates, kind='stable')
+    return df.iloc[order].reset_index(drop=True)
+
+
+def iter_matches(total_leagues: int, leagues_per_chunk: int = 1000, seed: Optional[int] = 0,
+                 **kwargs) -> Iterator[pd.DataFrame]:
+    """
+    ``generate_matches`` in chunks of leagues, for outputs that do not fit in memory.
+
+    Chunk ``i`` is seeded from (seed, i), so the output depends on the
+    seed and the chunk size; league codes run on across chunks.
+
+    Yields:
+        One DataFrame per chunk (each sorted by date)
+    """
+    for chunk, start in enumerate(range(0, total_leagues, leagues_per_chunk)):
+        count = min(leagues_per_chunk, total_leagues - start)
+        codes: List[str] = [LEAGUE_CODES[i] if i < len(LEAGUE_CODES) else f"L{i + 1}"
+                            for i in range(start, start + count)]
+        chunk_seed = None if seed is None else np.random.SeedSequence([seed, chunk])
+        yield generate_matches(leagues=count, seed=chunk_seed, league_codes=codes, **kwargs)
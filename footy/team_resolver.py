@@ -0,0 +1,225 @@
+# footy/team_resolver.py
+
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, Optional
+
+from footy.predictor_utils import TeamMapper
+
+logger = logging.getLogger(__name__)
+
+# Upstream names that need a hand-written answer (matched without club affixes)
+MANUAL_OVERRIDES = {
+    'paris saint germain': 'Paris SG',
+    'manchester united': 'Man United',
+    'manchester city': 'Man City',
+    'club atletico de madrid': 'Ath Madrid',
+    'athletic club': 'Ath Bilbao',
+    'bayern munchen': 'Bayern Munich',
+    'internazionale milano': 'Inter',
+    'olympique lyonnais': 'Lyon',
+    'sporting clube de portugal': 'Sp Lisbon',
+    'sporting clube de braga': 'Sp Braga',
+    'eintracht frankfurt': 'Ein Frankfurt',
+    'real sociedad de futbol': 'Sociedad',
+    'rayo vallecano de madrid': 'Vallecano',
+    'rcd espanyol de barcelona': 'Espanol',
+}
+
+# Club prefixes/suffixes such as "FC" or "AFC"
+AFFIX_TOKENS = {'fc', 'cf', 'afc', 'sc', 'ac', 'ssc', 'rc', 'cd'}
+
+# Tokens that carry no identity on their own (old matcher stripped these too)
+STOP_TOKENS = AFFIX_TOKENS | {'tilburg', 'united', 'city'}
+
+_NON_ALNUM = re.compile(r'[^a-z0-9 ]+')
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    name = name.lower().replace('&', ' and ').replace('-', ' ').replace("'", '')
+    return ' '.join(_NON_ALNUM.sub(' ', name).split())
+
+
+def strip_affixes(normalized: str) -> str:
+    """Normalized name without club prefixes/suffixes."""
+    return ' '.join(t for t in normalized.split() if t not in AFFIX_TOKENS)
+
+
+def core_name(normalized: str) -> str:
+    """Normalized name without the identity-free tokens."""
+    return ' '.join(t for t in normalized.split() if t not in STOP_TOKENS)
+
+
+class TeamResolver:
+    """
+    Resolves upstream (football-data.org) team names to the names in our data.
+
+    Built once from the known team list: an alias table, exact indexes on
+    normalized and core names, and a token inverted index for ranked fuzzy
+    fallback. Resolved upstream names and team IDs are kept in a cache that
+    can be persisted to disk, so repeat lookups are a single dict hit.
+    """
+
+    def __init__(self, known_teams: Iterable[str], cache_path: Optional[str] = None, min_score: float = 0.4):
+        """
+        Args:
+            known_teams: Team names as they appear in the engineered data
+            cache_path: Optional JSON file holding resolved names and IDs
+            min_score: Minimum fuzzy score accepted as a match
+        """
+        self.known_teams = sorted(set(known_teams))
+        self.cache_path = cache_path
+        self.min_score = min_score
+        self._lock = threading.Lock()
+
+        known = set(self.known_teams)
+        self.aliases: Dict[str, str] = {}
+        self.core_index: Dict[str, Optional[str]] = {}
+        self.token_index: Dict[str, set] = {}
+        self._cores: Dict[str, str] = {}
+
+        for team in self.known_teams:
+            normalized = normalize_name(team)
+            core = core_name(normalized) or normalized
+            self._cores[team] = core
+            self.aliases.setdefault(normalized, team)
+            # A core shared by several teams (e.g. "manchester") is ambiguous
+            self.core_index[core] = None if core in self.core_index and self.core_index[core] != team else team
+            for token in core.split():
+                self.token_index.setdefault(token, set()).add(team)
+
+        for upstream, team in list(TeamMapper.TEAM_MAPPINGS.items()) + list(MANUAL_OVERRIDES.items()):
+            if team in known:
+                self.aliases[strip_affixes(normalize_name(upstream))] = team
+
+        self._idf = {token: math.log(1 + len(self.known_teams) / len(teams))
+                     for token, teams in self.token_index.items()}
+
+        self.name_cache: Dict[str, Optional[str]] = {}
+        self.id_cache: Dict[str, str] = {}
+        self._dirty = False
+        self._load_cache()
+
+    def _load_cache(self) -> None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                stored = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable team cache {self.cache_path}: {e}")
+            return
+
+        known = set(self.known_teams)
+        # Entries pointing at teams no longer in the data are dropped
+        self.name_cache = {k: v for k, v in stored.get('names', {}).items() if v in known}
+        self.id_cache = {k: v for k, v in stored.get('ids', {}).items() if v in known}
+
+    @property
+    def dirty(self) -> bool:
+        """True if names or IDs were resolved since the last save."""
+        return self._dirty
+
+    def save(self) -> None:
+        """Write resolved names and IDs to the cache file (atomically), if they changed."""
+        if not self.cache_path or not self._dirty:
+            return
+        with self._lock:
+            data = {
+                'names': {k: v for k, v in self.name_cache.items() if v is not None},
+                'ids': dict(self.id_cache)
+            }
+            self._dirty = False
+
+        # A temp file of our own: other workers and threads save concurrently
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(self.cache_path)}.",
+                                            suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"Could not save team cache {self.cache_path}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _fuzzy_match(self, core: str) -> Optional[str]:
+        """Rank teams sharing tokens with ``core`` by IDF-weighted overlap and similarity."""
+        tokens = set(core.split())
+        candidates = set()
+        for token in tokens:
+            candidates |= self.token_index.get(token, set())
+
+        # Containment either way, as the old matcher did
+        if not candidates:
+            candidates = {team for team, team_core in self._cores.items()
+                          if team_core and (team_core in core or core in team_core)}
+
+        best_team, best_score = None, 0.0
+        for team in sorted(candidates):
+            team_tokens = set(self._cores[team].split())
+            shared = tokens & team_tokens
+            total = sum(self._idf.get(t, 1.0) for t in tokens | team_tokens)
+            overlap = sum(self._idf.get(t, 1.0) for t in shared) / total if total else 0.0
+            similarity = SequenceMatcher(None, core, self._cores[team]).ratio()
+            contained = 1.0 if self._cores[team] in core or core in self._cores[team] else 0.0
+            score = 0.5 * overlap + 0.3 * similarity + 0.2 * contained
+            if score > best_score:
+                best_team, best_score = team, score
+
+        return best_team if best_score >= self.min_score else None
+
+    def _resolve_uncached(self, name: str) -> Optional[str]:
+        normalized = normalize_name(name)
+        core = core_name(normalized)
+
+        team = (self.aliases.get(normalized) or self.aliases.get(strip_affixes(normalized))
+                or self.aliases.get(core))
+        if team:
+            return team
+
+        team = self.core_index.get(core)
+        if team:
+            return team
+
+        return self._fuzzy_match(core or normalized)
+
+    def resolve(self, name: str, team_id=None) -> Optional[str]:
+        """
+        Map an upstream team name (and optional upstream ID) to a known team.
+
+        Returns:
+            The matching team name, or None if nothing is close enough
+        """
+        if team_id is not None:
+            team = self.id_cache.get(str(team_id))
+            if team:
+                return team
+
+        if name in self.name_cache:
+            team = self.name_cache[name]
+        else:
+            team = self._resolve_uncached(name)
+            with self._lock:
+                self.name_cache[name] = team
+                self._dirty = self._dirty or team is not None
+            logger.debug(f"[MATCH] {name} -> {team}")
+
+        if team is not None and team_id is not None and self.id_cache.get(str(team_id)) != team:
+            with self._lock:
+                self.id_cache[str(team_id)] = team
+                self._dirty = True
+
+        return team
@@ -0,0 +1,350 @@
+# footy/training_jobs.py
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+N_SPLITS = 5
+CHECKPOINT_DIR = os.getenv('TRAINING_CHECKPOINT_DIR', 'models/checkpoints')
+QUEUE_DIR = os.getenv('TRAINING_QUEUE_DIR', 'models/training_queue')
+DATA_PATH = os.getenv('TRAINING_DATA_PATH', 'data/processed/processed_data.pkl')
+
+
+def data_signature(X: pd.DataFrame, y: Dict[str, pd.Series], n_splits: int = N_SPLITS) -> str:
+    """
+    Fingerprint of the training inputs: checkpoints made for other data,
+    features or folds must not be resumed from.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(json.dumps([list(X.columns), sorted(y), n_splits]).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    for task in sorted(y):
+        digest.update(pd.util.hash_pandas_object(y[task], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _atomic_write(path: Path, write):
+    """Write via a temp file and rename, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+class TrainingCheckpoint:
+    """
+    One file per finished (task, fold) unit: the fitted model and its
+    validation metrics, under ``directory/<task>/fold_<i>.joblib``.
+
+    ``manifest.json`` records the data signature the units were trained
+    on; ``prepare`` with a different signature discards them.
+    """
+
+    def __init__(self, directory=CHECKPOINT_DIR):
+        """
+        Args:
+            directory: Checkpoint directory (default: TRAINING_CHECKPOINT_DIR or models/checkpoints)
+        """
+        self.directory = Path(directory)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / 'manifest.json'
+
+    def signature(self) -> Optional[str]:
+        try:
+            return json.loads(self.manifest_path.read_text())['signature']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def prepare(self, signature: str, n_splits: int = N_SPLITS) -> List[Tuple[str, int]]:
+        """
+        Get the directory ready for training on data with ``signature``.
+
+        Returns:
+            The (task, fold) units already completed for this signature
+        """
+        if self.signature() != signature:
+            self.clear()
+            _atomic_write(self.manifest_path, lambda p: p.write_text(json.dumps(
+                {'signature': signature, 'n_splits': n_splits,
+                 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')}, indent=2)))
+        return self.completed()
+
+    def clear(self):
+        """Remove every unit and the manifest."""
+        if self.directory.is_dir():
+            for path in self.directory.glob('*/fold_*.joblib'):
+                path.unlink()
+            if self.manifest_path.exists():
+                self.manifest_path.unlink()
+
+    def path(self, task: str, fold: int) -> Path:
+        return self.directory / task / f"fold_{fold}.joblib"
+
+    def completed(self) -> List[Tuple[str, int]]:
+        return sorted((path.parent.name, int(path.stem.split('_')[1]))
+                      for path in self.directory.glob('*/fold_*.joblib'))
+
+    def save(self, task: str, fold: int, model, metrics: Dict, signature: str):
+        import joblib
+        unit = {'task': task, 'fold': fold, 'model': model, 'metrics': metrics, 'signature': signature}
+        _atomic_write(self.path(task, fold), lambda p: joblib.dump(unit, p))
+
+    def load(self, task: str, fold: int, signature: str):
+        """
+        Returns:
+            (model, metrics), or None if the unit is missing, unreadable or
+            was trained on other data
+        """
+        path = self.path(task, fold)
+        if not path.exists():
+            return None
+        try:
+            import joblib
+            unit = joblib.load(path)
+        except Exception as e:
+            print(f"Warning: ignoring unreadable checkpoint {path}: {str(e)}")
+            return None
+        if unit.get('signature') != signature:
+            return None
+        return unit['model'], unit['metrics']
+
+
+class JobQueue:
+    """
+    File-based job queue that several processes (or machines sharing a
+    filesystem) can pull from.
+
+    Jobs are JSON files that move between ``pending/``, ``running/``,
+    ``done/`` and ``failed/``. A claim is an atomic rename out of
+    ``pending/``, so each job goes to exactly one worker. Workers touch
+    their running job as a heartbeat; ``requeue_stale`` puts jobs whose
+    worker stopped heartbeating back in ``pending/``.
+    """
+
+    STATES = ('pending', 'running', 'done', 'failed')
+
+    def __init__(self, directory=QUEUE_DIR):
+        """
+        Args:
+            directory: Queue directory (default: TRAINING_QUEUE_DIR or models/training_queue)
+        """
+        self.directory = Path(directory)
+        for state in self.STATES:
+            (self.directory / state).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, state: str, job_id: str) -> Path:
+        return self.directory / state / f"{job_id}.json"
+
+    def put(self, job_id: str, payload: Dict) -> bool:
+        """Queue a job unless one with the same id is pending or running."""
+        if self._path('pending', job_id).exists() or self._path('running', job_id).exists():
+            return False
+        for state in ('done', 'failed'):
+            if self._path(state, job_id).exists():
+                self._path(state, job_id).unlink()
+        _atomic_write(self._path('pending', job_id), lambda p: p.write_text(json.dumps(payload)))
+        return True
+
+    def claim(self, worker: str) -> Optional[Tuple[str, Dict]]:
+        """Move the first pending job to running/ and return (job_id, payload), or None."""
+        for path in sorted(self.directory.joinpath('pending').glob('*.json')):
+            running = self._path('running', path.stem)
+            try:
+                os.rename(path, running)
+                # The rename keeps the queued mtime: start the heartbeat now, or
+                # requeue_stale could hand a long-queued job straight back
+                os.utime(running)
+            except FileNotFoundError:
+                continue  # another worker got it first
+            payload = json.loads(running.read_text())
+            payload.update(worker=worker, claimed_at=time.time())
+            _atomic_write(running, lambda p: p.write_text(json.dumps(payload)))
+            return path.stem, payload
+        return None
+
+    def heartbeat(self, job_id: str):
+        try:
+            os.utime(self._path('running', job_id))
+        except FileNotFoundError:
+            pass
+
+    def _finish(self, job_id: str, state: str, **fields):
+        running = self._path('running', job_id)
+        try:
+            payload = json.loads(running.read_text())
+        except FileNotFoundError:
+            return
+        payload.update(fields, finished_at=time.time())
+        _atomic_write(self._path(state, job_id), lambda p: p.write_text(json.dumps(payload)))
+        running.unlink()
+
+    def complete(self, job_id: str, **fields):
+        self._finish(job_id, 'done', **fields)
+
+    def fail(self, job_id: str, error: str):
+        self._finish(job_id, 'failed', error=error)
+
+    def requeue_stale(self, timeout: float) -> List[str]:
+        """Move running jobs without a heartbeat for ``timeout`` seconds back to pending/."""
+        requeued = []
+        for path in self.directory.joinpath('running').glob('*.json'):
+            try:
+                if time.time() - path.stat().st_mtime > timeout:
+                    os.rename(path, self._path('pending', path.stem))
+                    requeued.append(path.stem)
+            except FileNotFoundError:
+                continue
+        return requeued
+
+    def counts(self) -> Dict[str, int]:
+        return {state: len(list(self.directory.joinpath(state).glob('*.json'))) for state in self.STATES}
+
+
+def enqueue_training(data_path=DATA_PATH, checkpoint_dir=CHECKPOINT_DIR, queue_dir=QUEUE_DIR,
+                     n_splits: int = N_SPLITS) -> List[str]:
+    """
+    Queue every (task, fold) unit of ``data_path`` that has no checkpoint yet.
+
+    Returns:
+        The queued job ids
+    """
+    from footy.model_training import FootballPredictor
+
+    predictor = FootballPredictor()
+    X, y = predictor.prepare_data(pd.read_pickle(data_path))
+    signature = data_signature(X, y, n_splits)
+    done = set(TrainingCheckpoint(checkpoint_dir).prepare(signature, n_splits))
+
+    queue = JobQueue(queue_dir)
+    queued = []
+    for task in y:
+        for fold in range(n_splits):
+            job_id = f"{task}-fold{fold}"
+            if (task, fold) not in done and queue.put(job_id, {
+                    'task': task, 'fold': fold, 'n_splits': n_splits, 'signature': signature,
+                    'data_path': str(data_path), 'checkpoint_dir': str(checkpoint_dir)}):
+                queued.append(job_id)
+    print(f"✅ Queued {len(queued)} training units ({len(done)} already checkpointed).")
+    return queued
+
+
+def run_worker(queue_dir=QUEUE_DIR, poll_interval: float = 5.0, stale_after: float = 900.0,
+               wait: bool = False) -> int:
+    """
+    Train queued units until the queue is empty (or forever with ``wait``).
+
+    Each unit is checkpointed before its job is marked done, so a worker
+    killed mid-unit only loses that unit, which ``requeue_stale`` hands to
+    another worker once its heartbeat is ``stale_after`` seconds old.
+
+    Returns:
+        Number of units trained
+    """
+    from sklearn.model_selection import TimeSeriesSplit
+    from footy.model_training import FootballPredictor
+
+    queue = JobQueue(queue_dir)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    predictor = FootballPredictor()
+    inputs = {}  # data_path -> (X, y, signature, splits)
+    trained = 0
+
+    while True:
+        for job_id in queue.requeue_stale(stale_after):
+            print(f"Requeued stale job {job_id}")
+        job = queue.claim(worker)
+        if job is None:
+            if not wait:
+                return trained
+            time.sleep(poll_interval)
+            continue
+
+        job_id, payload = job
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(min(poll_interval, stale_after / 3)):
+                queue.heartbeat(job_id)
+
+        heart = threading.Thread(target=beat, name='training-heartbeat', daemon=True)
+        heart.start()
+        try:
+            data_path = payload['data_path']
+            if data_path not in inputs:
+                X, y = predictor.prepare_data(pd.read_pickle(data_path))
+                n_splits = payload['n_splits']
+                inputs[data_path] = (X, y, data_signature(X, y, n_splits),
+                                     list(TimeSeriesSplit(n_splits=n_splits).split(X)))
+            X, y, signature, splits = inputs[data_path]
+            if signature != payload['signature']:
+                raise ValueError(f"{data_path} changed since the job was queued")
+
+            task, fold = payload['task'], payload['fold']
+            print(f"[{worker}] Training {task} fold {fold + 1}/{len(splits)}...")
+            start = time.perf_counter()
+            train_idx, val_idx = splits[fold]
+            model, metrics = predictor.train_fold(task, X, y[task], train_idx, val_idx)
+            TrainingCheckpoint(payload['checkpoint_dir']).save(task, fold, model, metrics, signature)
+            queue.complete(job_id, seconds=time.perf_counter() - start, metrics=metrics)
+            trained += 1
+        except Exception as e:
+            print(f"❌ [{worker}] {job_id} failed: {str(e)}")
+            queue.fail(job_id, traceback.format_exc())
+        finally:
+            stop.set()
+            heart.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpointed training units on a file-based job queue.")
+    parser.add_argument('--queue-dir', default=QUEUE_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help="queue every unit without a checkpoint")
+    enqueue.add_argument('--data', default=DATA_PATH, help="pickled engineered frame")
+    enqueue.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR)
+    enqueue.add_argument('--splits', type=int, default=N_SPLITS)
+
+    worker = commands.add_parser('worker', help="train queued units")
+    worker.add_argument('--processes', type=int, default=1, help="worker processes to start")
+    worker.add_argument('--wait', action='store_true', help="keep polling when the queue is empty")
+    worker.add_argument('--stale-after', type=float, default=900.0,
+                        help="seconds without a heartbeat before a running job is requeued")
+
+    commands.add_parser('status', help="job counts per state")
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        enqueue_training(args.data, args.checkpoint_dir, args.queue_dir, args.splits)
+    elif args.command == 'worker':
+        if args.processes == 1:
+            run_worker(args.queue_dir, stale_after=args.stale_after, wait=args.wait)
+        else:
+            import multiprocessing
+            processes = [multiprocessing.Process(target=run_worker, args=(args.queue_dir,),
+                                                 kwargs={'stale_after': args.stale_after, 'wait': args.wait})
+                         for _ in range(args.processes)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+    print(json.dumps(JobQueue(args.queue_dir).counts()))
+
+
+if __name__ == '__main__':
+    main()
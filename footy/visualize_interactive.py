@@ -1,39 +1,58 @@
 import plotly.express as px
 
-def visualize_draws_per_league(df):
+from footy.league_analyzer import league_season_summary
+
+# The *_figure builders plot precomputed league_season_summary() aggregates
+# and return the figure; the visualize_* helpers take raw match data and show it.
+
+
+def draws_per_league_figure(summary):
     """
-    Interactive visualization of draws per league and season.
+    Interactive bar chart of draws per league and season.
     """
-    draw_counts = df[df['FTR'] == 'D'].groupby(['League', 'Season']).size().reset_index(name='Draws')
-
-    fig = px.bar(draw_counts, x='League', y='Draws', color='Season', barmode='group',
+    fig = px.bar(summary, x='League', y='Draws', color='Season', barmode='group',
                  title='Frequency of Draws in Each League per Season')
     fig.update_layout(xaxis_title='League', yaxis_title='Number of Draws')
-    fig.show()
+    return fig
 
 
-def visualize_over_goals(df, goal_threshold):
+def over_goals_figure(summary, goal_threshold):
     """
-    Interactive visualization of games with goals over a threshold (e.g., 1.5, 2.5).
+    Interactive bar chart of games with goals over a threshold (e.g., 1.5, 2.5).
     """
-    df['TotalGoals'] = df['FTHG'] + df['FTAG']
-    goal_label = f'Over_{goal_threshold}_Games'
-    over_goal_count = df[df['TotalGoals'] > goal_threshold].groupby(['League', 'Season']).size().reset_index(name=goal_label)
-
-    fig = px.bar(over_goal_count, x='League', y=goal_label, color='Season', barmode='group',
+    goal_label = f'Over{goal_threshold}_Games'
+    fig = px.bar(summary, x='League', y=goal_label, color='Season', barmode='group',
                  title=f'Frequency of Games with Over {goal_threshold} Goals per League and Season')
     fig.update_layout(xaxis_title='League', yaxis_title=f'Number of Games (Over {goal_threshold} Goals)')
-    fig.show()
+    return fig
 
 
-def visualize_fouls_per_league(df):
+def fouls_per_league_figure(summary):
     """
-    Interactive visualization of fouls per league and season.
+    Interactive bar chart of fouls per league and season.
     """
-    df['TotalFouls'] = df['HF'] + df['AF']
-    fouls_count = df.groupby(['League', 'Season'])['TotalFouls'].sum().reset_index()
-
-    fig = px.bar(fouls_count, x='League', y='TotalFouls', color='Season', barmode='group',
+    fig = px.bar(summary, x='League', y='TotalFouls', color='Season', barmode='group',
                  title='Total Fouls in Each League per Season')
     fig.update_layout(xaxis_title='League', yaxis_title='Total Fouls')
-    fig.show()
+    return fig
+
+
+def visualize_draws_per_league(df):
+    """
+    Interactive visualization of draws per league and season.
+    """
+    draws_per_league_figure(league_season_summary(df)).show()
+
+
+def visualize_over_goals(df, goal_threshold):
+    """
+    Interactive visualization of games with goals over a threshold (e.g., 1.5, 2.5).
+    """
+    over_goals_figure(league_season_summary(df, over_thresholds=(goal_threshold,)), goal_threshold).show()
+
+
+def visualize_fouls_per_league(df):
+    """
+    Interactive visualization of fouls per league and season.
+    """
+    fouls_per_league_figure(league_season_summary(df)).show()
@@ -1,19 +1,65 @@
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from footy.league_analyzer import league_season_summary
+
+# The *_figure builders draw precomputed league_season_summary() aggregates
+# onto a matplotlib Figure (a new, pyplot-free one unless ``fig`` is given,
+# so the web app can render them from any thread); the visualize_* helpers
+# take raw match data and show the chart.
+
+
+def average_goals_figure(summary, fig=None):
+    """
+    Average home and away goals per game by season.
+    """
+    fig = fig or Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    by_season = summary.groupby('Season')[['Matches', 'HomeGoals', 'AwayGoals']].sum()
+    home_goals_avg = by_season['HomeGoals'] / by_season['Matches']
+    away_goals_avg = by_season['AwayGoals'] / by_season['Matches']
+
+    ax.bar(home_goals_avg.index, home_goals_avg, label='Home Goals', color='blue', alpha=0.6)
+    ax.bar(away_goals_avg.index, away_goals_avg, label='Away Goals', color='red', alpha=0.6)
+    ax.set_title('Average Goals per Game by Season (Home vs Away)')
+    ax.set_ylabel('Average Goals')
+    ax.set_xlabel('Season')
+    ax.legend()
+    return fig
+
+
+def total_goals_figure(summary, fig=None):
+    """
+    Total goals scored by home and away teams.
+    """
+    fig = fig or Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    ax.bar(['Home Goals', 'Away Goals'], [summary['HomeGoals'].sum(), summary['AwayGoals'].sum()],
+           color=['blue', 'red'])
+    ax.set_title('Total Goals Scored (Home vs Away)')
+    ax.set_ylabel('Goals')
+    return fig
+
+
+def draw_frequency_figure(summary, fig=None):
+    """
+    Frequency of draws vs non-draws.
+    """
+    fig = fig or Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    draw_count = summary['Draws'].sum()
+    ax.bar(['Draws', 'Non-Draws'], [draw_count, summary['Matches'].sum() - draw_count],
+           color=['gray', 'lightgray'])
+    ax.set_title('Frequency of Draws vs Non-Draws')
+    ax.set_ylabel('Number of Games')
+    return fig
+
 
 def visualize_average_goals(df):
     """
     Visualize average home and away goals by season.
     """
-    home_goals_avg = df.groupby('Season')['FTHG'].mean()
-    away_goals_avg = df.groupby('Season')['FTAG'].mean()
-
-    plt.figure(figsize=(10, 6))
-    plt.bar(home_goals_avg.index, home_goals_avg, label='Home Goals', color='blue', alpha=0.6)
-    plt.bar(away_goals_avg.index, away_goals_avg, label='Away Goals', color='red', alpha=0.6)
-    plt.title('Average Goals per Game by Season (Home vs Away)')
-    plt.ylabel('Average Goals')
-    plt.xlabel('Season')
-    plt.legend()
+    import matplotlib.pyplot as plt
+    average_goals_figure(league_season_summary(df), plt.figure(figsize=(10, 6)))
     plt.show()
 
 
@@ -21,13 +67,8 @@ def visualize_total_goals(df):
     """
     Visualize total goals scored by home and away teams.
     """
-    home_goals_total = df['FTHG'].sum()
-    away_goals_total = df['FTAG'].sum()
-
-    plt.figure(figsize=(10, 6))
-    plt.bar(['Home Goals', 'Away Goals'], [home_goals_total, away_goals_total], color=['blue', 'red'])
-    plt.title('Total Goals Scored (Home vs Away)')
-    plt.ylabel('Goals')
+    import matplotlib.pyplot as plt
+    total_goals_figure(league_season_summary(df), plt.figure(figsize=(10, 6)))
     plt.show()
 
 
@@ -35,11 +76,6 @@ def visualize_draw_frequency(df):
     """
     Visualize the frequency of draws vs non-draws.
     """
-    draw_count = df[df['FTR'] == 'D'].shape[0]
-    non_draw_count = df.shape[0] - draw_count
-
-    plt.figure(figsize=(10, 6))
-    plt.bar(['Draws', 'Non-Draws'], [draw_count, non_draw_count], color=['gray', 'lightgray'])
-    plt.title('Frequency of Draws vs Non-Draws')
-    plt.ylabel('Number of Games')
+    import matplotlib.pyplot as plt
+    draw_frequency_figure(league_season_summary(df), plt.figure(figsize=(10, 6)))
     plt.show()
@@ -0,0 +1,62 @@
+# gunicorn.conf.py
+import gc
+import os
+import sys
+
+# Import the app once in the master; when_ready waits for the model warm-up
+# it starts, so forked workers share the loaded pages copy-on-write.
+# Without preloading each worker imports the app quickly and warms up in
+# the background (PREWARM=1) while /ready answers 503.
+preload_app = True
+
+# /api/live-stream keeps a connection open per browser tab, so workers are
+# threaded: a sync worker would be pinned (and then killed by the timeout)
+# by one open tab. The stream refuses clients beyond LIVE_STREAM_MAX_CLIENTS
+# per worker, and pages fall back to polling, so page requests keep threads.
+# The ASGI app (app.asgi:app) runs with -k uvicorn.workers.UvicornWorker.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '32'))
+
+# Set PROMETHEUS_MULTIPROC_DIR (an empty, writable directory) before starting
+# gunicorn so /metrics aggregates every worker rather than the one scraped.
+
+
+def when_ready(server):
+    """Finish loading the models, then freeze everything before the first worker is forked."""
+    if server.cfg.preload_app:
+        # Forking while the warm-up thread is mid-load would leave workers
+        # with a half-loaded registry and no thread to finish it
+        from app.services.model_registry import registry
+        registry.wait_until_ready()
+        # Same for the figure pre-render, which holds the figure cache lock
+        if 'app.routes' in sys.modules:
+            sys.modules['app.routes'].figure_service.wait_until_ready()
+
+    # Objects in the permanent generation are never scanned by the cyclic GC,
+    # so collections in workers do not write to (and so copy) the shared pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Start per-worker background threads (threads do not survive the fork)."""
+    # ASGI workers (app.asgi) start their background tasks in the app lifespan
+    if 'uvicorn' in server.cfg.worker_class_str.lower():
+        return
+
+    interval = float(os.getenv('MODEL_RELOAD_INTERVAL', '0'))
+    if interval > 0:
+        from app.services.model_registry import registry
+        registry.start_watcher(interval)
+
+    # Every worker runs a refresher, but only the one holding the lock on
+    # LIVE_SNAPSHOT_PATH polls upstream (once per LIVE_REFRESH_INTERVAL,
+    # whatever the worker count); the others read the snapshot it publishes
+    if float(os.getenv('LIVE_REFRESH_INTERVAL', '60')) > 0:
+        from app.routes import football_service
+        football_service.start_background_refresh()
+
+
+def child_exit(server, worker):
+    """Drop the exited worker's live gauges from the shared metrics directory."""
+    from footy.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
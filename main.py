@@ -1,5 +1,7 @@
 # main.py
 
+import argparse
+import os
 import pandas as pd
 from pathlib import Path
 from footy.load_data import load_season_data, load_and_merge_seasons
@@ -9,9 +11,25 @@ from footy.model_training import FootballPredictor
 from footy.predictor_utils import MatchPredictor
 from footy.epl_analyzer import run_epl_analysis
 from footy.rolling_features import RollingFeatureGenerator
+from footy.scoreline_model import ScorelineModel
+from footy.serving_snapshot import build_snapshot, save_snapshot
+from footy.artifact_manifest import write_manifest
+from footy.metrics import write_textfile
+from footy.profiling import PROFILERS, StageProfiler
+from footy.training_jobs import CHECKPOINT_DIR, TrainingCheckpoint
 
 
-def main():
+def main(profiler=None, checkpoint_dir=None):
+    """
+    Run the full pipeline.
+
+    Args:
+        profiler: StageProfiler recording each stage (default: stage durations only)
+        checkpoint_dir: Checkpoint each trained (task, fold) unit here and
+            resume from earlier units for the same data
+    """
+    profiler = profiler or StageProfiler()
+
     # 1. Set up paths
     data_dir = Path("data/raw")
     models_dir = Path("models")
@@ -25,45 +43,76 @@ def main():
     try:
         # 2. Load and merge data
         print("Loading data...")
-        data, sheets = load_season_data(season_paths)
-        merged_df = load_and_merge_seasons(data["2024-2025"], data["2023-2024"])
+        with profiler.stage('load') as stage:
+            data, sheets = load_season_data(season_paths)
+            merged_df = stage.output = load_and_merge_seasons(data["2024-2025"], data["2023-2024"])
 
         # 3. Clean data
         print("\nCleaning data...")
-        merged_df_cleaned = clean_betting_columns(merged_df)
-        dataset_info = explore_dataset(merged_df_cleaned)
+        with profiler.stage('clean', merged_df) as stage:
+            merged_df_cleaned = stage.output = clean_betting_columns(merged_df)
+            dataset_info = explore_dataset(merged_df_cleaned)
 
         # 4. Feature engineering with all features
         print("\nStarting feature engineering...")
 
         # First encode teams
         feature_engineering = FootballFeatureEngineering()
-        df_encoded = feature_engineering.encode_teams(merged_df_cleaned)
+        with profiler.stage('encode_teams', merged_df_cleaned) as stage:
+            df_encoded = stage.output = feature_engineering.encode_teams(merged_df_cleaned)
 
         # Then add rolling features (these create the features the model expects)
         print("\nAdding rolling features...")
         rolling_generator = RollingFeatureGenerator()
-        df_with_rolling = rolling_generator.add_rolling_features(df_encoded)
+        with profiler.stage('rolling_features', df_encoded) as stage:
+            df_with_rolling = stage.output = rolling_generator.add_rolling_features(df_encoded)
 
         # Then do the rest of feature engineering
         print("\nCompleting feature engineering...")
-        df_engineered = feature_engineering.engineer_features(df_with_rolling)
+        with profiler.stage('feature_engineering', df_with_rolling) as stage:
+            df_engineered = stage.output = feature_engineering.engineer_features(df_with_rolling)
+
+        # Compact dtypes once, so training, the saved frame and serving share them
+        with profiler.stage('compact_dtypes', df_engineered) as stage:
+            memory_before = df_engineered.memory_usage(deep=True).sum()
+            df_engineered = stage.output = feature_engineering.compact_dtypes(df_engineered)
+        print(f"Engineered frame: {memory_before / 2 ** 20:.1f} MB -> "
+              f"{df_engineered.memory_usage(deep=True).sum() / 2 ** 20:.1f} MB")
+
+        # Save processed data before training, which is what training_jobs workers read
+        output_dir = Path("data/processed")
+        output_dir.mkdir(exist_ok=True)
+
+        print("\nSaving processed data...")
+        with profiler.stage('save_data', df_engineered):
+            df_engineered.to_pickle(output_dir / "processed_data.pkl")
 
         # 5. Train models with enhanced predictions
         print("\nTraining prediction models...")
         predictor = FootballPredictor()
-        predictor.train_models(df_engineered)
+        with profiler.stage('train', df_engineered):
+            predictor.train_models(df_engineered, checkpoint_dir=checkpoint_dir)
 
         # Save trained models
-        predictor.save_models(models_dir / "football_models.joblib")
+        with profiler.stage('save_models'):
+            predictor.save_models(models_dir / "football_models.joblib")
+
+        # Fit the scoreline model on raw goals (engineered goals are scaled)
+        print("\nFitting scoreline model...")
+        with profiler.stage('scoreline', merged_df_cleaned):
+            scoreline_model = ScorelineModel(xi=0.0019).fit(merged_df_cleaned)
+        scoreline_model.save(models_dir / "scoreline_model.joblib")
 
         # 6. Run EPL analysis
         print("\nAnalyzing EPL statistics...")
-        team_stats, percentage_stats, fig = run_epl_analysis(df_engineered)
+        with profiler.stage('epl_analysis', merged_df_cleaned) as stage:
+            team_stats, percentage_stats, fig = run_epl_analysis(merged_df_cleaned)
+            stage.output = team_stats
         fig.show()
 
         # 7. Set up match predictor
-        match_predictor = MatchPredictor(df_engineered, predictor.models)
+        match_predictor = MatchPredictor(df_engineered, predictor.models,
+                                         scoreline_model=scoreline_model, scoreline_weight=0.25)
 
         # 8. Make predictions for upcoming matches
         print("\nPredicting upcoming matches...")
@@ -76,14 +125,26 @@ def main():
             ('Real Madrid', 'Sevilla')
         ]
 
-        match_predictor.predict_matches(upcoming_matches)
+        with profiler.stage('predict'):
+            match_predictor.predict_matches(upcoming_matches)
 
-        # 9. Save processed data
-        output_dir = Path("data/processed")
-        output_dir.mkdir(exist_ok=True)
+        # Latest per-team feature rows: all the web app needs to serve
+        with profiler.stage('snapshot', df_engineered):
+            save_snapshot(build_snapshot(df_engineered, feature_engineering.team_encodings),
+                          models_dir / "serving_snapshot.npz")
 
-        print("\nSaving processed data...")
-        df_engineered.to_pickle(output_dir / "processed_data.pkl")
+        # Written last: the web app reloads when the manifest changes and
+        # loads exactly the artifact versions it lists
+        write_manifest(models_dir / "manifest.json", {
+            'models': models_dir / "football_models.joblib",
+            'scoreline': models_dir / "scoreline_model.joblib",
+            'snapshot': models_dir / "serving_snapshot.npz",
+            'data': output_dir / "processed_data.pkl"
+        })
+
+        # Stage timings for node_exporter's textfile collector, if configured
+        write_textfile(os.getenv('METRICS_TEXTFILE'))
+        profiler.write()
 
         print("\nProcess completed successfully!")
         return {
@@ -98,8 +159,27 @@ def main():
         print(f"\nError in main process: {str(e)}")
         import traceback
         traceback.print_exc()
+        # Stages that finished before the failure are still worth reporting
+        profiler.write()
         return None
 
 
 if __name__ == "__main__":
-    results = main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the football prediction models.")
+    parser.add_argument('--profile', action='store_true',
+                        help="record wall/CPU time, peak RSS and shapes per stage")
+    parser.add_argument('--profiler', choices=PROFILERS,
+                        help="also dump a cProfile or sampling profile per stage (implies --profile)")
+    parser.add_argument('--profile-dir', default='profiles', help="directory for the report and dumps")
+    parser.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR,
+                        help="checkpoint each trained (task, fold) unit here and resume from it")
+    parser.add_argument('--no-checkpoints', action='store_true', help="train without checkpointing")
+    parser.add_argument('--fresh', action='store_true', help="discard existing checkpoints first")
+    args = parser.parse_args()
+
+    if args.fresh:
+        TrainingCheckpoint(args.checkpoint_dir).clear()
+
+    results = main(StageProfiler(enabled=args.profile or args.profiler is not None,
+                                 profiler=args.profiler, output_dir=args.profile_dir),
+                   checkpoint_dir=None if args.no_checkpoints else args.checkpoint_dir)
\ No newline at end of file
@@ -0,0 +1,106 @@
+# tests/conftest.py
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class UpstreamStandIn:
+    """Local football-data.org stand-in that counts the calls it serves."""
+
+    def __init__(self, payload=None):
+        self.payload = payload or {'matches': [{
+            'id': 1, 'status': 'IN_PLAY', 'utcDate': '2024-11-30T15:00:00Z',
+            'homeTeam': {'name': 'Arsenal FC'}, 'awayTeam': {'name': 'Chelsea FC'},
+            'competition': {'name': 'Premier League'}, 'score': {'fullTime': {'home': 1, 'away': 0}}
+        }]}
+        self.hits = 0
+        # (status, headers) served before falling back to 200 with the payload
+        self.responses = []
+        self._lock = threading.Lock()
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with standin._lock:
+                    standin.hits += 1
+                    status, headers = standin.responses.pop(0) if standin.responses else (200, {})
+                body = json.dumps(standin.payload if status == 200 else {'message': 'error'}).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v4"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def upstream():
+    standin = UpstreamStandIn()
+    yield standin
+    standin.close()
+
+
+class StubPredictor:
+    """MatchPredictor stand-in: the same prediction for every fixture."""
+
+    def __init__(self, outcome='Home Win'):
+        self.outcome = outcome
+
+    def predict_batch(self, fixtures):
+        return [self.predict_match(home, away) for home, away in fixtures]
+
+    def predict_match(self, home_team, away_team):
+        from footy.predictor_utils import TeamMapper
+        home_team, away_team = TeamMapper.standardize_name(home_team), TeamMapper.standardize_name(away_team)
+        return ({'Match Outcome': self.outcome},
+                {'Match Outcome': {'Home Win': '50.00%', 'Draw': '25.00%', 'Away Win': '25.00%'}})
+
+
+@pytest.fixture(scope='session')
+def flask_app(tmp_path_factory):
+    """The Flask app without model warm-up, on a scratch prediction database."""
+    scratch = tmp_path_factory.mktemp('app')
+    os.environ.update({
+        'PREWARM': '0',
+        'PREDICTIONS_DB_URL': f"sqlite:///{scratch / 'predictions.db'}",
+        'LIVE_SNAPSHOT_PATH': '',
+        'FIGURE_CACHE_DIR': str(scratch / 'figures')
+    })
+    from app.run import app
+    return app
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
+
+
+@pytest.fixture
+def bundle(monkeypatch):
+    """Serve a stub predictor as the registry's current bundle."""
+    from app.services.model_registry import ModelBundle, registry
+    from footy.team_resolver import TeamResolver
+
+    teams = ['Arsenal', 'Chelsea', 'Liverpool', 'Tottenham']
+    current = ModelBundle(StubPredictor(), teams, 'models-1', 'data-1', 0.0,
+                          resolver=TeamResolver(teams), leagues={team: 'E0' for team in teams})
+    monkeypatch.setattr(registry, 'get', lambda *args, **kwargs: current)
+    return current
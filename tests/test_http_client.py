@@ -0,0 +1,52 @@
+# tests/test_http_client.py
+import time
+
+from app.services.http_client import FootballDataClient
+
+
+def make_client(upstream, **kwargs):
+    kwargs.setdefault('requests_per_minute', 1000)
+    return FootballDataClient(upstream.url, backoff=0.01, **kwargs)
+
+
+def test_server_error_ignores_the_rate_limit_reset(upstream):
+    upstream.responses = [(502, {'X-RequestCounter-Reset': '60'})]
+    client = make_client(upstream)
+
+    start = time.monotonic()
+    assert client.get_json('/matches') == upstream.payload
+    assert time.monotonic() - start < 1.0
+    assert upstream.hits == 2
+
+
+def test_rate_limit_waits_for_the_reset(upstream):
+    upstream.responses = [(429, {'X-RequestCounter-Reset': '0.3'})]
+    client = make_client(upstream)
+
+    start = time.monotonic()
+    assert client.get_json('/matches') == upstream.payload
+    assert time.monotonic() - start >= 0.3
+    assert client.metrics()['throttled'] == 1
+
+
+def test_retries_stay_within_the_budget(upstream):
+    upstream.responses = [(429, {'X-RequestCounter-Reset': '60'})] * 4
+    client = make_client(upstream, retry_budget=1.0)
+
+    start = time.monotonic()
+    assert client.get_json('/matches') is None
+    assert time.monotonic() - start < 1.0
+    assert client.metrics()['budget_exhausted'] == 1
+
+    # The rate-limit block still holds back the next call instead of hammering upstream
+    assert client.get_json('/matches') is None
+    assert upstream.hits == 1
+
+
+def test_retry_after_is_honoured_for_server_errors(upstream):
+    upstream.responses = [(503, {'Retry-After': '0.3'})]
+    client = make_client(upstream)
+
+    start = time.monotonic()
+    assert client.get_json('/matches') == upstream.payload
+    assert time.monotonic() - start >= 0.3
@@ -0,0 +1,124 @@
+# tests/test_live_refresh.py
+import asyncio
+import time
+
+import pytest
+
+from app.services.football_service import FootballDataService
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def make_service(upstream, tmp_path, monkeypatch):
+    """Services standing in for gunicorn workers that share one snapshot file."""
+    monkeypatch.setenv('FOOTBALL_DATA_RATE_LIMIT', '1000')
+    monkeypatch.setattr('app.services.football_service.FOLLOW_INTERVAL', 0.05)
+    services = []
+
+    def make(**kwargs):
+        kwargs.setdefault('shared_path', str(tmp_path / 'live_snapshot.json'))
+        service = FootballDataService(base_url=upstream.url, **kwargs)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.stop_background_refresh()
+        if service._refresher is not None:
+            service._refresher.join(timeout=5)
+
+
+def test_one_worker_polls_for_all(upstream, make_service):
+    workers = [make_service(refresh_interval=0.2) for _ in range(4)]
+    for worker in workers:
+        worker.start_background_refresh()
+
+    assert wait_for(lambda: all(worker.live_snapshot()[0] for worker in workers))
+    time.sleep(1.0)
+
+    # One poller: about 1.0 / 0.2 polls, not four times that
+    assert upstream.hits <= 8
+    assert sum(worker.shared.leading for worker in workers) == 1
+    assert all(worker.live_snapshot()[0] == upstream.payload for worker in workers)
+
+
+def test_followers_pick_up_changes(upstream, make_service):
+    leader, follower = make_service(refresh_interval=0.1), make_service(refresh_interval=0.1)
+    leader.start_background_refresh()
+    assert wait_for(lambda: leader.shared.leading)
+    follower.start_background_refresh()
+
+    seen = []
+    follower.add_snapshot_listener(lambda payload, fetched_at: seen.append(payload))
+    upstream.payload = {'matches': []}
+
+    assert wait_for(lambda: follower.live_snapshot()[0] == {'matches': []})
+    assert seen[-1] == {'matches': []}
+    assert not follower.shared.leading
+
+
+def test_another_worker_takes_over(upstream, make_service):
+    first, second = make_service(refresh_interval=0.1), make_service(refresh_interval=0.1)
+    first.start_background_refresh()
+    assert wait_for(lambda: first.shared.leading)
+    second.start_background_refresh()
+
+    first.stop_background_refresh()
+    first._refresher.join(timeout=5)
+    hits = upstream.hits
+
+    assert wait_for(lambda: second.shared.leading)
+    assert wait_for(lambda: upstream.hits > hits + 1)
+
+
+def test_requests_are_served_from_the_snapshot(upstream, make_service):
+    service = make_service(refresh_interval=60)
+    first = service.get_live_matches()
+    for _ in range(20):
+        assert service.get_live_matches() == first
+    assert upstream.hits == 1
+    assert b'"fetched_at"' in service.live_matches_json()
+
+
+def test_follower_does_not_call_upstream_inline(upstream, make_service):
+    leader, follower = make_service(refresh_interval=60), make_service(refresh_interval=60)
+    leader.start_background_refresh()
+    assert wait_for(lambda: leader.live_snapshot()[0] is not None)
+
+    assert follower.get_live_matches() == upstream.payload
+    assert upstream.hits == 1
+
+
+def test_per_process_snapshot_without_a_shared_path(upstream, make_service):
+    service = make_service(refresh_interval=60, shared_path='')
+    assert service.shared is None
+    assert service.get_live_matches() == upstream.payload
+
+
+def test_async_workers_share_one_poller(upstream, tmp_path, monkeypatch):
+    from app.services.football_service import AsyncFootballDataService
+    monkeypatch.setenv('FOOTBALL_DATA_RATE_LIMIT', '1000')
+    monkeypatch.setattr('app.services.football_service.FOLLOW_INTERVAL', 0.05)
+
+    async def run():
+        workers = [AsyncFootballDataService(base_url=upstream.url, refresh_interval=0.2,
+                                            shared_path=str(tmp_path / 'live_snapshot.json'))
+                   for _ in range(3)]
+        for worker in workers:
+            worker.start_background_refresh()
+        await asyncio.sleep(1.0)
+        payloads = [await worker.get_live_matches() for worker in workers]
+        for worker in workers:
+            await worker.stop_background_refresh()
+        return payloads
+
+    assert asyncio.run(run()) == [upstream.payload] * 3
+    assert upstream.hits <= 7
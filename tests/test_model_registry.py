@@ -0,0 +1,67 @@
+import joblib
+import pytest
+
+from app.services.model_registry import ModelRegistry
+from footy.artifact_manifest import write_manifest
+from footy.predictor_utils import MatchPredictor
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    # The bundle's predictor is the snapshot it was built from, so tests see which file was loaded
+    monkeypatch.setattr('footy.serving_snapshot.load_snapshot',
+                        lambda path: {'path': str(path), 'teams': ['Arsenal'], 'leagues': {}})
+    monkeypatch.setattr(MatchPredictor, 'from_snapshot',
+                        classmethod(lambda cls, snapshot, models, **kwargs: dict(snapshot, **kwargs)))
+
+    models_dir = tmp_path / 'models'
+    models_dir.mkdir()
+    registry = ModelRegistry(models_path=str(models_dir / 'football_models.joblib'),
+                             snapshot_path=str(models_dir / 'serving_snapshot.npz'),
+                             scoreline_path=str(models_dir / 'scoreline_model.joblib'),
+                             manifest_path=str(models_dir / 'manifest.json'))
+    registry.team_cache_path = str(tmp_path / 'team_cache.json')
+    return registry
+
+
+def _train(registry, run):
+    """Write one run's artifacts and then its manifest, as main.py does."""
+    joblib.dump({'run': run}, registry.models_path)
+    with open(registry.snapshot_path, 'w') as f:
+        f.write(f"snapshot {run}")
+    return write_manifest(registry.manifest_path, {'models': registry.models_path,
+                                                   'snapshot': registry.snapshot_path,
+                                                   'scoreline': registry.scoreline_path})
+
+
+def test_bundle_loads_the_manifest_versions(registry):
+    manifest = _train(registry, 1)
+
+    bundle = registry._load_bundle()
+
+    assert 'scoreline' not in manifest['artifacts']
+    assert bundle.model_version == manifest['artifacts']['models']['version']
+    assert bundle.data_version == manifest['artifacts']['snapshot']['version']
+    assert bundle.predictor['path'] == registry.snapshot_path
+
+
+def test_half_written_run_is_not_loaded(registry):
+    _train(registry, 1)
+    # The next run has replaced the models but not yet the snapshot or manifest
+    joblib.dump({'run': 2}, registry.models_path)
+
+    with pytest.raises(ValueError, match='does not match the manifest'):
+        registry._load_bundle()
+
+
+def test_signature_changes_only_with_the_manifest(registry):
+    _train(registry, 1)
+    before = registry.artifact_signature()
+
+    joblib.dump({'run': 2}, registry.models_path)
+    with open(registry.snapshot_path, 'w') as f:
+        f.write("snapshot 2, a longer file")
+    assert registry.artifact_signature() == before
+
+    write_manifest(registry.manifest_path, {'models': registry.models_path, 'snapshot': registry.snapshot_path})
+    assert registry.artifact_signature() != before
@@ -0,0 +1,97 @@
+# tests/test_predict_api.py
+import pytest
+
+
+def test_batch_predicts_every_fixture(client, bundle):
+    response = client.post('/api/predict/batch', json={'fixtures': [
+        ['Arsenal', 'Chelsea'], {'home_team': 'Liverpool', 'away_team': 'Tottenham'}]})
+
+    assert response.status_code == 200
+    assert [(p['home_team'], p['away_team']) for p in response.json['predictions']] == [
+        ('Arsenal', 'Chelsea'), ('Liverpool', 'Tottenham')]
+
+
+@pytest.mark.parametrize('fixtures', [
+    [[['x'], 'Chelsea']],
+    [{'home_team': {'name': 'Arsenal'}, 'away_team': 'Chelsea'}],
+    [['Arsenal', 7]],
+    [['Arsenal', '   ']],
+    [['Arsenal']],
+    [],
+    'Arsenal v Chelsea',
+])
+def test_batch_rejects_malformed_fixtures(client, bundle, fixtures):
+    response = client.post('/api/predict/batch', json={'fixtures': fixtures})
+
+    assert response.status_code == 400
+    assert response.json['status'] == 'error'
+
+
+def test_batch_records_the_versions_that_made_the_predictions(client, bundle, monkeypatch):
+    from app.routes import prediction_store
+    from app.services.model_registry import ModelBundle, registry
+    from tests.conftest import StubPredictor
+
+    # A hot reload lands right after the request took its bundle
+    reloaded = ModelBundle(StubPredictor('Away Win'), bundle.teams, 'models-2', 'data-2', 0.0,
+                           resolver=bundle.resolver, leagues=bundle.leagues)
+    bundles = iter([bundle])
+    monkeypatch.setattr(registry, 'get', lambda *args, **kwargs: next(bundles, reloaded))
+
+    response = client.post('/api/predict/batch', json={'fixtures': [['Arsenal', 'Tottenham']]})
+    assert response.status_code == 200
+    assert response.json['predictions'][0]['predictions'] == {'Match Outcome': 'Home Win'}
+
+    prediction_store.flush()
+    row = prediction_store.query(limit=1, team='Tottenham')['predictions'][0]
+    assert (row['model_version'], row['data_version'], row['predicted_outcome']) == (
+        'models-1', 'data-1', 'Home Win')
+
+
+@pytest.mark.parametrize('payload', [
+    {'homeTeam': 'Arsenal', 'awayTeam': 'Chelsea', 'predictions': {'Match Outcome': 'Draw'},
+     'matchDate': 'next saturday'},
+    {'homeTeam': 'Arsenal', 'awayTeam': 'Chelsea', 'predictions': {'Match Outcome': 'Draw'},
+     'matchDate': '2024-13-45'},
+    {'homeTeam': 'Arsenal', 'awayTeam': 'Chelsea', 'predictions': ['Draw']},
+    {'homeTeam': 'Arsenal', 'awayTeam': 'Chelsea', 'predictions': {'Match Outcome': 'Draw'},
+     'probabilities': 'high'},
+])
+def test_save_prediction_rejects_malformed_input(client, bundle, payload):
+    response = client.post('/api/save-prediction', json=payload)
+
+    assert response.status_code == 400
+    assert response.json['status'] == 'error'
+
+
+def test_save_prediction(client, bundle):
+    response = client.post('/api/save-prediction', json={
+        'homeTeam': 'Liverpool', 'awayTeam': 'Chelsea', 'predictions': {'Match Outcome': 'Draw'},
+        'matchDate': '2024-11-30T15:00:00Z'})
+
+    assert response.status_code == 200
+    assert response.json['id']
+
+
+@pytest.mark.parametrize('endpoint', ['/api/predictions', '/api/predictions/accuracy'])
+def test_history_rejects_malformed_dates(client, endpoint):
+    response = client.get(endpoint, query_string={'date_from': '2024-13-45'})
+
+    assert response.status_code == 400
+    assert response.json['message'].startswith('Bad query')
+
+
+@pytest.mark.parametrize('method, endpoint', [('post', '/api/predict/batch'), ('get', '/api/live-predictions')])
+def test_predictions_need_loaded_models(client, monkeypatch, method, endpoint):
+    from app.routes import football_service
+    from app.services.model_registry import registry
+
+    upstream_calls = []
+    monkeypatch.setattr(registry, 'get', lambda *args, **kwargs: None)
+    monkeypatch.setattr(football_service, 'get_live_matches', lambda *args: upstream_calls.append(args))
+
+    response = getattr(client, method)(endpoint, json={'fixtures': [['Arsenal', 'Chelsea']]})
+
+    assert response.status_code == 503
+    assert response.json['message'] == 'Models not loaded'
+    assert upstream_calls == []
@@ -0,0 +1,56 @@
+# tests/test_team_resolver.py
+import json
+import multiprocessing
+import os
+import threading
+
+from footy.team_resolver import TeamResolver
+from app.services.fixtures import live_fixtures
+
+TEAMS = ['Arsenal', 'Chelsea', 'Man United', 'Man City', 'Tottenham', 'Liverpool']
+
+
+def match(home, away, home_id, away_id):
+    return {'homeTeam': {'name': home, 'id': home_id}, 'awayTeam': {'name': away, 'id': away_id}}
+
+
+def test_saves_only_when_something_new_was_resolved(tmp_path):
+    cache = tmp_path / 'teams.json'
+    resolver = TeamResolver(TEAMS, cache_path=str(cache))
+    matches = [match('Arsenal FC', 'Chelsea FC', 57, 61)]
+
+    assert live_fixtures(matches, resolver) == ([('Arsenal', 'Chelsea')], [])
+    written = cache.stat().st_mtime_ns
+    os.utime(cache, ns=(0, 0))
+
+    for _ in range(5):
+        live_fixtures(matches, resolver)
+    assert not resolver.dirty
+    assert cache.stat().st_mtime_ns == 0
+
+    live_fixtures([match('Tottenham Hotspur FC', 'Liverpool FC', 73, 64)], resolver)
+    assert cache.stat().st_mtime_ns >= written
+    assert json.loads(cache.read_text())['ids'] == {'57': 'Arsenal', '61': 'Chelsea',
+                                                    '73': 'Tottenham', '64': 'Liverpool'}
+
+
+def _save_many(cache_path, offset, saves=200):
+    resolver = TeamResolver(TEAMS, cache_path=cache_path)
+    for i in range(saves):
+        resolver.resolve('Arsenal FC', team_id=offset + i)
+        resolver.save()
+
+
+def test_concurrent_saves_never_publish_a_partial_file(tmp_path, caplog):
+    cache = str(tmp_path / 'teams.json')
+    workers = [multiprocessing.Process(target=_save_many, args=(cache, 1000 * i)) for i in range(3)]
+    threads = [threading.Thread(target=_save_many, args=(cache, 10000 + 1000 * i)) for i in range(4)]
+    for worker in workers + threads:
+        worker.start()
+    for worker in workers + threads:
+        worker.join()
+
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert not [record for record in caplog.records if 'Could not save' in record.getMessage()]
+    assert json.loads(open(cache).read())['names'] == {'Arsenal FC': 'Arsenal'}
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
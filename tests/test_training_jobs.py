@@ -0,0 +1,29 @@
+import json
+import os
+import time
+
+from footy import training_jobs
+from footy.training_jobs import JobQueue
+
+
+def test_claimed_job_is_not_requeued_as_stale(tmp_path, monkeypatch):
+    queue = JobQueue(tmp_path)
+    queue.put('btts-fold0', {'task': 'btts', 'fold': 0})
+    # Queued an hour ago, long past the stale timeout
+    queued_at = time.time() - 3600
+    os.utime(queue._path('pending', 'btts-fold0'), (queued_at, queued_at))
+
+    # Another worker's stale sweep runs while the claim reads the payload back
+    swept = []
+    loads = json.loads
+
+    def loads_during_sweep(text):
+        swept.extend(queue.requeue_stale(900))
+        return loads(text)
+
+    monkeypatch.setattr(training_jobs.json, 'loads', loads_during_sweep)
+    job_id, payload = queue.claim('worker-1')
+
+    assert swept == []
+    assert queue.counts() == {'pending': 0, 'running': 1, 'done': 0, 'failed': 0}
+    assert payload['worker'] == 'worker-1'